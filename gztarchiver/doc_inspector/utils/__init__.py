@@ -1,10 +1,25 @@
 from .content_preprocessing_utils import extract_text_from_pdf, prepare_for_llm_processing
-from .categorizing_utils import classify_gazette, save_classified_doc_metadata, prepare_classified_metadata
+from .categorizing_utils import classify_gazette, prepare_classified_metadata, append_classified_doc_metadata, load_classified_doc_metadata, compact_classified_doc_metadata
+from .mock_llm_server_utils import start_mock_llm_server, stop_mock_llm_server
+from .benchmark_utils import run_classification_benchmark, run_classify_benchmark_command
+from .search_index_utils import get_search_index_path, open_search_index, index_extracted_texts, update_indexed_doc_types, search_index, run_search_command
 
 __all__ = [
     "extract_text_from_pdf",
     "prepare_for_llm_processing",
     "classify_gazette",
-    "save_classified_doc_metadata",
-    "prepare_classified_metadata"
+    "prepare_classified_metadata",
+    "append_classified_doc_metadata",
+    "load_classified_doc_metadata",
+    "compact_classified_doc_metadata",
+    "start_mock_llm_server",
+    "stop_mock_llm_server",
+    "run_classification_benchmark",
+    "run_classify_benchmark_command",
+    "get_search_index_path",
+    "open_search_index",
+    "index_extracted_texts",
+    "update_indexed_doc_types",
+    "search_index",
+    "run_search_command"
 ]
\ No newline at end of file
@@ -0,0 +1,208 @@
+import json
+import math
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from .categorizing_utils import classify_gazette
+from .mock_llm_server_utils import start_mock_llm_server, stop_mock_llm_server
+
+# Words used to build synthetic gazette bodies for the benchmark corpus
+SYNTHETIC_VOCABULARY = [
+    "gazette", "minister", "appointment", "department", "land", "acquisition", "section",
+    "notice", "order", "regulation", "election", "commissioner", "district", "secretary",
+    "published", "hereby", "provincial", "council", "court", "tender", "company", "act",
+    "parliament", "authority", "schedule", "survey", "boundary", "lot", "plan", "division"
+]
+
+
+def build_synthetic_corpus(doc_count, doc_chars=3000, seed=0):
+    """
+    Build deterministic llm_ready_texts-shaped documents for benchmarking
+
+    Args:
+        doc_count: Number of documents to generate
+        doc_chars: Approximate characters per document
+        seed: Seed so the same corpus is produced on every run
+
+    Returns:
+        Dict of doc_id -> {"text": ..., "date": ...} like prepare_for_llm_processing()
+    """
+
+    rng = random.Random(seed)
+    corpus = {}
+
+    for i in range(doc_count):
+        words = []
+        length = 0
+        while length < doc_chars:
+            word = rng.choice(SYNTHETIC_VOCABULARY)
+            words.append(word)
+            length += len(word) + 1
+
+        doc_id = f"bench-{i:05d}"
+        corpus[doc_id] = {
+            "text": " ".join(words),
+            "date": f"2024-{(i % 12) + 1:02d}-{(i % 28) + 1:02d}"
+        }
+
+    return corpus
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers (0 for an empty list)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def run_classification_benchmark(llm_ready_texts, url, api_key="benchmark", workers=1, max_retries=3, backoff_base=1.0, timeout=30):
+    """
+    Drive classify_gazette over a corpus and measure throughput and latency
+
+    Args:
+        llm_ready_texts: Dict shaped like prepare_for_llm_processing() output
+        url: Chat completions endpoint (mock or real)
+        api_key: Key sent in the request headers
+        workers: Number of concurrent classification requests
+        max_retries: Retries passed to classify_gazette
+        backoff_base: Backoff base passed to classify_gazette
+        timeout: Per-request timeout passed to classify_gazette
+
+    Returns:
+        Dict with throughput, latency percentiles, retry and failure counts
+    """
+
+    def timed_classify(doc_id):
+        started = time.perf_counter()
+        result = classify_gazette(
+            llm_ready_texts[doc_id]["text"],
+            doc_id,
+            api_key,
+            url,
+            max_retries=max_retries,
+            backoff_base=backoff_base,
+            timeout=timeout
+        )
+        return result, time.perf_counter() - started
+
+    doc_ids = list(llm_ready_texts)
+
+    started = time.perf_counter()
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            outcomes = list(executor.map(timed_classify, doc_ids))
+    else:
+        outcomes = [timed_classify(doc_id) for doc_id in doc_ids]
+    elapsed = time.perf_counter() - started
+
+    latencies_ms = [seconds * 1000.0 for _, seconds in outcomes]
+    type_counts = {}
+    for result, _ in outcomes:
+        type_counts[result["type"]] = type_counts.get(result["type"], 0) + 1
+
+    return {
+        "documents": len(doc_ids),
+        "workers": workers,
+        "elapsed_seconds": round(elapsed, 3),
+        "docs_per_second": round(len(doc_ids) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": {
+            "p50": round(percentile(latencies_ms, 50), 2),
+            "p90": round(percentile(latencies_ms, 90), 2),
+            "p99": round(percentile(latencies_ms, 99), 2),
+            "max": round(max(latencies_ms), 2) if latencies_ms else 0.0
+        },
+        "retries": sum(result.get("retries", 0) for result, _ in outcomes),
+        "failed": sum(1 for result, _ in outcomes if not result["success"]),
+        "type_counts": type_counts
+    }
+
+
+def run_classify_benchmark_command(args):
+    """
+    Entry point for `gztarchiver benchmark classify`
+
+    Args:
+        args: Parsed arguments from parse_benchmark_args()
+
+    Returns:
+        Process exit code (1 when a regression threshold is breached)
+    """
+
+    corpus = build_synthetic_corpus(args.docs, doc_chars=args.doc_chars, seed=args.seed)
+
+    server = None
+    url = args.url
+    if not url:
+        server, url = start_mock_llm_server(
+            latency_ms=args.latency_ms,
+            latency_jitter_ms=args.jitter_ms,
+            latency_distribution=args.distribution,
+            error_rate=args.error_rate,
+            rate_limit_rate=args.rate_limit_rate,
+            retry_after=args.retry_after,
+            seed=args.seed
+        )
+        print(f"🧪 Mock chat completions server started at {url}")
+
+    print(f"🚀 Classifying {args.docs} synthetic documents with {args.workers} worker(s)...")
+
+    try:
+        report = run_classification_benchmark(
+            corpus,
+            url,
+            workers=args.workers,
+            max_retries=args.max_retries,
+            backoff_base=args.backoff_base
+        )
+    finally:
+        if server:
+            stop_mock_llm_server(server)
+
+    if server:
+        report["server"] = dict(server.stats)
+
+    print_benchmark_report(report)
+
+    if args.report:
+        report_path = Path(args.report)
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Benchmark report saved to: {report_path}")
+
+    return check_benchmark_thresholds(report, args.min_docs_per_sec, args.max_p99_ms)
+
+
+def check_benchmark_thresholds(report, min_docs_per_sec=None, max_p99_ms=None):
+    """Return 1 and print the breach when the report misses a CI threshold, else 0"""
+    exit_code = 0
+
+    if min_docs_per_sec is not None and report["docs_per_second"] < min_docs_per_sec:
+        print(f"❌ Throughput {report['docs_per_second']} docs/sec is below the {min_docs_per_sec} docs/sec threshold")
+        exit_code = 1
+
+    if max_p99_ms is not None and report["latency_ms"]["p99"] > max_p99_ms:
+        print(f"❌ p99 latency {report['latency_ms']['p99']} ms exceeds the {max_p99_ms} ms threshold")
+        exit_code = 1
+
+    return exit_code
+
+
+def print_benchmark_report(report):
+    """Print a benchmark report in the same layout as the other summaries"""
+
+    print("\n" + "=" * 60)
+    print("📊 BENCHMARK SUMMARY")
+    print("=" * 60)
+    for key, value in report.items():
+        if isinstance(value, dict):
+            print(f"{key}:")
+            for sub_key, sub_value in value.items():
+                print(f"   {sub_key}: {sub_value}")
+        else:
+            print(f"{key}: {value}")
+    print("=" * 60)
@@ -2,8 +2,19 @@ import requests
 from gztarchiver.doc_inspector.LLM import GAZETTE_CLASSIFICATION_PROMPT
 from pathlib import Path
 import csv
+import os
+import time
 
-def classify_gazette(content, doc_id, divert_api_key, divert_url):
+CLASSIFIED_METADATA_HEADER = ["Document ID", "Document Date", "Gazette Type", "Reasoning"]
+
+# Superseded/truncated rows are only compacted away once they reach this share of the documents,
+# so most runs append without rewriting the whole file
+COMPACT_STALE_RATIO = 0.5
+
+# Responses worth retrying: throttling and transient upstream failures
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+def classify_gazette(content, doc_id, divert_api_key, divert_url, max_retries=3, backoff_base=1.0, timeout=30):
     """
     Classifies a gazette document using DeepSeek LLM API
     
@@ -11,9 +22,12 @@ def classify_gazette(content, doc_id, divert_api_key, divert_url):
         content (str): The gazette content to classify
         doc_id (str): Document ID for reference
         api_key (str): DeepSeek API key
+        max_retries (int): Retries for 429/5xx responses and connection errors
+        backoff_base (float): Base delay in seconds for exponential backoff
+        timeout (float): Request timeout in seconds
         
     Returns:
-        dict: Classification result with type and reasoning
+        dict: Classification result with type, reasoning and retry count
     """
     
     # DeepSeek API endpoint
@@ -40,9 +54,26 @@ def classify_gazette(content, doc_id, divert_api_key, divert_url):
         "temperature": 0.1
     }
     
+    retries = 0
+    
     try:
-        # Make the API request
-        response = requests.post(url, headers=headers, json=payload, timeout=30)
+        # Make the API request, retrying throttled or transient failures
+        for attempt in range(max_retries + 1):
+            try:
+                response = requests.post(url, headers=headers, json=payload, timeout=timeout)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+                if attempt == max_retries:
+                    raise
+                retries += 1
+                time.sleep(backoff_base * (2 ** attempt))
+                continue
+            
+            if response.status_code in RETRYABLE_STATUS_CODES and attempt < max_retries:
+                retries += 1
+                time.sleep(get_retry_delay(response, attempt, backoff_base))
+                continue
+            break
+        
         response.raise_for_status()
         
         # Parse the response
@@ -88,6 +119,7 @@ def classify_gazette(content, doc_id, divert_api_key, divert_url):
             "type": classification_type,
             "reasoning": reasoning_line if reasoning_line else llm_response,
             "raw_response": llm_response,
+            "retries": retries,
             "success": True
         }
         
@@ -97,6 +129,7 @@ def classify_gazette(content, doc_id, divert_api_key, divert_url):
             "type": "NOT CATEGORISED",
             "reasoning": f"API request failed: {str(e)}",
             "raw_response": None,
+            "retries": retries,
             "success": False
         }
     except KeyError as e:
@@ -105,6 +138,7 @@ def classify_gazette(content, doc_id, divert_api_key, divert_url):
             "type": "NOT CATEGORISED",
             "reasoning": f"Unexpected API response format: {str(e)}",
             "raw_response": response.text if 'response' in locals() else None,
+            "retries": retries,
             "success": False
         }
     except Exception as e:
@@ -113,30 +147,143 @@ def classify_gazette(content, doc_id, divert_api_key, divert_url):
             "type": "NOT CATEGORISED",
             "reasoning": f"Unexpected error: {str(e)}",
             "raw_response": None,
+            "retries": retries,
             "success": False
         }
+
+
+def get_retry_delay(response, attempt, backoff_base=1.0):
+    """
+    Work out how long to wait before retrying a throttled request
+    
+    Args:
+        response: Response with a retryable status code
+        attempt (int): Zero-based attempt number
+        backoff_base (float): Base delay in seconds for exponential backoff
         
-def save_classified_doc_metadata(metadata_list, archive_location, year):
+    Returns:
+        float: Delay in seconds (Retry-After header wins when present)
+    """
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+    return backoff_base * (2 ** attempt)
+
+        
+def get_classified_metadata_path(archive_location, year):
     
     year_folder = Path(archive_location).expanduser() / str(year)
     year_folder.mkdir(parents=True, exist_ok=True)
     
-    # Set the CSV file path
-    csv_file_path = year_folder / "classified_metadata.csv"
+    return year_folder / "classified_metadata.csv"
+
+
+def append_classified_doc_metadata(row, archive_location, year):
+    """
+    Append a single classification to YYYY/classified_metadata.csv as soon as it completes
+    
+    Args:
+        row (tuple): (doc_id, doc_date, doc_type, reasoning)
+        archive_location (str): Local archive location
+        year (str|int): Year folder the row belongs to
+    """
+    csv_file_path = get_classified_metadata_path(archive_location, year)
+    file_exists = csv_file_path.exists() and csv_file_path.stat().st_size > 0
+    
+    # A run killed mid-write can leave a partial last line; start on a fresh one
+    needs_newline = False
+    if file_exists:
+        with open(csv_file_path, mode='rb') as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) not in (b"\n", b"\r")
     
-    # Write or append to the CSV file
-    with open(csv_file_path, mode='w', newline='', encoding='utf-8') as f:
+    # Append only, so a crash never loses rows that were already classified
+    with open(csv_file_path, mode='a', newline='', encoding='utf-8') as f:
+        if needs_newline:
+            f.write("\r\n")
         writer = csv.writer(f)
-        writer.writerow(["Document ID", "Document Date", "Gazette Type", "Reasoning"])
-        for row in metadata_list:
-            writer.writerow(row)
+        if not file_exists:
+            writer.writerow(CLASSIFIED_METADATA_HEADER)
+        writer.writerow(row)
+        f.flush()
+    
+    return
+
 
-    print(f"[✓] Metadata saved to {csv_file_path}")
+def load_classified_doc_metadata(archive_location, year):
+    """
+    Load YYYY/classified_metadata.csv indexed by Document ID
+    
+    Rows appended later win, so the result is the latest classification per document.
+    
+    Args:
+        archive_location (str): Local archive location
+        year (str|int): Year folder to read
         
-    return
+    Returns:
+        tuple: (dict of doc_id -> row, number of rows read)
+    """
+    csv_file_path = get_classified_metadata_path(archive_location, year)
+    classified_rows = {}
+    rows_read = 0
+    
+    if not csv_file_path.exists():
+        return classified_rows, rows_read
+    
+    with open(csv_file_path, mode='r', newline='', encoding='utf-8') as f:
+        reader = csv.reader(f)
+        for row in reader:
+            if not row or row == CLASSIFIED_METADATA_HEADER:
+                continue
+            rows_read += 1
+            # Lines truncated by an interrupted run are counted but not indexed
+            if len(row) == len(CLASSIFIED_METADATA_HEADER):
+                classified_rows[row[0]] = tuple(row)
+    
+    return classified_rows, rows_read
+
+
+def compact_classified_doc_metadata(archive_location, year, force=False):
+    """
+    Compact YYYY/classified_metadata.csv so it holds one row per Document ID
+    
+    Readers keep the latest row per document, so superseded rows are harmless and the file is
+    only rewritten once they reach COMPACT_STALE_RATIO of the documents (or with force). The
+    rewrite goes through a temporary file that atomically replaces the original.
+    
+    Args:
+        archive_location (str): Local archive location
+        year (str|int): Year folder to compact
+        force (bool): Rewrite whenever there is any superseded or truncated row
+        
+    Returns:
+        int: Number of superseded/truncated rows removed (0 when the file was left as is)
+    """
+    csv_file_path = get_classified_metadata_path(archive_location, year)
+    classified_rows, rows_read = load_classified_doc_metadata(archive_location, year)
+    stale_rows = rows_read - len(classified_rows)
+    
+    if stale_rows == 0 or (not force and stale_rows < COMPACT_STALE_RATIO * len(classified_rows)):
+        print(f"[✓] Metadata saved in {csv_file_path} ({len(classified_rows)} documents, {stale_rows} superseded rows)")
+        return 0
+    
+    tmp_file_path = csv_file_path.with_suffix(".csv.tmp")
+    with open(tmp_file_path, mode='w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(CLASSIFIED_METADATA_HEADER)
+        for row in classified_rows.values():
+            writer.writerow(row)
+    os.replace(tmp_file_path, csv_file_path)
+    
+    print(f"[✓] Metadata compacted in {csv_file_path} ({stale_rows} superseded/truncated rows removed, {len(classified_rows)} documents)")
+    
+    return stale_rows
 
 
-def prepare_classified_metadata(llm_ready_texts, divert_api_key, divert_url ):
+def prepare_classified_metadata(llm_ready_texts, divert_api_key, divert_url, archive_location=None, year=None):
     classified_metadata = []
     classified_metadata_dic = {}
         
@@ -157,6 +304,9 @@ def prepare_classified_metadata(llm_ready_texts, divert_api_key, divert_url ):
             print(f"Error: {res['reasoning']}")
         # Append metadata for later saving
         classified_metadata.append((doc_id, doc_date, doc_type, doc_type_reason))
+        # Persist each classification as soon as it completes
+        if archive_location is not None and year is not None:
+            append_classified_doc_metadata((doc_id, doc_date, doc_type, doc_type_reason), archive_location, year)
         classified_metadata_dic[doc_id] = {
             'date': doc_date,
             'doc_type': doc_type,
@@ -0,0 +1,238 @@
+import argparse
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Gazette type numbers understood by classify_gazette (see GAZETTE_CLASSIFICATION_PROMPT)
+MOCK_TYPE_NUMBERS = list(range(1, 11))
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal")
+
+
+class MockChatCompletionsHandler(BaseHTTPRequestHandler):
+    """
+    Answers OpenAI-style chat completion requests with deterministic classifications.
+    Latency, 429 throttling and 5xx errors are injected according to the server settings.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length) if length else b""
+
+        try:
+            payload = json.loads(body or b"{}")
+            prompt = payload["messages"][-1]["content"]
+        except (ValueError, KeyError, IndexError, TypeError):
+            server.record("bad_requests")
+            self._send_json(400, {"error": {"message": "Invalid chat completion payload"}})
+            return
+
+        time.sleep(server.sample_latency())
+
+        outcome = server.sample_outcome()
+        if outcome == "rate_limited":
+            server.record("rate_limited")
+            self._send_json(
+                429,
+                {"error": {"message": "Rate limit reached (mock)", "type": "rate_limit_error"}},
+                extra_headers={"Retry-After": f"{server.retry_after:g}"}
+            )
+            return
+        if outcome == "error":
+            server.record("errors")
+            self._send_json(500, {"error": {"message": "Internal server error (mock)", "type": "server_error"}})
+            return
+
+        server.record("completions")
+        self._send_json(200, build_mock_completion(prompt, payload.get("model", "mock-chat")))
+
+    def _send_json(self, status, data, extra_headers=None):
+        encoded = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(encoded)))
+        for name, value in (extra_headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def log_message(self, format, *args):
+        # Keep benchmark output clean
+        return
+
+
+class MockLLMServer(ThreadingHTTPServer):
+    """
+    Threaded HTTP server holding the injection settings and request counters
+    """
+
+    daemon_threads = True
+
+    def __init__(self, server_address, latency_ms=50.0, latency_jitter_ms=0.0, latency_distribution="fixed",
+                 error_rate=0.0, rate_limit_rate=0.0, retry_after=0.0, seed=0):
+        super().__init__(server_address, MockChatCompletionsHandler)
+
+        if latency_distribution not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution '{latency_distribution}'. Use one of: {', '.join(LATENCY_DISTRIBUTIONS)}")
+
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.latency_distribution = latency_distribution
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {
+            "requests": 0,
+            "completions": 0,
+            "rate_limited": 0,
+            "errors": 0,
+            "bad_requests": 0
+        }
+
+    def sample_latency(self):
+        """Draw a response delay in seconds from the configured distribution"""
+        mean = self.latency_ms
+        jitter = self.latency_jitter_ms
+
+        with self._lock:
+            if self.latency_distribution == "uniform":
+                value = self._random.uniform(mean - jitter, mean + jitter)
+            elif self.latency_distribution == "normal":
+                value = self._random.gauss(mean, jitter)
+            elif self.latency_distribution == "lognormal" and mean > 0:
+                # latency_ms is the median, jitter controls the spread of the tail
+                sigma = jitter / mean if jitter else 0.0
+                value = self._random.lognormvariate(math.log(mean), sigma)
+            else:
+                value = mean
+
+        return max(0.0, value) / 1000.0
+
+    def sample_outcome(self):
+        """Decide whether this request succeeds, gets throttled or fails"""
+        with self._lock:
+            self.stats["requests"] += 1
+            roll = self._random.random()
+
+        if roll < self.rate_limit_rate:
+            return "rate_limited"
+        if roll < self.rate_limit_rate + self.error_rate:
+            return "error"
+        return "ok"
+
+    def record(self, counter):
+        with self._lock:
+            self.stats[counter] += 1
+
+
+def build_mock_completion(prompt, model):
+    """
+    Build a chat completion whose answer depends only on the prompt text
+
+    Args:
+        prompt: Prompt sent by classify_gazette
+        model: Model name echoed back to the client
+
+    Returns:
+        Dict shaped like an OpenAI chat completion response
+    """
+
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    type_number = MOCK_TYPE_NUMBERS[int(digest[:8], 16) % len(MOCK_TYPE_NUMBERS)]
+    content = f"Type: {type_number}\nReasoning: Deterministic mock classification (prompt digest {digest[:12]})"
+
+    return {
+        "id": f"chatcmpl-mock-{digest[:16]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }
+        ],
+        "usage": {
+            "prompt_tokens": len(prompt.split()),
+            "completion_tokens": len(content.split()),
+            "total_tokens": len(prompt.split()) + len(content.split())
+        }
+    }
+
+
+def start_mock_llm_server(host="127.0.0.1", port=0, **settings):
+    """
+    Start the mock chat completions server on a background thread
+
+    Args:
+        host: Interface to bind
+        port: Port to bind (0 picks a free port)
+        **settings: Injection settings accepted by MockLLMServer
+
+    Returns:
+        Tuple of (server, url) where url is the chat completions endpoint
+    """
+
+    server = MockLLMServer((host, port), **settings)
+    thread = threading.Thread(target=server.serve_forever, name="mock-llm-server", daemon=True)
+    thread.start()
+
+    bound_host, bound_port = server.server_address[:2]
+    url = f"http://{bound_host}:{bound_port}/v1/chat/completions"
+    return server, url
+
+
+def stop_mock_llm_server(server):
+    """Shut down a server started by start_mock_llm_server()"""
+    server.shutdown()
+    server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible mock chat completions server")
+    parser.add_argument('--host', type=str, default="127.0.0.1", help='Interface to bind')
+    parser.add_argument('--port', type=int, default=8089, help='Port to bind')
+    parser.add_argument('--latency-ms', type=float, default=50.0, help='Mean (or median for lognormal) latency in ms')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='Latency spread in ms')
+    parser.add_argument('--distribution', type=str, default="fixed", choices=LATENCY_DISTRIBUTIONS, help='Latency distribution')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 500')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of requests answered with HTTP 429')
+    parser.add_argument('--retry-after', type=float, default=0.0, help='Retry-After seconds sent with 429 responses')
+    parser.add_argument('--seed', type=int, default=0, help='Seed for latency and error injection')
+    args = parser.parse_args()
+
+    server = MockLLMServer(
+        (args.host, args.port),
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.jitter_ms,
+        latency_distribution=args.distribution,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        seed=args.seed
+    )
+    print(f"🧪 Mock chat completions server listening on http://{args.host}:{server.server_address[1]}/v1/chat/completions")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"📊 Mock server stats: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import sqlite3
+import time
+from pathlib import Path
+
+SEARCH_INDEX_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS documents (
+        id INTEGER PRIMARY KEY,
+        doc_id TEXT NOT NULL,
+        lang TEXT NOT NULL,
+        date TEXT,
+        doc_type TEXT,
+        UNIQUE (doc_id, lang)
+    );
+    CREATE INDEX IF NOT EXISTS documents_lang_date ON documents (lang, date);
+    CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+        text,
+        tokenize = 'unicode61 remove_diacritics 2'
+    );
+"""
+
+
+def get_search_index_path(config):
+    index_path = config.get("search", {}).get("index_path")
+    if index_path:
+        return Path(index_path).expanduser()
+    return Path(config["archive"]["archive_location"]).expanduser() / "search_index.sqlite3"
+
+
+def open_search_index(index_path):
+    """
+    Open (and create if needed) the full-text search index
+
+    Args:
+        index_path: Location of the SQLite file holding the FTS5 index
+
+    Returns:
+        sqlite3 connection
+    """
+
+    index_path = Path(index_path).expanduser()
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+
+    conn = sqlite3.connect(str(index_path))
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SEARCH_INDEX_SCHEMA)
+    return conn
+
+
+def index_extracted_texts(conn, extracted_texts, lang, classified_metadata_dic=None):
+    """
+    Add or replace the text of successfully extracted documents in the index
+
+    Args:
+        conn: Connection from open_search_index()
+        extracted_texts: Dict from extract_text_from_pdf()
+        lang: Language code of the documents (en/si/ta)
+        classified_metadata_dic: Optional classifications to store alongside the text
+
+    Returns:
+        Number of documents indexed
+    """
+
+    classified_metadata_dic = classified_metadata_dic or {}
+    indexed = 0
+
+    with conn:
+        for doc_id, doc_data in extracted_texts.items():
+            if doc_data.get("status") != "success" or not doc_data.get("text"):
+                continue
+
+            doc_type = classified_metadata_dic.get(doc_id, {}).get("doc_type")
+            row = conn.execute("SELECT id, doc_type FROM documents WHERE doc_id = ? AND lang = ?", (doc_id, lang)).fetchone()
+
+            if row:
+                rowid = row[0]
+                conn.execute(
+                    "UPDATE documents SET date = ?, doc_type = ? WHERE id = ?",
+                    (doc_data.get("date"), doc_type or row[1], rowid)
+                )
+                conn.execute("DELETE FROM documents_fts WHERE rowid = ?", (rowid,))
+            else:
+                rowid = conn.execute(
+                    "INSERT INTO documents (doc_id, lang, date, doc_type) VALUES (?, ?, ?, ?)",
+                    (doc_id, lang, doc_data.get("date"), doc_type)
+                ).lastrowid
+
+            conn.execute("INSERT INTO documents_fts (rowid, text) VALUES (?, ?)", (rowid, doc_data["text"]))
+            indexed += 1
+
+    print(f"🔎 Indexed {indexed} documents for full-text search")
+    return indexed
+
+
+def update_indexed_doc_types(conn, classified_metadata_dic, lang):
+    """
+    Store classification results for documents that are already indexed
+
+    Args:
+        conn: Connection from open_search_index()
+        classified_metadata_dic: Dict from prepare_classified_metadata()
+        lang: Language code of the documents (en/si/ta)
+    """
+
+    with conn:
+        conn.executemany(
+            "UPDATE documents SET doc_type = ? WHERE doc_id = ? AND lang = ?",
+            [(data.get("doc_type"), doc_id, lang) for doc_id, data in classified_metadata_dic.items()]
+        )
+
+
+def quote_search_query(query):
+    """Turn free text into an FTS5 query of quoted terms (for input with FTS5 syntax characters)"""
+    terms = [term.replace('"', '""') for term in query.split()]
+    return " ".join(f'"{term}"' for term in terms if term)
+
+
+def search_index(conn, query, limit=10, lang=None, year=None):
+    """
+    Run a ranked full-text query over the indexed gazettes
+
+    Args:
+        conn: Connection from open_search_index()
+        query: FTS5 query (plain words work; falls back to quoting on syntax errors)
+        limit: Maximum number of hits
+        lang: Only return documents in this language
+        year: Only return documents from this year
+
+    Returns:
+        List of hit dicts (doc_id, date, lang, doc_type, snippet, score), best first
+        (empty when the query has no searchable term)
+    """
+
+    sql = """
+        SELECT d.doc_id, d.date, d.lang, d.doc_type,
+               snippet(documents_fts, 0, '[', ']', ' … ', 16),
+               bm25(documents_fts)
+        FROM documents_fts
+        JOIN documents d ON d.id = documents_fts.rowid
+        WHERE documents_fts MATCH ?
+    """
+    filters = []
+    if lang:
+        sql += " AND d.lang = ?"
+        filters.append(lang)
+    if year:
+        sql += " AND d.date LIKE ?"
+        filters.append(f"{year}-%")
+    sql += " ORDER BY rank LIMIT ?"
+
+    try:
+        rows = conn.execute(sql, [query, *filters, limit]).fetchall()
+    except sqlite3.OperationalError:
+        quoted_query = quote_search_query(query)
+        # Empty or punctuation-only input has no term to match
+        if not quoted_query:
+            return []
+        try:
+            rows = conn.execute(sql, [quoted_query, *filters, limit]).fetchall()
+        except sqlite3.OperationalError as e:
+            print(f"⚠️ Could not run search query '{query}': {e}")
+            return []
+
+    return [
+        {
+            "doc_id": doc_id,
+            "date": date,
+            "lang": doc_lang,
+            "doc_type": doc_type,
+            "snippet": " ".join(snippet.split()),
+            "score": round(-score, 4)
+        }
+        for doc_id, date, doc_lang, doc_type, snippet, score in rows
+    ]
+
+
+def run_search_command(args, config):
+    """
+    Entry point for `gztarchiver search`
+
+    Args:
+        args: Parsed arguments from parse_search_args()
+        config: Loaded config.yaml
+
+    Returns:
+        Process exit code
+    """
+
+    index_path = get_search_index_path(config)
+    if not index_path.exists():
+        print(f"❌ No search index at {index_path}. Run the archiver first to build it.")
+        return 1
+
+    conn = open_search_index(index_path)
+    try:
+        started = time.perf_counter()
+        hits = search_index(conn, args.query, limit=args.limit, lang=args.lang, year=args.year)
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+    finally:
+        conn.close()
+
+    print(f"🔎 {len(hits)} hits for '{args.query}' ({elapsed_ms:.1f} ms)\n")
+    for rank, hit in enumerate(hits, 1):
+        print(f"{rank}. {hit['doc_id']} | {hit['date']} | {hit['lang']} | {hit['doc_type'] or 'UNCLASSIFIED'} | score {hit['score']}")
+        print(f"   {hit['snippet']}")
+
+    return 0
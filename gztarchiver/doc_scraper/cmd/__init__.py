@@ -1,7 +1,13 @@
-from .parser import parse_args
+from .parser import parse_args, parse_benchmark_args, parse_export_args, parse_search_args, parse_watch_args, parse_verify_args, parse_interval
 from .validator import identify_input_kind
 
 __all__ = [
     "parse_args",
+    "parse_benchmark_args",
+    "parse_export_args",
+    "parse_search_args",
+    "parse_watch_args",
+    "parse_verify_args",
+    "parse_interval",
     "identify_input_kind"
 ]
\ No newline at end of file
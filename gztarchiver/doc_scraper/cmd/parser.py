@@ -1,12 +1,121 @@
 import argparse
+import re
+from datetime import date, timedelta
+
+INTERVAL_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+def parse_interval(value):
+    """argparse type for durations like 90s, 15m, 2h or 1d (plain numbers are seconds)"""
+    match = re.fullmatch(r"\s*(\d+(?:\.\d+)?)\s*([smhd]?)\s*", str(value).lower())
+    if not match or float(match.group(1)) <= 0:
+        raise argparse.ArgumentTypeError(f"invalid interval '{value}' (use e.g. 90s, 15m, 2h)")
+    return float(match.group(1)) * INTERVAL_UNITS[match.group(2) or "s"]
+
+def parse_date_arg(value):
+    """argparse type for --from/--to: YYYY-MM-DD, today, yesterday or days back such as 10d"""
+    value = str(value).strip().lower()
+    today = date.today()
+    if value == "today":
+        return today
+    if value == "yesterday":
+        return today - timedelta(days=1)
+    if re.fullmatch(r"\d+d", value):
+        return today - timedelta(days=int(value[:-1]))
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid date '{value}' (use YYYY-MM-DD, today, yesterday or e.g. 10d)")
 
 def parse_args():
     parser = argparse.ArgumentParser(description="Gazette Document Downloader CLI")
 
-    parser.add_argument('--year', type=int, required=True, help='Year of documents (e.g. 2025)')
+    parser.add_argument('--year', type=int, help='Year of documents (e.g. 2025); required unless --from is given')
     parser.add_argument('--month', type=int, choices=range(1, 13), help='Month of documents (1-12)')
     parser.add_argument('--day', type=int, choices=range(1, 32), help='Day of documents (1-31)')
+    parser.add_argument('--from', dest='date_from', type=parse_date_arg, help='First publication date of a range (YYYY-MM-DD, or e.g. 10d for 10 days ago); may span several years')
+    parser.add_argument('--to', dest='date_to', type=parse_date_arg, help='Last publication date of the range (default: today)')
     parser.add_argument('--lang', type=str, required=True, help='Language code (e.g. "en", "si", "ta")')
     parser.add_argument('--config', type=str, required=True, help='Config to the programme')
+    parser.add_argument('--full', action='store_true', help='Process every document of the period, not only those new or changed since the last run')
     
     return parser.parse_args()
+
+def parse_benchmark_args(argv):
+    parser = argparse.ArgumentParser(prog="gztarchiver benchmark", description="Offline benchmarks for the archiving pipeline")
+    targets = parser.add_subparsers(dest="target", required=True)
+
+    classify = targets.add_parser('classify', help='Classification throughput against a local mock chat completions server')
+    classify.add_argument('--docs', type=int, default=200, help='Number of synthetic documents to classify')
+    classify.add_argument('--doc-chars', type=int, default=3000, help='Approximate characters per synthetic document')
+    classify.add_argument('--workers', type=int, default=1, help='Concurrent classification requests')
+    classify.add_argument('--url', type=str, help='Use this chat completions endpoint instead of the bundled mock server')
+    classify.add_argument('--latency-ms', type=float, default=50.0, help='Mock server mean (median for lognormal) latency in ms')
+    classify.add_argument('--jitter-ms', type=float, default=0.0, help='Mock server latency spread in ms')
+    classify.add_argument('--distribution', type=str, default="fixed", choices=["fixed", "uniform", "normal", "lognormal"], help='Mock server latency distribution')
+    classify.add_argument('--error-rate', type=float, default=0.0, help='Fraction of mock requests answered with HTTP 500')
+    classify.add_argument('--rate-limit-rate', type=float, default=0.0, help='Fraction of mock requests answered with HTTP 429')
+    classify.add_argument('--retry-after', type=float, default=0.0, help='Retry-After seconds sent with mock 429 responses')
+    classify.add_argument('--max-retries', type=int, default=3, help='Retries per document on 429/5xx')
+    classify.add_argument('--backoff-base', type=float, default=0.05, help='Base backoff in seconds between retries')
+    classify.add_argument('--seed', type=int, default=0, help='Seed for the corpus and the injected faults')
+    classify.add_argument('--report', type=str, help='Write the benchmark report to this JSON file')
+    classify.add_argument('--min-docs-per-sec', type=float, help='Fail (exit 1) below this throughput')
+    classify.add_argument('--max-p99-ms', type=float, help='Fail (exit 1) above this p99 latency')
+
+    parse_table = targets.add_parser('parse-table', help='Year table parsing and metadata loading on a saved (or synthetic) table page')
+    parse_table.add_argument('--html', type=str, help='Saved year table page to parse (default: a synthetic page)')
+    parse_table.add_argument('--rows', type=int, default=5000, help='Rows of the synthetic page when --html is not given')
+    parse_table.add_argument('--save-html', type=str, help='Also write the synthetic page to this file')
+    parse_table.add_argument('--lang', type=str, default="en", choices=["en", "si", "ta"], help='Language whose download links are extracted')
+    parse_table.add_argument('--repeat', type=int, default=3, help='Runs per measurement (the fastest is reported)')
+    parse_table.add_argument('--seed', type=int, default=0, help='Seed for the synthetic page')
+    parse_table.add_argument('--report', type=str, help='Write the benchmark report to this JSON file')
+    parse_table.add_argument('--min-rows-per-sec', type=float, help='Fail (exit 1) below this parsing throughput')
+
+    return parser.parse_args(argv)
+
+def parse_export_args(argv):
+    parser = argparse.ArgumentParser(prog="gztarchiver export", description="Export archive metadata to partitioned Parquet")
+
+    parser.add_argument('--config', type=str, required=True, help='Config to the programme')
+    parser.add_argument('--year', type=int, nargs='+', help='Years to export (default: every stored year)')
+    parser.add_argument('--output', type=str, help='Dataset folder (default: export.parquet_location from the config)')
+
+    return parser.parse_args(argv)
+
+def parse_search_args(argv):
+    parser = argparse.ArgumentParser(prog="gztarchiver search", description="Full-text search over the archived gazettes")
+
+    parser.add_argument('query', type=str, help='Words or FTS5 query to search for (e.g. "land acquisition")')
+    parser.add_argument('--config', type=str, required=True, help='Config to the programme')
+    parser.add_argument('--lang', type=str, choices=["en", "si", "ta"], help='Only return documents in this language')
+    parser.add_argument('--year', type=int, help='Only return documents from this year')
+    parser.add_argument('--limit', type=int, default=10, help='Maximum number of hits')
+
+    return parser.parse_args(argv)
+
+def parse_watch_args(argv):
+    parser = argparse.ArgumentParser(prog="gztarchiver watch", description="Keep running and archive new gazettes of the current year as they are published")
+
+    parser.add_argument('--config', type=str, required=True, help='Config to the programme')
+    parser.add_argument('--lang', type=str, nargs='+', choices=["en", "si", "ta"], help='Languages to track (default: watch.langs from the config, or en)')
+    parser.add_argument('--interval', type=parse_interval, help='Time between polls, e.g. 15m or 1h (default: watch.interval from the config, or 15m)')
+    parser.add_argument('--year', type=int, help='Track this year instead of the current one')
+    parser.add_argument('--health-port', type=int, help='Port of the /health and /status endpoint, 0 to disable (default: watch.health_port, or 8787)')
+    parser.add_argument('--once', action='store_true', help='Run a single cycle and exit (e.g. to test the setup)')
+
+    return parser.parse_args(argv)
+
+def parse_verify_args(argv):
+    parser = argparse.ArgumentParser(prog="gztarchiver verify", description="Check that the archived PDFs are complete and match the manifest or download logs")
+
+    parser.add_argument('--config', type=str, required=True, help='Config to the programme')
+    parser.add_argument('--year', type=int, nargs='+', help='Years to verify (default: all)')
+    parser.add_argument('--workers', type=int, default=16, help='Threads reading and hashing files (PDFs are opened one at a time)')
+    parser.add_argument('--no-pdf-check', action='store_true', help='Only hash the files and check the PDF header and trailer, without opening them')
+    parser.add_argument('--max-pages', type=int, default=5000, help='Highest page count considered sane')
+    parser.add_argument('--report', type=str, help='Save the JSON verification report to this path')
+    parser.add_argument('--redownload-list', type=str, help='CSV of documents to download again (default: <archive_location>/redownload.csv)')
+    parser.add_argument('--update-manifest', action='store_true', help='Mark damaged or missing documents as failed in the archive manifest and record intact files with their hash')
+
+    return parser.parse_args(argv)
@@ -1,12 +1,22 @@
 def identify_input_kind(args):
     valid_langs = {"en", "si", "ta"}
 
-    if not args.year or not args.lang:
+    date_from = getattr(args, "date_from", None)
+    date_to = getattr(args, "date_to", None)
+
+    if (not args.year and not date_from) or not args.lang:
         return "invalid-input"
 
     if args.lang not in valid_langs:
         return "invalid-lang-input"
 
+    if date_from or date_to:
+        if not date_from or args.year or args.month or args.day:
+            return "invalid-range-input"
+        if date_to and date_to < date_from:
+            return "invalid-range-input"
+        return "date-range-lang"
+
     if args.month and args.day:
         return "year-month-day-lang"
     elif args.month:
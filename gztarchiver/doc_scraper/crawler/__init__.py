@@ -1,5 +1,8 @@
-from .run_crawlers import run_crawlers_sequentially
+from .run_crawlers import run_crawlers_sequentially, run_pipeline_once
+from .watch_crawlers import run_watch
 
 __all__ = [
-    "run_crawlers_sequentially"
+    "run_crawlers_sequentially",
+    "run_pipeline_once",
+    "run_watch"
 ]
\ No newline at end of file
@@ -1,117 +1,348 @@
-from gztarchiver.doc_scraper.utils import load_years_metadata, get_year_link, hide_logs, load_doc_metadata_file, filter_doc_metadata, create_folder_structure,create_folder_structure_on_cloud, upload_local_documents_to_gdrive, filter_pdf_only, save_upload_results, get_cloud_credentials, prepare_metadata_for_db, connect_to_db, insert_docs_by_year
+from gztarchiver.doc_scraper.utils import get_year_link, hide_logs, filter_doc_metadata, create_folder_structure, prepare_metadata_for_db, get_metadata_store, export_metadata_to_parquet, start_cloud_upload_stage
+from gztarchiver.doc_scraper.utils import DateIndex, get_range_years
+from gztarchiver.doc_scraper.utils import open_archive_manifest
+from gztarchiver.doc_scraper.utils import get_metadata_snapshot_path, load_metadata_snapshot, save_metadata_snapshot, diff_doc_metadata, update_metadata_snapshot
+from scrapy import signals
 from scrapy.crawler import CrawlerRunner
-from twisted.internet import reactor, defer
+from twisted.internet import reactor, defer, threads
 from gztarchiver.document_scraper.document_scraper import YearsSpider
 from gztarchiver.document_scraper.document_scraper.spiders import DocMetadataSpider
 from gztarchiver.document_scraper.document_scraper.spiders import PDFDownloaderSpider
-from gztarchiver.doc_inspector.utils import extract_text_from_pdf, prepare_for_llm_processing, save_classified_doc_metadata, prepare_classified_metadata
-from googleapiclient.discovery import build
-import json
+from gztarchiver.doc_inspector.utils import extract_text_from_pdf, prepare_for_llm_processing, compact_classified_doc_metadata, prepare_classified_metadata, get_search_index_path, open_search_index, index_extracted_texts, update_indexed_doc_types
+import argparse
 from pathlib import Path
-from datetime import datetime
+from datetime import date
 
 
 @defer.inlineCallbacks
 def run_crawlers_sequentially(args, config, user_input_kind):
     """Run crawlers sequentially using CrawlerRunner"""
     
-    # Hide logs (scrapy)
-    settings = hide_logs()
+    # Hide logs (scrapy); crawl metrics are exported to metrics.location when set
+    settings = hide_logs((config.get("metrics") or {}).get("location"))
     
     # Initiate crawling runner
     runner = CrawlerRunner(settings=settings)
     
-    # Resolve paths
-    output_path = config["output"]["years_json"]
-    OUTPUT_PATH = Path(output_path)
-    OUTPUT_PATH.parent.mkdir(parents=True, exist_ok=True)
-    
-    output_path_doc_metadata = config["output"]["doc_metadata_json"]
-    OUTPUT_PATH_DOC_METADATA = Path(output_path_doc_metadata)
-    OUTPUT_PATH_DOC_METADATA.parent.mkdir(parents=True, exist_ok=True)
+    # Optional Google Drive backup running alongside the pipeline (cloud.enabled)
+    cloud_stage = start_cloud_upload_stage(config)
 
     try:
-        # Step 1: Scrape latest year links and save to years.json
-        print("Checking for updates from the website...")    
-        yield runner.crawl(YearsSpider, url=config["scrape"]["url"], output_path=str(output_path))
-        print(f"Updated year metadata saved to {output_path}")
-        
-        # Step 2: Validate CLI --year against scraped data
-        metadata = load_years_metadata(output_path)
-        scraped_years = [entry["year"] for entry in metadata]
+        yield run_pipeline_once(args, config, user_input_kind, runner, cloud_stage=cloud_stage)
+    except Exception as e:
+        print(f"Error during crawling: {e}")
+    finally:
+        # Let queued cloud uploads finish before shutting down
+        if cloud_stage:
+            yield threads.deferToThread(cloud_stage.close)
         
+        # Continue with post-processing
+        reactor.stop()
+
+
+@defer.inlineCallbacks
+def run_pipeline_once(args, config, user_input_kind, runner, cloud_stage=None, store=None):
+    """
+    Run one pass of the pipeline (years, table, downloads, post-processing) without stopping the reactor
+    
+    Used once by run_crawlers_sequentially() and once per cycle by `gztarchiver watch`, which
+    keeps the runner, the cloud upload stage and the metadata store open between cycles.
+    
+    Args:
+        args: Parsed CLI arguments (year, month, day, date_from, date_to, lang, full)
+        config: Loaded config.yaml
+        user_input_kind: Result of identify_input_kind()
+        runner: CrawlerRunner shared by every crawl
+        cloud_stage: Running CloudUploadStage, or None
+        store: Open MetadataStore to reuse, or None to open (and close) one for this pass
+    
+    Returns:
+        Deferred firing with a dict: status ("ok", "no-changes" or "error"), message, documents, processed
+    """
+    
+    # Stages hand their results over in memory; the JSON files are only written as snapshots (output.write_snapshots)
+    write_snapshots = config["output"].get("write_snapshots", False)
+    output_path = get_snapshot_output_path(config, "years_json", write_snapshots)
+    output_path_doc_metadata = get_snapshot_output_path(config, "doc_metadata_json", write_snapshots)
+    output_path_download = get_snapshot_output_path(config, "download_metadata_json", write_snapshots)
+    
+    result = {"status": "ok", "message": "", "documents": 0, "processed": False}
+    date_range = user_input_kind == "date-range-lang"
+
+    # Step 1: Scrape latest year links (also saved to years.json when snapshots are enabled)
+    print("Checking for updates from the website...")    
+    metadata, _ = yield crawl_and_collect(runner, YearsSpider, url=config["scrape"]["url"], output_path=output_path)
+    if output_path:
+        print(f"Updated year metadata saved to {output_path}")
+    
+    # Step 2: Validate CLI --year (or the years a --from/--to range touches) against scraped data
+    scraped_years = [entry["year"] for entry in metadata]
+    
+    if date_range:
+        date_to = args.date_to or date.today()
+        range_years = get_range_years(args.date_from, date_to)
+        years = [year for year in range_years if str(year) in scraped_years]
+        skipped_years = [str(year) for year in range_years if str(year) not in scraped_years]
+        if skipped_years:
+            print(f"⚠️ No table for {', '.join(skipped_years)} on the website, skipping")
+        if not years:
+            print(f"Error: No year between {args.date_from} and {date_to} is available in scraped data.")
+            print(f"Available years: {', '.join(scraped_years)}")
+            result.update(status="error", message=f"No year of {args.date_from}..{date_to} is available")
+            return result
+        print(f"✅ Date range {args.date_from} to {date_to} touches {', '.join(str(year) for year in years)}")
+        print(f"Parameters: from={args.date_from}, to={date_to}, lang={args.lang}")
+    else:
         if str(args.year) not in scraped_years:
             print(f"Error: Year '{args.year}' is not available in scraped data.")
             print(f"Available years: {', '.join(scraped_years)}")
-            reactor.stop()
-            return
+            result.update(status="error", message=f"Year {args.year} is not available")
+            return result
 
         # Step 3: Continue processing with valid input
         print(f"✅ Year '{args.year}' is valid.")
         print(f"Parameters: year={args.year}, month={args.month}, day={args.day}, lang={args.lang}")
-        
+        years = [args.year]
+    
+    # Step 4: Scrape the table metadata of each year page the request touches (only those)
+    rows_by_year = {}
+    for year in years:
         # Get the URL corresponding to the relevant year
-        year_url = get_year_link(args.year, metadata)
+        year_url = get_year_link(year, metadata)
         
         if year_url:
             print(f"✅ Year link: {year_url}")
         else:
-            print("❌ Year not found in metadata.")
-            reactor.stop()
-            return
-            
-        # Step 4: Scrape the table metadata for the relevant year URL
-        yield runner.crawl(DocMetadataSpider, url=year_url, lang=str(args.lang), output_path=str(output_path_doc_metadata))
+            print(f"❌ Year {year} not found in metadata.")
+            result.update(status="error", message=f"Year {year} has no link")
+            return result
         
-        # Step 5: Filter the metadata based on the input kind
-        doc_metadata = load_doc_metadata_file(output_path_doc_metadata)
-
+        year_output_path = get_year_snapshot_path(output_path_doc_metadata, year) if date_range else output_path_doc_metadata
+        rows_by_year[year], _ = yield crawl_and_collect(runner, DocMetadataSpider, url=year_url, lang=str(args.lang), output_path=year_output_path)
+    
+    # Step 5: Filter the metadata based on the input kind
+    if date_range:
+        # One date-sorted index over every fetched year; the range is two bisect lookups
+        date_index = DateIndex(rows_by_year)
+        selected_by_year = date_index.range_by_year(args.date_from, date_to)
+        selected_count = sum(len(rows) for rows in selected_by_year.values())
+        status = f"{selected_count} Documents found from {args.date_from} to {date_to} ({len(date_index)} rows indexed)"
+    else:
         filtered_doc_metadata, status = filter_doc_metadata(
-            doc_metadata, 
+            rows_by_year[args.year], 
             user_input_kind, 
             year=str(args.year), 
             month=str(args.month),
             date=str(args.day)
         )
+        selected_by_year = {args.year: filtered_doc_metadata}
+    
+    print(f"Status : {status}")
+    
+    # Steps 5b-8 run per year page: archive logs, snapshots and classified metadata are kept per year
+    year_results = []
+    for year in years:
+        year_args = argparse.Namespace(**vars(args))
+        year_args.year = year
+        if date_range:
+            print(f"\n📅 Processing {year}")
+        year_result = yield process_year_documents(
+            year_args, config, selected_by_year.get(year, []), runner,
+            cloud_stage=cloud_stage, store=store, output_path_download=output_path_download
+        )
+        year_results.append(year_result)
+    
+    result["documents"] = sum(year_result["documents"] for year_result in year_results)
+    result["processed"] = any(year_result["processed"] for year_result in year_results)
+    failed = [year_result for year_result in year_results if year_result["status"] == "error"]
+    if failed:
+        result.update(status="error", message=failed[0]["message"])
+    elif all(year_result["status"] == "no-changes" for year_result in year_results):
+        result.update(status="no-changes", message="No new or changed documents")
+    
+    return result
+
+
+@defer.inlineCallbacks
+def process_year_documents(args, config, filtered_doc_metadata, runner, cloud_stage=None, store=None, output_path_download=None):
+    """
+    Download and post-process the selected rows of one year page (steps 5b to 8)
+    
+    Returns:
+        Deferred firing with a dict: status ("ok", "no-changes" or "error"), message, documents, processed
+    """
+    
+    cloud_sweep = None
+    manifest = None
+    result = {"status": "ok", "message": "", "documents": 0, "processed": False}
+    
+    try:
+        # Step 5b: Keep only rows that are new or changed since the last run (--full processes everything)
+        snapshot_path = get_metadata_snapshot_path(config, args.year, args.lang)
+        snapshot_rows = load_metadata_snapshot(snapshot_path)
+        refresh_doc_ids = set()
+        
+        if getattr(args, "full", False):
+            print(f"🔁 Full run: processing all {len(filtered_doc_metadata)} documents")
+        else:
+            filtered_doc_metadata, refresh_doc_ids, delta_summary = diff_doc_metadata(filtered_doc_metadata, snapshot_rows)
+            print(f"🔍 Delta since last run: {delta_summary['new']} new, {delta_summary['changed']} changed, "
+                  f"{delta_summary['unchanged']} unchanged")
         
-        print(f"Status : {status}")
+        result["documents"] = len(filtered_doc_metadata)
         
-        # Step 6: Create the folder structure for the filtered data and get download metadata
+        # Step 6: Plan the download metadata; folders are created only when a file is written,
+        # and the archive manifest answers existence checks instead of the filesystem
         archive_location = config["archive"]["archive_location"]
         ARCHIHVE_LOCATION = Path(archive_location)
-        all_download_metadata = create_folder_structure(ARCHIHVE_LOCATION, filtered_doc_metadata)
+        manifest = open_archive_manifest(config)
+        all_download_metadata = create_folder_structure(ARCHIHVE_LOCATION, filtered_doc_metadata, manifest=manifest, lang=args.lang)
                         
         # Step 7: Download the documents
         if all_download_metadata:
-            output_path_download = config["output"]["download_metadata_json"]
-            OUTPUT_PATH_DOWNLOAD = Path(output_path_download)
-            OUTPUT_PATH_DOWNLOAD.parent.mkdir(parents=True, exist_ok=True)
-            
-            yield runner.crawl(PDFDownloaderSpider, download_metadata=all_download_metadata, output_path=str(output_path_download))
+            _, download_spider = yield crawl_and_collect(
+                runner,
+                PDFDownloaderSpider,
+                download_metadata=all_download_metadata,
+                output_path=output_path_download,
+                on_document_saved=cloud_stage.submit if cloud_stage else None,
+                upload_backlog_full=cloud_stage.is_full if cloud_stage else None,
+                refresh_doc_ids=refresh_doc_ids,
+                # Every selected row reaches post-processing, also when its PDF is already archived
+                reprocess_doc_ids={row.get("doc_id") for row in filtered_doc_metadata},
+                manifest=manifest,
+                lang=args.lang
+            )
             print("✅ All crawlers completed successfully!")
+            
+            # Documents archived by earlier runs go to the upload stage too (the sync manifest
+            # skips those already on Drive); queued from a thread so post-processing starts now
+            if cloud_stage:
+                archived_doc_ids = get_archived_doc_ids(all_download_metadata, manifest, args.lang)
+                cloud_sweep = threads.deferToThread(
+                    cloud_stage.submit_many,
+                    [doc for doc in all_download_metadata if doc["doc_id"] in archived_doc_ids]
+                )
                         
-            updated_all_download_metadata = load_doc_metadata_file(output_path_download)
+            # The spider keeps every selected row (archived ones are reprocessed) and marks failed downloads Unavailable
+            updated_all_download_metadata = download_spider.download_metadata
+            # Text extraction, classification and the database writes run in the reactor's thread
+            # pool so the reactor keeps serving the cloud stage and other crawls meanwhile
+            processed = yield threads.deferToThread(post_crawl_processing, args, config, updated_all_download_metadata, archive_location, store)
             
-            if updated_all_download_metadata:
-                yield defer.maybeDeferred(post_crawl_processing, args, config, updated_all_download_metadata, archive_location)
+            # Step 8: Remember what was processed so the next run only sees what changed after it
+            if processed:
+                commit_metadata_snapshot(snapshot_path, snapshot_rows, filtered_doc_metadata, updated_all_download_metadata, download_spider.failed_downloads)
+                result["processed"] = True
             else:
-                yield defer.maybeDeferred(post_crawl_processing, args, config, all_download_metadata, archive_location)
+                print("⚠️ Post-processing failed, the metadata snapshot was not updated")
+                result.update(status="error", message="Post-processing failed")
         else:
             print("No documents to download")
-            
-    except Exception as e:
-        print(f"Error during crawling: {e}")
+            result.update(status="no-changes", message="No new or changed documents")
     finally:
-        # Continue with post-processing
-        reactor.stop()
+        # The sweep only queues documents; uploads continue in the stage after this pass
+        if cloud_sweep is not None:
+            yield cloud_sweep
+        if manifest:
+            manifest.close()
+    
+    return result
+
+
+@defer.inlineCallbacks
+def crawl_and_collect(runner, spider_cls, **spider_kwargs):
+    """
+    Run a spider and collect the items it yields in memory
+    
+    Returns:
+        Deferred firing with (list of scraped items, spider instance after the crawl)
+    """
+    
+    crawler = runner.create_crawler(spider_cls)
+    items = []
+    
+    # Signal receivers are weakly referenced; this frame keeps the handler alive during the crawl
+    def collect_item(item):
+        items.append(item)
+    
+    crawler.signals.connect(collect_item, signal=signals.item_scraped)
+    yield runner.crawl(crawler, **spider_kwargs)
+    return items, crawler.spider
+
+
+def get_year_snapshot_path(output_path, year):
+    """Per-year variant of a snapshot path (doc_metadata.jsonl -> doc_metadata_2024.jsonl), None stays None"""
+    if not output_path:
+        return None
+    path = Path(output_path)
+    return str(path.with_name(f"{path.stem}_{year}{path.suffix}"))
+
+
+def get_snapshot_output_path(config, output_key, write_snapshots):
+    """Path of an optional stage snapshot file from the output section, or None when snapshots are off"""
+    
+    output_path = config["output"].get(output_key)
+    if not write_snapshots or not output_path:
+        return None
+    Path(output_path).parent.mkdir(parents=True, exist_ok=True)
+    return str(output_path)
+
+
+def get_archived_doc_ids(all_download_metadata, manifest=None, lang=None):
+    """IDs of the documents whose PDF is in the archive, from the manifest or (without one) the filesystem"""
+    
+    if manifest:
+        entries = manifest.get_entries((doc["doc_id"] for doc in all_download_metadata), lang)
+        return {doc_id for doc_id, entry in entries.items() if entry["status"] == "archived"}
+    return {doc["doc_id"] for doc in all_download_metadata if Path(doc["file_path"]).exists()}
+
+
+def commit_metadata_snapshot(snapshot_path, snapshot_rows, doc_metadata, processed_download_metadata, failed_doc_ids=()):
+    """
+    Add the rows of this run to the snapshot
+    
+    Args:
+        snapshot_path: Snapshot file from get_metadata_snapshot_path()
+        snapshot_rows: Dict from load_metadata_snapshot()
+        doc_metadata: Table rows selected for this run
+        processed_download_metadata: Download metadata that went through post-processing
+        failed_doc_ids: Documents whose download failed in this run (left for the next run,
+                        also when an older PDF of a refreshed document is still on disk)
+    """
+    
+    processed_doc_ids = {doc["doc_id"] for doc in processed_download_metadata}
+    failed_doc_ids = set(failed_doc_ids)
+    processed_rows = [
+        row for row in doc_metadata
+        if row.get("doc_id") in processed_doc_ids and row.get("doc_id") not in failed_doc_ids
+    ]
+    
+    recorded = update_metadata_snapshot(snapshot_rows, processed_rows)
+    save_metadata_snapshot(snapshot_path, snapshot_rows)
+    print(f"📸 Metadata snapshot updated: {recorded} documents recorded, "
+          f"{len(doc_metadata) - recorded} left for the next run ({snapshot_path})")
+
 
 # TODO: i have to send filtered_doc_metadata instead of the upload_metadata , otherwise if the create_folder_structure_on_cloud fails , the program stops from there.
-def post_crawl_processing(args, config, all_download_metadata, archive_location):
-    """Handle post-crawl processing (Data preprocessing, etc.)"""
+def post_crawl_processing(args, config, all_download_metadata, archive_location, store=None):
+    """Handle post-crawl processing (Data preprocessing, etc.); an open store is reused and left open"""
+    search_conn = None
     try:
         # Extract data from the pdf files      
         extracted_texts = extract_text_from_pdf(all_download_metadata)
         
+        # Keep the extracted text searchable (gztarchiver search); the index is a convenience,
+        # so a failure here must not keep the metadata out of the store
+        try:
+            search_conn = open_search_index(get_search_index_path(config))
+            index_extracted_texts(search_conn, extracted_texts, args.lang)
+        except Exception as e:
+            print(f"⚠️ Search index not updated: {e}")
+            if search_conn:
+                search_conn.close()
+                search_conn = None
+        
         # Preprocess the extracted data to be used on LLM
         llm_ready_texts = prepare_for_llm_processing(extracted_texts)
         
@@ -119,27 +350,53 @@ def post_crawl_processing(args, config, all_download_metadata, archive_location)
         divert_url = config["credentials"]["divert_url_deep_seek"]
         
         # TODO : we can achive this using only a dictionary (no need of bot list and dic)
-        # Classification process of the pdfs'
-        classified_metadata, classified_metadata_dic = prepare_classified_metadata(llm_ready_texts, divert_api_key, divert_url)
+        # Classification process of the pdfs' (each result is appended to classified_metadata.csv as it completes)
+        classified_metadata, classified_metadata_dic = prepare_classified_metadata(llm_ready_texts, divert_api_key, divert_url, archive_location, args.year)
        
-        # BUG : data is not relaiable, issue when saving, rewrite the whole file again in the next run   
-        # Saving the classified metadata of the pdfs'
-        save_classified_doc_metadata(classified_metadata, archive_location, args.year)
+        # Drop rows superseded by earlier runs once there are enough of them to be worth a rewrite
+        compact_classified_doc_metadata(archive_location, args.year)
         
-        # Processing metadata to upload to the database
-        prepared_metadata_to_store = prepare_metadata_for_db(all_download_metadata, classified_metadata_dic, config)
+        if search_conn:
+            try:
+                update_indexed_doc_types(search_conn, classified_metadata_dic, args.lang)
+            except Exception as e:
+                print(f"⚠️ Search index document types not updated: {e}")
         
-        # Establish db connection and upload process        
-        uri = config["db_credentials"]["mongo_db_uri"]
+        # Processing metadata to upload to the database
+        prepared_metadata_to_store = prepare_metadata_for_db(all_download_metadata, classified_metadata_dic, config, extracted_texts, args.lang)
         
-        client = connect_to_db(uri)
+        # Open the configured metadata store (MongoDB, or the embedded SQLite store) and upload
+        own_store = store is None
+        if own_store:
+            store = get_metadata_store(config, [args.year])
         
         # TODO : update the schema of the backend for CRUD
-        if client:
-            db = client["doc_db"]
-            insert_docs_by_year(db, prepared_metadata_to_store, args.year)
+        if store:
+            try:
+                store.insert_docs_by_year(prepared_metadata_to_store, args.year)
+                
+                # Refresh the Parquet partitions of this year if an export location is configured
+                parquet_location = config.get("export", {}).get("parquet_location")
+                if parquet_location:
+                    # The export is derived from the store and can be rebuilt, so a failure never fails the ingest
+                    try:
+                        export_metadata_to_parquet(store, parquet_location, [args.year])
+                    except ImportError as e:
+                        print(f"⚠️ Skipping Parquet export: {e}")
+                    except Exception as e:
+                        print(f"⚠️ Parquet export failed, the metadata was stored: {e}")
+            finally:
+                if own_store:
+                    store.close()
         else:
-            print("❌ Failed uploading to the mongodb")
+            print("❌ Failed storing the metadata")
+            return False
+        
+        return True
             
     except Exception as e:
-        print(f"Error during post-processing: {e}")
\ No newline at end of file
+        print(f"Error during post-processing: {e}")
+        return False
+    finally:
+        if search_conn:
+            search_conn.close()
\ No newline at end of file
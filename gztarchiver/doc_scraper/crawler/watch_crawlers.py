@@ -0,0 +1,235 @@
+import argparse
+import json
+import time
+from datetime import datetime
+
+from scrapy.crawler import CrawlerRunner
+from twisted.internet import reactor, defer, task, threads
+from twisted.web import resource, server
+
+from gztarchiver.doc_scraper.cmd import parse_interval
+from gztarchiver.doc_scraper.utils import hide_logs, get_metadata_store, start_cloud_upload_stage
+from .run_crawlers import run_pipeline_once
+
+DEFAULT_WATCH_INTERVAL = 15 * 60
+DEFAULT_HEALTH_PORT = 8787
+# Consecutive failed cycles after which /health reports the watcher as unhealthy
+DEFAULT_MAX_FAILED_CYCLES = 3
+
+
+class WatchStatus:
+    """
+    State of the watch loop, served as JSON by the health endpoint
+
+    Args:
+        langs: Languages tracked by the watcher
+        interval: Seconds between the start of two cycles
+        max_failed_cycles: Consecutive failed cycles tolerated before /health returns 503
+    """
+
+    def __init__(self, langs, interval, max_failed_cycles=DEFAULT_MAX_FAILED_CYCLES):
+        self.langs = list(langs)
+        self.interval = interval
+        self.max_failed_cycles = max_failed_cycles
+        self.started_at = datetime.now().isoformat(timespec="seconds")
+        self.state = "starting"
+        self.cycles = 0
+        self.consecutive_failures = 0
+        self.documents_processed = 0
+        self.last_cycle = None
+        self.next_cycle_at = None
+        self.cloud_stage = None
+
+    def is_healthy(self):
+        return self.consecutive_failures < self.max_failed_cycles
+
+    def record_cycle(self, year, started, results):
+        """Record the per-language results of a finished cycle"""
+
+        failed = [lang for lang, result in results.items() if result["status"] == "error"]
+        self.cycles += 1
+        self.consecutive_failures = self.consecutive_failures + 1 if failed else 0
+        self.documents_processed += sum(result["documents"] for result in results.values() if result["processed"])
+        self.last_cycle = {
+            "year": year,
+            "started_at": datetime.fromtimestamp(started).isoformat(timespec="seconds"),
+            "duration_seconds": round(time.time() - started, 1),
+            "results": results
+        }
+
+    def to_dict(self):
+        status = {
+            "healthy": self.is_healthy(),
+            "state": self.state,
+            "started_at": self.started_at,
+            "langs": self.langs,
+            "interval_seconds": self.interval,
+            "cycles": self.cycles,
+            "consecutive_failures": self.consecutive_failures,
+            "documents_processed": self.documents_processed,
+            "last_cycle": self.last_cycle,
+            "next_cycle_at": self.next_cycle_at
+        }
+        if self.cloud_stage:
+            status["cloud_upload_queue"] = self.cloud_stage.pending()
+        return status
+
+
+class WatchStatusResource(resource.Resource):
+    """GET /health (200 or 503, for probes) and GET /status (full watcher state)"""
+
+    isLeaf = True
+
+    def __init__(self, watch_status):
+        super().__init__()
+        self.watch_status = watch_status
+
+    def render_GET(self, request):
+        status = self.watch_status.to_dict()
+        path = request.path.decode("utf-8", "replace").rstrip("/")
+
+        if path in ("", "/health"):
+            body = {"healthy": status["healthy"], "state": status["state"], "cycles": status["cycles"]}
+            request.setResponseCode(200 if status["healthy"] else 503)
+        elif path == "/status":
+            body = status
+        else:
+            request.setResponseCode(404)
+            body = {"error": "not found", "endpoints": ["/health", "/status"]}
+
+        request.setHeader(b"Content-Type", b"application/json")
+        return json.dumps(body, indent=2).encode("utf-8")
+
+
+def start_health_endpoint(watch_status, port, host="127.0.0.1"):
+    """Serve WatchStatusResource on host:port from the reactor; returns the listening port"""
+    listening_port = reactor.listenTCP(port, server.Site(WatchStatusResource(watch_status)), interface=host)
+    print(f"🩺 Health endpoint listening on http://{host}:{listening_port.getHost().port}/health")
+    return listening_port
+
+
+def get_watch_settings(args, config):
+    """Merge `gztarchiver watch` options with the watch section of the config"""
+
+    watch_config = config.get("watch") or {}
+
+    interval = args.interval
+    if interval is None:
+        try:
+            interval = parse_interval(watch_config.get("interval", "15m"))
+        except argparse.ArgumentTypeError as e:
+            print(f"⚠️ {e}, using 15m")
+            interval = DEFAULT_WATCH_INTERVAL
+
+    langs = args.lang or watch_config.get("langs") or ["en"]
+    health_port = args.health_port if args.health_port is not None else watch_config.get("health_port", DEFAULT_HEALTH_PORT)
+
+    return {
+        "interval": interval,
+        "langs": [str(lang).lower() for lang in langs],
+        "year": args.year,
+        "health_host": watch_config.get("health_host", "127.0.0.1"),
+        "health_port": health_port,
+        "max_failed_cycles": watch_config.get("max_failed_cycles", DEFAULT_MAX_FAILED_CYCLES),
+        "once": args.once
+    }
+
+
+@defer.inlineCallbacks
+def run_watch(args, config):
+    """
+    Poll the current year's table every interval and process only new or changed rows
+
+    One process keeps the CrawlerRunner, the cloud upload stage (with its Drive services and
+    caches) and the metadata store connection open across cycles instead of starting from
+    scratch on every cron invocation. Stops the reactor when it ends (Ctrl+C or --once).
+    """
+
+    settings = get_watch_settings(args, config)
+    watch_status = WatchStatus(settings["langs"], settings["interval"], settings["max_failed_cycles"])
+
+    runner = CrawlerRunner(settings=hide_logs((config.get("metrics") or {}).get("location")))
+    cloud_stage = start_cloud_upload_stage(config)
+    watch_status.cloud_stage = cloud_stage
+    store = None
+    store_years = set()
+    health_port = None
+    stopping = []
+    # Deferred of the cycle in progress, fired once its post-processing has finished
+    running_cycle = []
+
+    @defer.inlineCallbacks
+    def shutdown():
+        # Runs before the reactor stops (Ctrl+C / SIGTERM): finish queued uploads, close connections
+        stopping.append(True)
+        watch_status.state = "stopping"
+        # The store is still written by the cycle's post-processing thread; let it finish first
+        if running_cycle:
+            print("⏳ Waiting for the running cycle to finish...")
+            yield running_cycle[0]
+        if cloud_stage:
+            yield threads.deferToThread(cloud_stage.close)
+        if store:
+            store.close()
+        print("👋 Watcher stopped")
+
+    reactor.addSystemEventTrigger("before", "shutdown", shutdown)
+
+    if settings["health_port"]:
+        try:
+            health_port = start_health_endpoint(watch_status, settings["health_port"], settings["health_host"])
+        except Exception as e:
+            print(f"⚠️ Health endpoint disabled: {e}")
+
+    print(f"👀 Watching {', '.join(settings['langs'])} gazettes every {settings['interval']:g}s (Ctrl+C to stop)")
+
+    while not stopping:
+        year = settings["year"] or datetime.now().year
+        started = time.time()
+        watch_status.state = "running"
+        watch_status.next_cycle_at = None
+
+        # Reuse the store connection; bootstrap indexes once per year (the year rolls over in January)
+        if store is None:
+            store = get_metadata_store(config, [year])
+            if store:
+                store_years.add(year)
+        elif year not in store_years:
+            store.bootstrap([year])
+            store_years.add(year)
+
+        results = {}
+        cycle_done = defer.Deferred()
+        running_cycle.append(cycle_done)
+        try:
+            for lang in settings["langs"]:
+                # A shutdown during the cycle skips the remaining languages
+                if stopping:
+                    break
+                cycle_args = argparse.Namespace(year=year, month=None, day=None, lang=lang, config=args.config, full=False)
+                print(f"\n🔄 Cycle {watch_status.cycles + 1}: {year} [{lang}]")
+                try:
+                    results[lang] = yield run_pipeline_once(cycle_args, config, "year-lang", runner, cloud_stage=cloud_stage, store=store)
+                except Exception as e:
+                    print(f"❌ Cycle failed for {year} [{lang}]: {e}")
+                    results[lang] = {"status": "error", "message": str(e), "documents": 0, "processed": False}
+        finally:
+            running_cycle.remove(cycle_done)
+            cycle_done.callback(None)
+
+        watch_status.record_cycle(year, started, results)
+
+        if settings["once"] or stopping:
+            break
+
+        # Interval is measured from the start of the cycle, so slow cycles do not drift the schedule
+        delay = max(0.0, settings["interval"] - (time.time() - started))
+        watch_status.state = "idle"
+        watch_status.next_cycle_at = datetime.fromtimestamp(time.time() + delay).isoformat(timespec="seconds")
+        print(f"💤 Next check at {watch_status.next_cycle_at}")
+        yield task.deferLater(reactor, delay, lambda: None)
+
+    if health_port:
+        yield health_port.stopListening()
+    if not stopping:
+        reactor.stop()
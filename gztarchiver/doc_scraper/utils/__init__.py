@@ -1,10 +1,24 @@
 from .year_data_utils import load_years_metadata, get_year_link
 from .hide_logs_utils import hide_logs
-from .doc_metadata_utils import filter_doc_metadata, load_doc_metadata_file
+from .doc_metadata_utils import filter_doc_metadata, load_doc_metadata_file, iter_doc_metadata
 from .archive_folder_utils import create_folder_structure
-from .archive_to_cloud_utils import create_folder_structure_on_cloud, upload_local_documents_to_gdrive, filter_pdf_only, save_upload_results
+from .archive_to_cloud_utils import create_folder_structure_on_cloud, upload_local_documents_to_gdrive, filter_pdf_only, save_upload_results, make_drive_service_factory, get_drive_discovery_document, configure_drive_rate_limit, get_drive_throttle_metrics
+from .rate_limit_utils import RateLimiter, AdaptiveRateLimiter
+from .gdrive_folder_cache_utils import get_folder_cache_path, load_folder_cache, save_folder_cache, invalidate_folder_id
+from .gdrive_sync_manifest_utils import get_sync_manifest_path, load_sync_manifest, save_sync_manifest
+from .upload_session_utils import UploadSessionStore, get_upload_session_path, get_upload_chunk_size
+from .object_storage_utils import StorageBackend, LocalMirrorBackend, S3Backend, GoogleDriveBackend, build_storage_items, upload_to_storage, get_storage_backend
+from .cloud_upload_stage_utils import CloudUploadStage, start_cloud_upload_stage
 from .cloud_credential_utils import get_cloud_credentials
-from .db_utils import prepare_metadata_for_db, connect_to_db, insert_docs_by_year
+from .db_utils import prepare_metadata_for_db, connect_to_db, insert_docs_by_year, ensure_indexes, bootstrap_indexes
+from .metadata_store_utils import MetadataStore, MongoMetadataStore, SQLiteMetadataStore, get_metadata_store
+from .parquet_export_utils import export_metadata_to_parquet
+from .table_benchmark_utils import run_table_parse_benchmark, run_parse_table_benchmark_command
+from .metadata_snapshot_utils import get_metadata_snapshot_path, load_metadata_snapshot, save_metadata_snapshot, diff_doc_metadata, update_metadata_snapshot, drop_from_metadata_snapshot
+from .date_index_utils import DateIndex, get_range_years
+from .archive_manifest_utils import ArchiveManifest, get_archive_manifest_path, open_archive_manifest, compute_content_sha256
+from .archive_verify_utils import verify_archive, check_archive_file, run_verify_command
+from .crawl_metrics_utils import CrawlMetrics, get_crawl_metrics, write_crawl_metrics
 
 __all__ = [
     "scrape_years_metadata",
@@ -13,13 +27,66 @@ __all__ = [
     "hide_logs",
     "filter_doc_metadata",
     "load_doc_metadata_file",
+    "iter_doc_metadata",
     "create_folder_structure",
     "create_folder_structure_on_cloud",
     "upload_local_documents_to_gdrive",
     "filter_pdf_only",
     "save_upload_results",
+    "make_drive_service_factory",
+    "get_drive_discovery_document",
+    "configure_drive_rate_limit",
+    "get_drive_throttle_metrics",
+    "RateLimiter",
+    "AdaptiveRateLimiter",
+    "get_folder_cache_path",
+    "load_folder_cache",
+    "save_folder_cache",
+    "invalidate_folder_id",
+    "get_sync_manifest_path",
+    "load_sync_manifest",
+    "save_sync_manifest",
+    "UploadSessionStore",
+    "get_upload_session_path",
+    "get_upload_chunk_size",
+    "StorageBackend",
+    "LocalMirrorBackend",
+    "S3Backend",
+    "GoogleDriveBackend",
+    "build_storage_items",
+    "upload_to_storage",
+    "get_storage_backend",
+    "CloudUploadStage",
+    "start_cloud_upload_stage",
     "get_cloud_credentials",
     "prepare_metadata_for_db",
     "connect_to_db",
     "insert_docs_by_year",
+    "ensure_indexes",
+    "bootstrap_indexes",
+    "MetadataStore",
+    "MongoMetadataStore",
+    "SQLiteMetadataStore",
+    "get_metadata_store",
+    "export_metadata_to_parquet",
+    "run_table_parse_benchmark",
+    "run_parse_table_benchmark_command",
+    "get_metadata_snapshot_path",
+    "load_metadata_snapshot",
+    "save_metadata_snapshot",
+    "diff_doc_metadata",
+    "update_metadata_snapshot",
+    "drop_from_metadata_snapshot",
+    "DateIndex",
+    "get_range_years",
+    "ArchiveManifest",
+    "get_archive_manifest_path",
+    "open_archive_manifest",
+    "compute_content_sha256",
+    "verify_archive",
+    "check_archive_file",
+    "run_verify_command",
+    "CrawlMetrics",
+    "get_crawl_metrics",
+    "write_crawl_metrics",
 ]
\ No newline at end of file
@@ -1,11 +1,32 @@
 from pathlib import Path
 import json
 
-def create_folder_structure(archive_location, filtered_doc_metadata):
+from .archive_manifest_utils import compute_content_sha256
+
+def create_folder_structure(archive_location, filtered_doc_metadata, manifest=None, lang=None):
+    """
+    Plan the archive paths of the documents (folders are created when a file is written)
+    
+    Args:
+        archive_location: Root of the local archive
+        filtered_doc_metadata: Table rows to archive
+        manifest: Optional ArchiveManifest; unavailable.txt is then only written when the
+                  document is not already recorded as unavailable with the same URL
+        lang: Language code of the run, used for the manifest entries
+    
+    Returns:
+        List of download metadata dicts
+    """
     
     base_path = archive_location
     
     all_download_metadata = []
+    known_entries = {}
+    if manifest:
+        for year in {str(doc.get("date", ""))[:4] for doc in filtered_doc_metadata}:
+            if year.isdigit():
+                manifest.ensure_year_imported(base_path / year, year)
+        known_entries = manifest.get_entries((doc.get("doc_id") for doc in filtered_doc_metadata), lang)
     
     for doc in filtered_doc_metadata:
         doc_id = doc.get("doc_id")
@@ -21,9 +42,8 @@ def create_folder_structure(archive_location, filtered_doc_metadata):
             print(f"Skipping invalid date: {date_str}")
             continue
         
-        # Build folder path: ~/Desktop/doc-archive/YYYY/MM/DD/doc_id/
+        # Build folder path: ~/Desktop/doc-archive/YYYY/MM/DD/doc_id/ (created lazily)
         folder_path = base_path / year / month / day / doc_id
-        folder_path.mkdir(parents=True, exist_ok=True)
 
         # Determine language from URL
         if "_E.pdf" in url:
@@ -54,12 +74,22 @@ def create_folder_structure(archive_location, filtered_doc_metadata):
         
         all_download_metadata.append(download_metadata)
         
-        # If unavailable, save metadata to unavailable.txt
+        # If unavailable, save metadata to unavailable.txt (once; the manifest remembers it)
         if availability != "Available" or url == "N/A":
+            known = known_entries.get(doc_id)
+            if known and known["status"] == "unavailable" and known["download_url"] == url:
+                continue
+            
             unavailable_path = folder_path / "unavailable.txt"
-            with open(unavailable_path, "w", encoding="utf-8") as f:
-                json.dump(doc, f, ensure_ascii=False, indent=2)
+            content = json.dumps(doc, ensure_ascii=False, indent=2).encode("utf-8")
+            folder_path.mkdir(parents=True, exist_ok=True)
+            with open(unavailable_path, "wb") as f:
+                f.write(content)
             print(f"📄 Unavailable file created: {unavailable_path}")
+            
+            if manifest:
+                manifest.record(doc_id, lang, "unavailable", path=unavailable_path, size=len(content),
+                                sha256=compute_content_sha256(content), date=date_str, download_url=url)
             continue
  
     
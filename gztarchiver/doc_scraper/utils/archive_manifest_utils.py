@@ -0,0 +1,267 @@
+import csv
+import hashlib
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+
+ARCHIVE_MANIFEST_SCHEMA = """
+    CREATE TABLE IF NOT EXISTS archive_files (
+        doc_id TEXT NOT NULL,
+        lang TEXT NOT NULL,
+        year TEXT,
+        date TEXT,
+        path TEXT,
+        size INTEGER,
+        sha256 TEXT,
+        status TEXT NOT NULL,
+        download_url TEXT,
+        updated_at TEXT,
+        PRIMARY KEY (doc_id, lang)
+    );
+    CREATE INDEX IF NOT EXISTS archive_files_year_lang ON archive_files (year, lang, status);
+    CREATE TABLE IF NOT EXISTS imported_years (
+        year TEXT PRIMARY KEY,
+        imported_at TEXT
+    );
+"""
+
+# Language part of archived file names (doc_id_english.pdf) -> language code
+FILE_NAME_LANGS = {"english": "en", "sinhala": "si", "tamil": "ta"}
+
+# Statuses of the download logs imported by import_download_logs(), later files win
+DOWNLOAD_LOG_STATUSES = [("failed_logs.csv", "failed"), ("unavailable_logs.csv", "unavailable"), ("archived_logs.csv", "archived")]
+
+
+def get_archive_manifest_path(config):
+    """
+    Location of the archive manifest
+
+    Uses archive.manifest_path from the config, or .archive_manifest.sqlite3 inside the
+    local archive location.
+    """
+
+    manifest_path = config["archive"].get("manifest_path")
+    if manifest_path:
+        return Path(manifest_path).expanduser()
+    return Path(config["archive"]["archive_location"]).expanduser() / ".archive_manifest.sqlite3"
+
+
+class ArchiveManifest:
+    """
+    Index of every document file in the archive tree (doc_id, language, path, size, hash, status)
+
+    Entries are written as files are saved, so planning a run is a few indexed lookups in
+    one SQLite file instead of stat calls and CSV scans across the YYYY/MM/DD/doc_id tree.
+    Uses SQLite's rollback journal because WAL does not work on network filesystems such as
+    NFS. Safe to share between threads.
+
+    Args:
+        path: SQLite file holding the manifest
+    """
+
+    def __init__(self, path):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._imported_years = set()
+
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(ARCHIVE_MANIFEST_SCHEMA)
+
+    def get_entries(self, doc_ids, lang):
+        """
+        Manifest entries of the given documents
+
+        Returns:
+            Dict of doc_id -> entry dict (path, size, sha256, status, download_url, ...)
+        """
+
+        doc_ids = list(doc_ids)
+        entries = {}
+        with self._lock:
+            # Stay below SQLite's bound parameter limit
+            for start in range(0, len(doc_ids), 500):
+                chunk = doc_ids[start:start + 500]
+                placeholders = ",".join("?" for _ in chunk)
+                cursor = self.conn.execute(
+                    f"SELECT doc_id, year, date, path, size, sha256, status, download_url, updated_at "
+                    f"FROM archive_files WHERE lang = ? AND doc_id IN ({placeholders})",
+                    [lang, *chunk]
+                )
+                for row in cursor:
+                    entries[row[0]] = {
+                        "year": row[1], "date": row[2], "path": row[3], "size": row[4], "sha256": row[5],
+                        "status": row[6], "download_url": row[7], "updated_at": row[8]
+                    }
+        return entries
+
+    def get_doc_ids(self, lang, status, year=None):
+        """Set of doc_ids with the given status (optionally limited to one year)"""
+
+        query = "SELECT doc_id FROM archive_files WHERE lang = ? AND status = ?"
+        params = [lang, status]
+        if year is not None:
+            query += " AND year = ?"
+            params.append(str(year))
+        with self._lock:
+            return {doc_id for (doc_id,) in self.conn.execute(query, params)}
+
+    def get_year_entries(self, year, status=None):
+        """
+        Entries of one year (optionally only those with the given status)
+
+        Returns:
+            List of entry dicts including doc_id and lang
+        """
+
+        query = ("SELECT doc_id, lang, date, path, size, sha256, status, download_url "
+                 "FROM archive_files WHERE year = ?")
+        params = [str(year)]
+        if status is not None:
+            query += " AND status = ?"
+            params.append(status)
+        with self._lock:
+            return [
+                {"doc_id": row[0], "lang": row[1], "date": row[2], "path": row[3], "size": row[4],
+                 "sha256": row[5], "status": row[6], "download_url": row[7]}
+                for row in self.conn.execute(query, params)
+            ]
+
+    def count(self, year=None, lang=None):
+        query = "SELECT COUNT(*) FROM archive_files WHERE 1 = 1"
+        params = []
+        if year is not None:
+            query += " AND year = ?"
+            params.append(str(year))
+        if lang is not None:
+            query += " AND lang = ?"
+            params.append(lang)
+        with self._lock:
+            return self.conn.execute(query, params).fetchone()[0]
+
+    def record(self, doc_id, lang, status, path=None, size=None, sha256=None, date=None, download_url=None):
+        """
+        Insert or update the entry of a document; fields passed as None keep their stored value
+
+        Args:
+            doc_id: Document ID
+            lang: Language code (en/si/ta)
+            status: "archived", "unavailable" or "failed"
+            path: Local file (the PDF, or unavailable.txt)
+            size: File size in bytes
+            sha256: SHA-256 of the file content
+            date: Publication date (YYYY-MM-DD); its year groups the entries
+            download_url: URL the file was (or would be) downloaded from
+        """
+
+        year = str(date)[:4] if date else None
+        with self._lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO archive_files (doc_id, lang, year, date, path, size, sha256, status, download_url, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (doc_id, lang) DO UPDATE SET
+                    year = COALESCE(excluded.year, archive_files.year),
+                    date = COALESCE(excluded.date, archive_files.date),
+                    path = COALESCE(excluded.path, archive_files.path),
+                    size = COALESCE(excluded.size, archive_files.size),
+                    sha256 = COALESCE(excluded.sha256, archive_files.sha256),
+                    status = excluded.status,
+                    download_url = COALESCE(excluded.download_url, archive_files.download_url),
+                    updated_at = excluded.updated_at
+                """,
+                (doc_id, lang, year, date, str(path) if path else None, size, sha256, status, download_url,
+                 datetime.now().isoformat(timespec="seconds"))
+            )
+
+    def ensure_year_imported(self, year_dir, year):
+        """
+        Import a year's download logs the first time the manifest sees that year
+
+        Archives made before the manifest existed are only described by their CSV logs;
+        afterwards every write updates the manifest directly.
+        """
+
+        year = str(year)
+        if year in self._imported_years:
+            return
+        with self._lock:
+            imported = self.conn.execute("SELECT 1 FROM imported_years WHERE year = ?", (year,)).fetchone()
+        if not imported:
+            self.import_download_logs(year_dir, year)
+            with self._lock, self.conn:
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO imported_years (year, imported_at) VALUES (?, ?)",
+                    (year, datetime.now().isoformat(timespec="seconds"))
+                )
+        self._imported_years.add(year)
+
+    def import_download_logs(self, year_dir, year):
+        """
+        Add the documents listed in a year's archived/failed/unavailable CSV logs
+
+        The language comes from the archived file name.
+
+        Returns:
+            Number of imported entries
+        """
+
+        rows = []
+        for log_name, status in DOWNLOAD_LOG_STATUSES:
+            log_file = Path(year_dir) / log_name
+            if not log_file.exists():
+                continue
+            try:
+                with open(log_file, "r", encoding="utf-8") as f:
+                    for row in csv.DictReader(f):
+                        lang = get_file_lang(row.get("file_path"))
+                        if row.get("doc_id") and lang:
+                            rows.append((row["doc_id"], lang, status, row.get("file_path"), row.get("download_url")))
+            except (OSError, csv.Error) as e:
+                print(f"⚠️ Could not import {log_file} into the archive manifest: {e}")
+
+        if not rows:
+            return 0
+
+        updated_at = datetime.now().isoformat(timespec="seconds")
+        with self._lock, self.conn:
+            self.conn.executemany(
+                """
+                INSERT INTO archive_files (doc_id, lang, year, path, status, download_url, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (doc_id, lang) DO UPDATE SET
+                    path = excluded.path, status = excluded.status,
+                    download_url = excluded.download_url, updated_at = excluded.updated_at
+                """,
+                [(doc_id, lang, str(year), path, status, url, updated_at) for doc_id, lang, status, path, url in rows]
+            )
+        print(f"📒 Imported {len(rows)} download log entries of {year} into the archive manifest")
+        return len(rows)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def get_file_lang(file_path):
+    """Language code from an archived file name such as 2024-01-01_english.pdf (None if unknown)"""
+    if not file_path:
+        return None
+    suffix = Path(str(file_path)).stem.rsplit("_", 1)[-1].lower()
+    return FILE_NAME_LANGS.get(suffix)
+
+
+def compute_content_sha256(content):
+    return hashlib.sha256(content).hexdigest()
+
+
+def open_archive_manifest(config):
+    """Open the archive manifest, or return None (with a warning) when it cannot be opened"""
+    manifest_path = get_archive_manifest_path(config)
+    try:
+        return ArchiveManifest(manifest_path)
+    except sqlite3.Error as e:
+        print(f"⚠️ Archive manifest unavailable at {manifest_path}, falling back to the download logs: {e}")
+        return None
@@ -1,23 +1,100 @@
 import json
-from googleapiclient.discovery import build
-from googleapiclient.errors import HttpError
-import time
 import os
-import time
-from googleapiclient.http import MediaFileUpload
-from googleapiclient.errors import HttpError
-import json
+import threading
+from datetime import datetime
 from pathlib import Path
-import os
-import time
-from googleapiclient.http import MediaFileUpload
+
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build, build_from_document
 from googleapiclient.errors import HttpError
-import json
-from pathlib import Path
-from datetime import datetime
+from googleapiclient.http import MediaFileUpload
+
+from .rate_limit_utils import AdaptiveRateLimiter
+from .gdrive_folder_cache_utils import load_folder_cache, save_folder_cache, invalidate_folder_id
+from .upload_session_utils import DEFAULT_UPLOAD_CHUNK_SIZE
+
+# Drive accepts at most 100 requests per batch HTTP call
+DRIVE_BATCH_LIMIT = 100
+FOLDER_MIME_TYPE = 'application/vnd.google-apps.folder'
+
+# Default Drive API quota (queries per minute) and retries for throttled or failed calls
+DRIVE_QUERIES_PER_MINUTE = 12000
+DRIVE_MAX_RETRIES = 5
+
+# Parsed Drive discovery document shared by every service built in this process
+_drive_discovery_document = None
+_drive_discovery_lock = threading.Lock()
+
+# Every Drive call made by this module goes through this limiter; see configure_drive_rate_limit()
+drive_rate_limiter = AdaptiveRateLimiter(DRIVE_QUERIES_PER_MINUTE / 60.0, burst=DRIVE_BATCH_LIMIT)
+
+
+def configure_drive_rate_limit(queries_per_minute=DRIVE_QUERIES_PER_MINUTE, min_queries_per_minute=30):
+    """
+    Size the shared Drive rate limiter to the project quota
+    
+    Args:
+        queries_per_minute: Drive API queries allowed per minute (None to disable limiting)
+        min_queries_per_minute: Floor the adaptive rate never drops below
+    
+    Returns:
+        The new AdaptiveRateLimiter
+    """
+    
+    global drive_rate_limiter
+    rate = queries_per_minute / 60.0 if queries_per_minute else None
+    drive_rate_limiter = AdaptiveRateLimiter(rate, burst=DRIVE_BATCH_LIMIT, min_rate=min_queries_per_minute / 60.0)
+    return drive_rate_limiter
+
+
+def drive_call(call, max_retries=DRIVE_MAX_RETRIES):
+    """
+    Run one Drive API call through the shared rate limiter
+    
+    Rate-limit responses (403 rate limit reasons, 429) slow the limiter down and are
+    retried after a jittered backoff, as are server errors (5xx); other errors are raised.
+    
+    Args:
+        call: Callable performing the request (e.g. request.execute or request.next_chunk)
+        max_retries: Retries before the last error is raised
+    
+    Returns:
+        Whatever call returns
+    """
+    
+    for attempt in range(max_retries + 1):
+        drive_rate_limiter.acquire()
+        try:
+            result = call()
+            drive_rate_limiter.record_success()
+            return result
+        except HttpError as e:
+            if is_rate_limit_error(e):
+                drive_rate_limiter.record_throttle()
+            elif not is_retryable_drive_error(e):
+                raise
+            if attempt == max_retries:
+                raise
+            drive_rate_limiter.backoff(attempt, get_retry_after(e))
+
+
+def drive_execute(request, max_retries=DRIVE_MAX_RETRIES):
+    """Execute a Drive request object through drive_call()"""
+    return drive_call(request.execute, max_retries)
+
+
+def get_drive_throttle_metrics():
+    return drive_rate_limiter.get_metrics()
+
 
+def print_drive_throttle_metrics():
+    metrics = get_drive_throttle_metrics()
+    print(f"🚦 Drive API: {metrics['calls']} calls, {metrics['throttled']} rate limited, "
+          f"{metrics['retries']} retries, {metrics['wait_seconds'] + metrics['backoff_seconds']:.1f}s throttled "
+          f"(rate now {metrics['current_rate']}/s, lowest {metrics['lowest_rate']}/s)")
 
-def create_folder_structure_on_cloud(service, filtered_doc_metadata, archive_location, parent_folder_id=None):
+
+def create_folder_structure_on_cloud(service, filtered_doc_metadata, archive_location, parent_folder_id=None, folder_cache_path=None):
     """
     Create folder structure in Google Drive similar to local structure
     Structure: parent_folder/YYYY/MM/DD/doc_id/
@@ -26,18 +103,34 @@ def create_folder_structure_on_cloud(service, filtered_doc_metadata, archive_loc
         service: Google Drive API service object
         filtered_doc_metadata: List of document metadata
         parent_folder_id: Parent folder ID in Google Drive (None for root)
+        folder_cache_path: JSON file persisting folder IDs across runs (None to keep them in memory only)
     
     Returns:
         List of upload metadata with Google Drive folder IDs
     """
     
     all_upload_metadata = []
-    folder_cache = {}  # Cache folder IDs to avoid duplicate API calls
+    # Cache folder IDs to avoid duplicate API calls (warm from previous runs when persisted)
+    folder_cache = load_folder_cache(folder_cache_path) if folder_cache_path else {}
     
     base_path = Path(archive_location).expanduser()
     
     print(f"📁 Creating Google Drive folder structure for {len(filtered_doc_metadata)} documents...")
     
+    # Resolve every YYYY/MM/DD/doc_id path level by level with batched requests
+    folder_paths = []
+    for doc in filtered_doc_metadata:
+        try:
+            year, month, day = doc.get("date").split("-")
+        except (ValueError, AttributeError):
+            continue
+        folder_paths.append([year, month, day, doc.get("doc_id")])
+    
+    try:
+        resolve_folder_paths(service, parent_folder_id, folder_paths, folder_cache)
+    except Exception as e:
+        print(f"⚠️ Batched folder resolution failed, falling back to per-document requests: {e}")
+    
     for doc in filtered_doc_metadata:
         doc_id = doc.get("doc_id")
         date_str = doc.get("date")
@@ -52,7 +145,7 @@ def create_folder_structure_on_cloud(service, filtered_doc_metadata, archive_loc
             print(f"⚠️ Skipping invalid date: {date_str}")
             continue
         
-        # Create nested folder structure: YYYY/MM/DD/doc_id/
+        # Create nested folder structure: YYYY/MM/DD/doc_id/ (already cached unless the batch failed)
         try:
             doc_folder_id = create_nested_folders(
                 service, 
@@ -102,13 +195,22 @@ def create_folder_structure_on_cloud(service, filtered_doc_metadata, archive_loc
             try:
                 upload_unavailable_metadata(service, doc, doc_folder_id, doc_id)
                 print(f"📄 File created: {folder_path} | Unavailable metadata uploaded for: {doc_id}")
+            except HttpError as e:
+                if e.resp.status == 404:
+                    # Cached folder was deleted on Drive; forget it so the next run recreates it
+                    invalidate_folder_id(folder_cache, doc_folder_id)
+                print(f"❌ Failed to upload unavailable metadata for {doc_id}: {e}")
             except Exception as e:
                 print(f"❌ Failed to upload unavailable metadata for {doc_id}: {e}")
             continue
         
         print(f"📁 Folder created: {folder_path} (ID: {doc_folder_id})")
     
+    if folder_cache_path:
+        save_folder_cache(folder_cache_path, folder_cache)
+    
     print(f"✅ Folder structure creation completed. {len(all_upload_metadata)} items ready for upload.")
+    print_drive_throttle_metrics()
     return all_upload_metadata
 
 
@@ -131,7 +233,7 @@ def create_nested_folders(service, parent_folder_id, folder_names, folder_cache)
     
     for folder_name in folder_names:
         current_path = f"{current_path}/{folder_name}" if current_path else folder_name
-        cache_key = f"{current_parent_id}:{current_path}"
+        cache_key = get_folder_cache_key(parent_folder_id, current_path)
         
         # Check if folder already exists in cache
         if cache_key in folder_cache:
@@ -151,7 +253,6 @@ def create_nested_folders(service, parent_folder_id, folder_names, folder_cache)
                 new_folder_id = create_folder(service, folder_name, current_parent_id)
                 current_parent_id = new_folder_id
                 folder_cache[cache_key] = new_folder_id
-                time.sleep(0.1)  # Small delay to avoid hitting API limits
             except Exception as e:
                 print(f"❌ Failed to create folder '{folder_name}': {e}")
                 raise
@@ -159,6 +260,307 @@ def create_nested_folders(service, parent_folder_id, folder_names, folder_cache)
     return current_parent_id
 
 
+def get_folder_cache_key(root_folder_id, folder_path):
+    """Key used in folder_cache for a path (e.g. '2024/01/15') below the root folder"""
+    return f"{root_folder_id}:{folder_path}"
+
+
+def build_folder_query(folder_name, parent_id):
+    if parent_id:
+        return f"name='{folder_name}' and mimeType='{FOLDER_MIME_TYPE}' and '{parent_id}' in parents and trashed=false"
+    return f"name='{folder_name}' and mimeType='{FOLDER_MIME_TYPE}' and trashed=false"
+
+
+def is_retryable_drive_error(error):
+    """True for Drive errors worth retrying: rate limits (403/429) and server errors (5xx)"""
+    if not isinstance(error, HttpError):
+        return False
+    return is_rate_limit_error(error) or error.resp.status >= 500
+
+
+def is_rate_limit_error(error):
+    """True when Drive rejected a call for exceeding the quota (429, or 403 with a rate limit reason)"""
+    if not isinstance(error, HttpError):
+        return False
+    status = error.resp.status
+    if status == 429:
+        return True
+    if status == 403:
+        return any(reason in str(error) for reason in ("userRateLimitExceeded", "rateLimitExceeded"))
+    return False
+
+
+def get_retry_after(error):
+    """Seconds from the Retry-After header of an HttpError, if any"""
+    try:
+        return float(error.resp.get('retry-after'))
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def execute_batched_requests(service, request_builders, max_retries=DRIVE_MAX_RETRIES):
+    """
+    Execute Drive requests in batch HTTP calls of up to DRIVE_BATCH_LIMIT requests
+    
+    Args:
+        service: Google Drive API service object
+        request_builders: Dict of request_id -> callable returning an unexecuted request
+        max_retries: Rounds of retries for sub-requests that were rate limited, hit a 5xx or
+                     got no response because the batch call itself failed
+    
+    Returns:
+        Tuple of (dict request_id -> response, dict request_id -> exception)
+    """
+    
+    responses = {}
+    errors = {}
+    pending = list(request_builders)
+    
+    def callback(request_id, response, exception):
+        if exception is not None:
+            errors[request_id] = exception
+        else:
+            responses[request_id] = response
+    
+    for attempt in range(max_retries + 1):
+        for start in range(0, len(pending), DRIVE_BATCH_LIMIT):
+            request_ids = pending[start:start + DRIVE_BATCH_LIMIT]
+            batch = service.new_batch_http_request(callback=callback)
+            for request_id in request_ids:
+                batch.add(request_builders[request_id](), request_id=request_id)
+            # Each sub-request counts against the quota; the batch is not run through drive_call(),
+            # which would take tokens again and resend sub-requests that already got a response
+            drive_rate_limiter.acquire(len(request_ids))
+            try:
+                batch.execute()
+            except HttpError as e:
+                if not is_retryable_drive_error(e):
+                    raise
+                # Only the sub-requests left without a response are retried with the failed ones below
+                for request_id in request_ids:
+                    if request_id not in responses and request_id not in errors:
+                        errors[request_id] = e
+            drive_rate_limiter.record_success(sum(1 for request_id in request_ids if request_id in responses))
+        
+        pending = [request_id for request_id, error in errors.items() if is_retryable_drive_error(error)]
+        if not pending or attempt == max_retries:
+            break
+        
+        throttled = [errors[request_id] for request_id in pending if is_rate_limit_error(errors[request_id])]
+        if throttled:
+            drive_rate_limiter.record_throttle()
+        for request_id in pending:
+            del errors[request_id]
+        drive_rate_limiter.backoff(attempt, max(filter(None, map(get_retry_after, throttled)), default=None))
+    
+    return responses, errors
+
+
+def list_child_folders(service, parent_ids):
+    """
+    List every child folder of many parents using batched, paginated, fields-limited queries
+    
+    Args:
+        service: Google Drive API service object
+        parent_ids: Drive folder IDs whose child folders should be listed
+    
+    Returns:
+        Tuple of (dict parent_id -> {folder name: folder ID}, dict parent_id -> exception)
+    """
+    
+    children = {parent_id: {} for parent_id in parent_ids}
+    failed = {}
+    page_tokens = {parent_id: None for parent_id in parent_ids}
+    
+    while page_tokens:
+        listings = {
+            parent_id: (lambda parent_id=parent_id, page_token=page_token: service.files().list(
+                q=f"'{parent_id}' in parents and mimeType='{FOLDER_MIME_TYPE}' and trashed=false",
+                spaces='drive',
+                fields='nextPageToken, files(id, name)',
+                pageSize=1000,
+                pageToken=page_token,
+                supportsAllDrives=True,
+                includeItemsFromAllDrives=True
+            ))
+            for parent_id, page_token in page_tokens.items()
+        }
+        responses, errors = execute_batched_requests(service, listings)
+        failed.update(errors)
+        
+        page_tokens = {}
+        for parent_id, response in responses.items():
+            for folder in response.get('files', []):
+                # Keep the first match, like find_folder_by_name()
+                children[parent_id].setdefault(folder['name'], folder['id'])
+            if response.get('nextPageToken'):
+                page_tokens[parent_id] = response['nextPageToken']
+    
+    return children, failed
+
+
+def list_drive_files(service, folder_ids):
+    """
+    List the files (name, ID and MD5) in many Drive folders using batched, paginated queries
+    
+    Args:
+        service: Google Drive API service object
+        folder_ids: Drive folder IDs to list
+    
+    Returns:
+        Dict folder ID -> {file name: {"id", "md5Checksum"}} for the folders that could be listed
+    """
+    
+    remote_files = {folder_id: {} for folder_id in folder_ids}
+    page_tokens = {folder_id: None for folder_id in folder_ids}
+    
+    while page_tokens:
+        listings = {
+            folder_id: (lambda folder_id=folder_id, page_token=page_token: service.files().list(
+                q=f"'{folder_id}' in parents and mimeType!='{FOLDER_MIME_TYPE}' and trashed=false",
+                spaces='drive',
+                fields='nextPageToken, files(id, name, md5Checksum)',
+                pageSize=1000,
+                pageToken=page_token,
+                supportsAllDrives=True,
+                includeItemsFromAllDrives=True
+            ))
+            for folder_id, page_token in page_tokens.items()
+        }
+        responses, errors = execute_batched_requests(service, listings)
+        
+        for folder_id, error in errors.items():
+            print(f"⚠️ Could not list files in Drive folder {folder_id}: {error}")
+            remote_files.pop(folder_id, None)
+        
+        page_tokens = {}
+        for folder_id, response in responses.items():
+            for drive_file in response.get('files', []):
+                remote_files[folder_id].setdefault(drive_file['name'], drive_file)
+            if response.get('nextPageToken'):
+                page_tokens[folder_id] = response['nextPageToken']
+    
+    return remote_files
+
+
+def resolve_folder_paths(service, parent_folder_id, folder_paths, folder_cache):
+    """
+    Find or create many nested folder paths at once, one tree level at a time
+    
+    Paths already in folder_cache cost no API calls. For the rest, each level lists the
+    children of the parent folders (which also warms the cache with their siblings) and
+    then creates the missing folders, all through batched requests.
+    
+    Args:
+        service: Google Drive API service object
+        parent_folder_id: Root folder ID (None for root)
+        folder_paths: List of folder name lists (e.g., [['2024', '01', '15', 'doc-123'], ...])
+        folder_cache: Dict to cache folder IDs (filled in place)
+    """
+    
+    depth = max((len(names) for names in folder_paths), default=0)
+    
+    # Cached folders that Drive reports as missing (404) are dropped and the paths resolved
+    # again; each pass moves at least one level up the tree, so depth + 1 passes are enough
+    for _ in range(depth + 1):
+        stale_folder_ids = resolve_folder_levels(service, parent_folder_id, folder_paths, folder_cache, depth)
+        if not stale_folder_ids:
+            return
+        for folder_id in stale_folder_ids:
+            invalidate_folder_id(folder_cache, folder_id)
+
+
+def resolve_folder_levels(service, parent_folder_id, folder_paths, folder_cache, depth):
+    """
+    One pass of resolve_folder_paths() over every tree level
+    
+    Returns:
+        Set of cached folder IDs that no longer exist on Drive
+    """
+    
+    stale_folder_ids = set()
+    
+    for level in range(depth):
+        # Unique folders at this level that are not cached yet: path -> (name, parent ID, parent path)
+        pending = {}
+        for names in folder_paths:
+            if len(names) <= level:
+                continue
+            path = "/".join(names[:level + 1])
+            if path in pending or get_folder_cache_key(parent_folder_id, path) in folder_cache:
+                continue
+            parent_path = "/".join(names[:level])
+            if level == 0:
+                parent_id = parent_folder_id
+            else:
+                parent_id = folder_cache.get(get_folder_cache_key(parent_folder_id, parent_path))
+                if parent_id is None:
+                    continue  # Parent could not be resolved; create_nested_folders retries it later
+            pending[path] = (names[level], parent_id, parent_path)
+        
+        if not pending:
+            continue
+        
+        # Warm the cache with the child folders of every parent at this level
+        parent_paths = {parent_id: parent_path for _, parent_id, parent_path in pending.values() if parent_id}
+        children, list_errors = list_child_folders(service, list(parent_paths))
+        for parent_id, folders in children.items():
+            for name, folder_id in folders.items():
+                child_path = f"{parent_paths[parent_id]}/{name}" if parent_paths[parent_id] else name
+                folder_cache[get_folder_cache_key(parent_folder_id, child_path)] = folder_id
+        
+        missing = {}
+        failed = 0
+        for path, (name, parent_id, _) in pending.items():
+            cache_key = get_folder_cache_key(parent_folder_id, path)
+            if cache_key in folder_cache:
+                continue
+            if parent_id is None:
+                # No root folder configured: look the folder up by name anywhere in the drive
+                existing_folder_id = find_folder_by_name(service, name, None)
+                if existing_folder_id:
+                    folder_cache[cache_key] = existing_folder_id
+                    continue
+            elif parent_id in list_errors:
+                if getattr(list_errors[parent_id], "resp", None) is not None and list_errors[parent_id].resp.status == 404:
+                    stale_folder_ids.add(parent_id)
+                else:
+                    print(f"❌ Error listing folders in '{path.rsplit('/', 1)[0]}': {list_errors[parent_id]}")
+                failed += 1
+                continue
+            missing[path] = (name, parent_id)
+        
+        print(f"📁 Level {level + 1}: {len(pending) - len(missing) - failed} folders found, {len(missing)} to create")
+        
+        if not missing:
+            continue
+        
+        # Batched creates for the folders that do not exist yet
+        creates = {
+            path: (lambda name=name, parent_id=parent_id: service.files().create(
+                body={
+                    'name': name,
+                    'mimeType': FOLDER_MIME_TYPE,
+                    **({'parents': [parent_id]} if parent_id else {})
+                },
+                fields='id',
+                supportsAllDrives=True
+            ))
+            for path, (name, parent_id) in missing.items()
+        }
+        responses, errors = execute_batched_requests(service, creates)
+        
+        for path, (_, parent_id) in missing.items():
+            if path in responses:
+                folder_cache[get_folder_cache_key(parent_folder_id, path)] = responses[path].get('id')
+            elif getattr(errors.get(path), "resp", None) is not None and errors[path].resp.status == 404:
+                stale_folder_ids.add(parent_id)
+            else:
+                print(f"❌ Error creating folder '{path}': {errors.get(path)}")
+    
+    return stale_folder_ids
+
+
 def find_folder_by_name(service, folder_name, parent_id):
     """
     Find a folder by name within a parent folder
@@ -174,17 +576,14 @@ def find_folder_by_name(service, folder_name, parent_id):
     
     try:
         # Build query to find folder
-        if parent_id:
-            query = f"name='{folder_name}' and mimeType='application/vnd.google-apps.folder' and '{parent_id}' in parents and trashed=false"
-        else:
-            query = f"name='{folder_name}' and mimeType='application/vnd.google-apps.folder' and trashed=false"
+        query = build_folder_query(folder_name, parent_id)
         
-        results = service.files().list(
+        results = drive_execute(service.files().list(
             q=query,
             spaces='drive',
             fields='files(id, name)',
             supportsAllDrives=True
-        ).execute()
+        ))
         
         files = results.get('files', [])
         if files:
@@ -218,11 +617,11 @@ def create_folder(service, folder_name, parent_id):
         folder_metadata['parents'] = [parent_id]
     
     try:
-        folder = service.files().create(
+        folder = drive_execute(service.files().create(
             body=folder_metadata,
             fields='id',
             supportsAllDrives=True
-        ).execute()
+        ))
         
         return folder.get('id')
         
@@ -260,12 +659,12 @@ def upload_unavailable_metadata(service, doc_metadata, folder_id, doc_id):
     }
     
     try:
-        file = service.files().create(
+        file = drive_execute(service.files().create(
             body=file_metadata,
             media_body=media,
             fields='id',
             supportsAllDrives=True
-        ).execute()
+        ))
         
         return file.get('id')
         
@@ -273,21 +672,89 @@ def upload_unavailable_metadata(service, doc_metadata, folder_id, doc_id):
         print(f"❌ Error uploading unavailable metadata: {e}")
         raise
 
-def upload_local_documents_to_gdrive(service, upload_metadata, max_retries=3, delay_between_uploads=1):
+def upload_local_documents_to_gdrive(service, upload_metadata, max_retries=3, max_workers=1, service_factory=None, uploads_per_second=3.0, folder_cache_path=None, sync_manifest_path=None, verify_remote=False, chunk_size=DEFAULT_UPLOAD_CHUNK_SIZE, upload_session_path=None, parent_folder_id=None):
     """
     Upload locally downloaded documents to Google Drive using local_path from upload metadata
     
+    The files are uploaded by upload_to_storage() with a GoogleDriveBackend, so stale folders,
+    the sync manifest and resumable sessions are handled the same way as for cloud.backend gdrive.
+    
     Args:
-        service: Google Drive API service object
+        service: Google Drive API service object (used when no service_factory is given)
         upload_metadata: List of upload metadata from create_folder_structure_on_cloud()
                         Each item should have 'local_path' field
         max_retries: Maximum number of retry attempts for failed uploads
-        delay_between_uploads: Delay in seconds between uploads to avoid rate limits
+        max_workers: Number of concurrent upload workers
+        service_factory: Callable returning a new Drive service; each worker builds its own
+                        because the httplib2 transport is not thread-safe
+        uploads_per_second: Upload starts allowed per second across all workers (None for no limit)
+        folder_cache_path: Persistent folder cache from create_folder_structure_on_cloud(); folders
+                        that Drive reports as missing are dropped from it and created again
+        sync_manifest_path: Sync manifest of previously uploaded files (None to check Drive for every file)
+        verify_remote: Compare against the md5Checksum listing of every target folder, not only
+                        of folders holding files missing from the manifest
+        chunk_size: Bytes sent per resumable upload request (multiple of 256 KB)
+        upload_session_path: File persisting resumable upload sessions so interrupted uploads
+                        continue from the last confirmed chunk on the next run
+        parent_folder_id: Parent folder given to create_folder_structure_on_cloud() (None for root)
     
     Returns:
         Dict with upload statistics and results
     """
     
+    # Imported here, object_storage_utils builds on this module
+    from .object_storage_utils import GoogleDriveBackend, upload_to_storage
+    
+    if max_workers > 1 and service_factory is None:
+        print("⚠️ No service_factory given, a Drive service cannot be shared between threads. Uploading with 1 worker.")
+        max_workers = 1
+    
+    backend = GoogleDriveBackend(
+        service_factory or (lambda: service),
+        parent_folder_id=parent_folder_id,
+        folder_cache_path=folder_cache_path,
+        sync_manifest_path=sync_manifest_path,
+        upload_session_path=upload_session_path,
+        chunk_size=chunk_size,
+        verify_remote=verify_remote,
+        uploads_per_second=uploads_per_second
+    )
+    
+    # Documents without a file to upload are counted here; the rest become storage items
+    skipped_outcomes = {}
+    items = []
+    for position, item in enumerate(upload_metadata):
+        doc_id = item.get("doc_id")
+        detail = {
+            "doc_id": doc_id,
+            "doc_date": item.get("doc_date"),
+            "folder_path": item.get("gdrive_folder_path"),
+            "file_name": item.get("file_name")
+        }
+        if item.get("availability") != "Available":
+            skipped_outcomes[position] = ("unavailable_documents", {**detail, "status": "unavailable"}, None)
+        elif not item.get("local_path"):
+            error = {"doc_id": doc_id, "error": "No local_path in metadata", "folder_path": detail["folder_path"]}
+            skipped_outcomes[position] = ("file_not_found", {**detail, "status": "no_local_path", "error": error["error"]}, error)
+        elif item.get("file_name", "").lower().endswith("unavailable.json"):
+            skipped_outcomes[position] = ("skipped_documents", {**detail, "status": "skipped_json", "local_file_path": str(item["local_path"])}, None)
+        else:
+            # Folders created by create_folder_structure_on_cloud() need no second lookup
+            if item.get("gdrive_folder_id"):
+                backend.folder_cache.setdefault(get_folder_cache_key(parent_folder_id, detail["folder_path"]), item["gdrive_folder_id"])
+            items.append({
+                "doc_id": doc_id,
+                "doc_date": item.get("doc_date"),
+                "key": f"{detail['folder_path']}/{detail['file_name']}",
+                "local_path": str(item["local_path"]),
+                "download_url": item.get("download_url")
+            })
+    
+    try:
+        storage_results = upload_to_storage(backend, items, max_workers=max_workers, max_retries=max_retries, print_summary=False)
+    finally:
+        backend.close()
+    
     upload_results = {
         "total_documents": len(upload_metadata),
         "successful_uploads": 0,
@@ -296,181 +763,28 @@ def upload_local_documents_to_gdrive(service, upload_metadata, max_retries=3, de
         "skipped_documents": 0,
         "file_not_found": 0,
         "upload_details": [],
-        "errors": []
+        "errors": list(storage_results["errors"])
     }
+    for counter in ("successful_uploads", "failed_uploads", "skipped_documents", "file_not_found"):
+        upload_results[counter] = storage_results[counter]
     
-    print(f"🚀 Starting local document upload process for {len(upload_metadata)} items...")
-    
-    for i, item in enumerate(upload_metadata, 1):
-        doc_id = item.get("doc_id")
-        doc_date = item.get("doc_date")
-        file_name = item.get("file_name")
-        gdrive_folder_id = item.get("gdrive_folder_id")
-        folder_path = item.get("gdrive_folder_path")
-        availability = item.get("availability")
-        local_path = item.get("local_path")
-        download_url = item.get("download_url")
-        
-        print(f"\n📄 Processing ({i}/{len(upload_metadata)}): {doc_id}")
-        print(f"   📁 Folder: {folder_path}")
-        
-        # Skip unavailable documents
-        if availability != "Available":
-            print(f"   ⚠️ Skipping unavailable document: {doc_id}")
-            upload_results["unavailable_documents"] += 1
-            upload_results["upload_details"].append({
-                "doc_id": doc_id,
-                "doc_date": doc_date,
-                "status": "unavailable",
-                "folder_path": folder_path,
-                "file_name": file_name
-            })
+    # Merge in input order so the results match a sequential run
+    storage_details = iter(storage_results["upload_details"])
+    for position, item in enumerate(upload_metadata):
+        if position in skipped_outcomes:
+            counter, detail, error = skipped_outcomes[position]
+            upload_results[counter] += 1
+            upload_results["upload_details"].append(detail)
+            if error:
+                upload_results["errors"].append(error)
             continue
-        
-        # Check if local_path exists
-        if not local_path:
-            print(f"   ❌ No local_path found for: {doc_id}")
-            upload_results["file_not_found"] += 1
-            upload_results["errors"].append({
-                "doc_id": doc_id,
-                "error": "No local_path in metadata",
-                "folder_path": folder_path
-            })
-            upload_results["upload_details"].append({
-                "doc_id": doc_id,
-                "doc_date": doc_date,
-                "status": "no_local_path",
-                "error": "No local_path in metadata",
-                "folder_path": folder_path,
-                "file_name": file_name
-            })
-            continue
-        
-        # Convert to string if it's a Path object
-        local_file_path = str(local_path)
-        
-        # Check if file already exists in the folder
-        is_file_existing, g_drive_id = file_exists_in_folder(service, file_name, gdrive_folder_id)
-        if is_file_existing:
-            print(f"   ✅ File already exists, skipping: {file_name}")
-            upload_results["skipped_documents"] += 1
-            cloud_file_url = get_gdrive_url_from_file_id(g_drive_id)
-            upload_results["upload_details"].append({
-                "doc_id": doc_id,
-                "doc_date": doc_date,
-                "status": "already_exists",
-                "gdrive_file_id": g_drive_id,
-                "gdrive_file_url": cloud_file_url,
-                "folder_path": folder_path,
-                "file_name": file_name,
-                "local_file_path": local_file_path,
-                "download_url" : download_url
-            })
-            continue
-        
-        # Check if local file exists
-        if not os.path.exists(local_file_path):
-            print(f"   ❌ Local file not found: {local_file_path}")
-            upload_results["file_not_found"] += 1
-            upload_results["errors"].append({
-                "doc_id": doc_id,
-                "error": f"Local file not found: {local_file_path}",
-                "folder_path": folder_path
-            })
-            upload_results["upload_details"].append({
-                "doc_id": doc_id,
-                "doc_date": doc_date,
-                "status": "local_file_not_found",
-                "error": f"Local file not found: {local_file_path}",
-                "folder_path": folder_path,
-                "file_name": file_name,
-                "local_file_path": local_file_path
-            })
-            continue
-        
-        # Skip if it's unavailable.json file
-        if file_name.lower().endswith('unavailable.json'):
-            print(f"   ⏭️ Skipping unavailable.json file: {file_name}")
-            upload_results["skipped_documents"] += 1
-            upload_results["upload_details"].append({
-                "doc_id": doc_id,
-                "doc_date": doc_date,
-                "status": "skipped_json",
-                "folder_path": folder_path,
-                "file_name": file_name,
-                "local_file_path": local_file_path
-            })
-            continue
-        
-        # Get file size for logging
-        try:
-            file_size = os.path.getsize(local_file_path)
-            print(f"   📄 Local file: {local_file_path} ({file_size:,} bytes)")
-        except Exception as e:
-            print(f"   ⚠️ Could not get file size: {e}")
-            file_size = 0
-        
-        # Attempt to upload the document
-        success = False
-        for attempt in range(max_retries):
-            try:
-                # Upload to Google Drive
-                print(f"   ⬆️ Uploading to Google Drive: {file_name}")
-                file_id = upload_local_pdf_to_gdrive(
-                    service, 
-                    local_file_path, 
-                    file_name, 
-                    gdrive_folder_id
-                )
-                
-                if file_id:
-                    print(f"   ✅ Upload successful! File ID: {file_id}")
-                    upload_results["successful_uploads"] += 1
-                    cloud_file_url = get_gdrive_url_from_file_id(file_id)
-                    upload_results["upload_details"].append({
-                        "doc_id": doc_id,
-                        "doc_date": doc_date,
-                        "status": "success",
-                        "gdrive_file_id": file_id,
-                        "gdrive_file_url": cloud_file_url,
-                        "folder_path": folder_path,
-                        "file_name": file_name,
-                        "local_file_path": local_file_path,
-                        "file_size_bytes": file_size,
-                        "download_url" : download_url
-                    })
-                    success = True
-                    break
-                else:
-                    raise Exception("Upload returned None file ID")
-                    
-            except Exception as e:
-                error_msg = f"Attempt {attempt + 1} failed for {doc_id}: {str(e)}"
-                print(f"   ❌ {error_msg}")
-                
-                if attempt == max_retries - 1:  # Last attempt
-                    upload_results["failed_uploads"] += 1
-                    upload_results["errors"].append({
-                        "doc_id": doc_id,
-                        "error": str(e),
-                        "local_file_path": local_file_path,
-                        "folder_path": folder_path
-                    })
-                    upload_results["upload_details"].append({
-                        "doc_id": doc_id,
-                        "doc_date": doc_date,
-                        "status": "failed",
-                        "error": str(e),
-                        "folder_path": folder_path,
-                        "file_name": file_name,
-                        "local_file_path": local_file_path
-                    })
-                else:
-                    time.sleep(2 ** attempt)  # Exponential backoff
-        
-        # Add delay between uploads to avoid rate limiting
-        if success and delay_between_uploads > 0:
-            time.sleep(delay_between_uploads)
+        detail = next(storage_details)
+        detail.update(folder_path=item.get("gdrive_folder_path"), file_name=item.get("file_name"))
+        if "remote_id" in detail:
+            detail.update(gdrive_file_id=detail.pop("remote_id"), gdrive_file_url=detail.pop("url"))
+        upload_results["upload_details"].append(detail)
+    
+    upload_results["drive_api"] = get_drive_throttle_metrics()
     
     # Print summary
     print_upload_summary(upload_results)
@@ -478,7 +792,46 @@ def upload_local_documents_to_gdrive(service, upload_metadata, max_retries=3, de
     return upload_results
 
 
-def upload_local_pdf_to_gdrive(service, local_file_path, file_name, folder_id):
+def make_drive_service_factory(creds):
+    """
+    Build a factory that gives each thread its own Drive service from shared credentials
+    
+    Services are built from the discovery document bundled with google-api-python-client
+    (parsed once per process, no network fetch) and cached per thread, because the httplib2
+    transport is not thread-safe. A thread calling the factory again gets its cached service.
+    
+    Args:
+        creds: Google OAuth credentials from get_cloud_credentials()
+    
+    Returns:
+        Callable returning the calling thread's Google Drive API service object
+    """
+    
+    thread_services = threading.local()
+    
+    def service_factory():
+        if not hasattr(thread_services, "service"):
+            thread_services.service = build_from_document(get_drive_discovery_document(), credentials=creds)
+        return thread_services.service
+    
+    return service_factory
+
+
+def get_drive_discovery_document():
+    """Drive v3 discovery document, loaded from the bundled static copy once per process"""
+    
+    global _drive_discovery_document
+    with _drive_discovery_lock:
+        if _drive_discovery_document is None:
+            document = discovery_cache.get_static_doc('drive', 'v3')
+            if document is None:
+                # Older client libraries without bundled documents: fetch it once
+                document = build('drive', 'v3', static_discovery=False, cache_discovery=False)._rootDesc
+            _drive_discovery_document = json.loads(document) if isinstance(document, str) else document
+        return _drive_discovery_document
+
+
+def upload_local_pdf_to_gdrive(service, local_file_path, file_name, folder_id, chunk_size=DEFAULT_UPLOAD_CHUNK_SIZE, session_store=None):
     """
     Upload a local PDF file to Google Drive
     
@@ -487,28 +840,14 @@ def upload_local_pdf_to_gdrive(service, local_file_path, file_name, folder_id):
         local_file_path: Path to the local PDF file
         file_name: Name for the file in Google Drive
         folder_id: Google Drive folder ID
+        chunk_size: Bytes sent per resumable upload request
+        session_store: UploadSessionStore used to resume interrupted uploads (None to always start over)
     
     Returns:
         File ID if successful, None otherwise
     """
     
     try:
-        # Determine MIME type based on file extension
-        file_extension = Path(local_file_path).suffix.lower()
-        if file_extension == '.pdf':
-            mimetype = 'application/pdf'
-        elif file_extension == '.json':
-            mimetype = 'application/json'
-        else:
-            mimetype = 'application/octet-stream'  # Generic binary
-        
-        # Create media upload from local file
-        media = MediaFileUpload(
-            local_file_path,
-            mimetype=mimetype,
-            resumable=True  # Use resumable upload for larger files
-        )
-        
         # File metadata
         file_metadata = {
             'name': file_name,
@@ -516,12 +855,18 @@ def upload_local_pdf_to_gdrive(service, local_file_path, file_name, folder_id):
         }
         
         # Upload file
-        file = service.files().create(
-            body=file_metadata,
-            media_body=media,
-            fields='id',
-            supportsAllDrives=True
-        ).execute()
+        file = execute_resumable_upload(
+            local_file_path,
+            lambda media: service.files().create(
+                body=file_metadata,
+                media_body=media,
+                fields='id',
+                supportsAllDrives=True
+            ),
+            folder_id,
+            chunk_size,
+            session_store
+        )
         
         return file.get('id')
         
@@ -533,6 +878,154 @@ def upload_local_pdf_to_gdrive(service, local_file_path, file_name, folder_id):
         raise
 
 
+def update_local_file_on_gdrive(service, local_file_path, file_id, chunk_size=DEFAULT_UPLOAD_CHUNK_SIZE, session_store=None):
+    """
+    Replace the content of an existing Google Drive file with a local file
+    
+    Args:
+        service: Google Drive API service object
+        local_file_path: Path to the local file
+        file_id: ID of the Drive file to update
+        chunk_size: Bytes sent per resumable upload request
+        session_store: UploadSessionStore used to resume interrupted uploads (None to always start over)
+    
+    Returns:
+        File ID if successful, None otherwise
+    """
+    
+    try:
+        file = execute_resumable_upload(
+            local_file_path,
+            lambda media: service.files().update(
+                fileId=file_id,
+                media_body=media,
+                fields='id',
+                supportsAllDrives=True
+            ),
+            file_id,
+            chunk_size,
+            session_store
+        )
+        
+        return file.get('id')
+        
+    except HttpError as e:
+        print(f"   ❌ Google Drive update error: {e}")
+        raise
+
+
+def execute_resumable_upload(local_file_path, build_request, target, chunk_size, session_store=None):
+    """
+    Send a file in chunks through a resumable upload session
+    
+    After every chunk the session URI and the offset Drive confirmed are saved in
+    session_store, so a later call for the same file and target (even from a new process)
+    continues from there. Expired sessions (404/410) are dropped and the upload restarts.
+    
+    Args:
+        local_file_path: Path to the local file
+        build_request: Callable taking the MediaFileUpload and returning the Drive request
+        target: Drive folder ID or file ID the upload goes to (a session is only reused for the same target)
+        chunk_size: Bytes sent per request (multiple of 256 KB)
+        session_store: UploadSessionStore or None
+    
+    Returns:
+        Drive API response of the completed upload
+    """
+    
+    session_key = str(local_file_path)
+    file_stat = os.stat(local_file_path)
+    
+    media = MediaFileUpload(
+        local_file_path,
+        mimetype=get_upload_mimetype(local_file_path),
+        chunksize=chunk_size,
+        resumable=True
+    )
+    request = build_request(media)
+    
+    session = session_store.get(session_key, file_stat, target) if session_store else None
+    response = None
+    if session:
+        # Ask Drive for the confirmed offset first instead of sending from byte 0
+        request.resumable_uri = session["uri"]
+        try:
+            request.resumable_progress, response = query_resumable_upload_offset(request, file_stat.st_size)
+        except HttpError as e:
+            if e.resp.status not in (404, 410):
+                raise
+            print("   ⚠️ Saved upload session expired, starting the upload again")
+            session_store.discard(session_key)
+            return execute_resumable_upload(local_file_path, build_request, target, chunk_size, session_store)
+        print(f"   ⏯️ Resuming upload at {format_file_size(request.resumable_progress)} of {format_file_size(file_stat.st_size)}")
+    
+    while response is None:
+        try:
+            status, response = drive_call(request.next_chunk)
+        except HttpError as e:
+            if session and e.resp.status in (404, 410):
+                print("   ⚠️ Saved upload session expired, starting the upload again")
+                session_store.discard(session_key)
+                return execute_resumable_upload(local_file_path, build_request, target, chunk_size, session_store)
+            raise
+        
+        if status:
+            if session_store:
+                session_store.save(session_key, request.resumable_uri, status.resumable_progress, file_stat, target)
+            print(f"   📶 Uploaded {format_file_size(status.resumable_progress)} of "
+                  f"{format_file_size(status.total_size)} ({status.progress() * 100:.0f}%)")
+    
+    if session_store:
+        session_store.discard(session_key)
+    
+    return response
+
+
+def query_resumable_upload_offset(request, total_size):
+    """
+    Ask Drive how much of a resumable upload session it has received
+    
+    Sends the status request of the resumable upload protocol (an empty PUT with
+    Content-Range: bytes */total_size) to the session URI of the request.
+    
+    Args:
+        request: Drive request whose resumable_uri is the saved session URI
+        total_size: Size of the file in bytes
+    
+    Returns:
+        Tuple of (bytes Drive confirmed, Drive API response when the upload had already
+        completed, else None)
+    """
+    
+    def status_request():
+        resp, content = request.http.request(
+            request.resumable_uri,
+            method="PUT",
+            headers={"Content-Length": "0", "Content-Range": f"bytes */{total_size}"}
+        )
+        if resp.status not in (200, 201, 308):
+            raise HttpError(resp, content, uri=request.resumable_uri)
+        return resp, content
+    
+    resp, content = drive_call(status_request)
+    if resp.status in (200, 201):
+        return total_size, request.postproc(resp, content)
+    
+    # 308 Resume Incomplete; Range (bytes=0-N) is missing when nothing was stored yet
+    confirmed_range = resp.get("range")
+    return (int(confirmed_range.rsplit("-", 1)[1]) + 1 if confirmed_range else 0), None
+
+
+def get_upload_mimetype(local_file_path):
+    """Determine MIME type based on file extension"""
+    file_extension = Path(local_file_path).suffix.lower()
+    if file_extension == '.pdf':
+        return 'application/pdf'
+    elif file_extension == '.json':
+        return 'application/json'
+    return 'application/octet-stream'  # Generic binary
+
+
 def file_exists_in_folder(service, file_name, folder_id):
     """
     Check if a file with the given name already exists in the folder
@@ -543,18 +1036,18 @@ def file_exists_in_folder(service, file_name, folder_id):
         folder_id: Google Drive folder ID
     
     Returns:
-        True if file exists, False otherwise
+        Tuple of (True if file exists else False, Drive file ID or None)
     """
     
     try:
         query = f"name='{file_name}' and '{folder_id}' in parents and trashed=false"
         
-        results = service.files().list(
+        results = drive_execute(service.files().list(
             q=query,
             spaces='drive',
             fields='files(id, name)',
             supportsAllDrives=True
-        ).execute()
+        ))
         
         files = results.get('files', [])
         g_drive_id = files[0]['id'] if files else None
@@ -562,7 +1055,7 @@ def file_exists_in_folder(service, file_name, folder_id):
         
     except HttpError as e:
         print(f"   ⚠️ Error checking file existence: {e}")
-        return False
+        return False, None
 
 
 def print_upload_summary(upload_results):
@@ -0,0 +1,412 @@
+import csv
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import fitz
+
+from .archive_manifest_utils import ArchiveManifest, get_archive_manifest_path, get_file_lang
+from .metadata_snapshot_utils import get_metadata_snapshot_path, load_metadata_snapshot, save_metadata_snapshot, drop_from_metadata_snapshot
+
+# 1 MiB reads keep hashing I/O bound and let hashlib release the GIL on every update
+VERIFY_READ_SIZE = 1024 * 1024
+DEFAULT_VERIFY_WORKERS = 16
+# Gazettes are a few pages long; anything outside this range is treated as damaged
+DEFAULT_MAX_PAGES = 5000
+
+# File problems that need the document to be downloaded again
+REDOWNLOAD_PROBLEMS = ("missing", "empty", "not_pdf", "truncated", "unreadable", "bad_page_count", "size_mismatch", "hash_mismatch")
+
+# PyMuPDF is not thread-safe; hashing runs in parallel, opening the PDFs is serialized
+_fitz_lock = threading.Lock()
+
+
+def get_relative_archive_path(file_path):
+    """YYYY/MM/DD/doc_id/file part of an archived file path, so logs still match after the archive moved"""
+    parts = Path(str(file_path)).parts
+    if len(parts) < 5:
+        return None
+    return Path(*parts[-5:])
+
+
+def list_month_files(month_dir):
+    """PDF files below one YYYY/MM folder (one os.scandir per folder, no stat calls)"""
+
+    pdf_files = []
+    with os.scandir(month_dir) as days:
+        for day in days:
+            if not day.is_dir():
+                continue
+            with os.scandir(day.path) as doc_dirs:
+                for doc_dir in doc_dirs:
+                    if not doc_dir.is_dir():
+                        continue
+                    with os.scandir(doc_dir.path) as files:
+                        pdf_files.extend(Path(f.path) for f in files if f.name.lower().endswith(".pdf"))
+    return pdf_files
+
+
+def get_archive_years(archive_location, years=None):
+    """Year folders of the archive, limited to the given years"""
+    archive_location = Path(archive_location)
+    if years:
+        return [str(year) for year in years if (archive_location / str(year)).is_dir()]
+    return sorted(entry.name for entry in os.scandir(archive_location) if entry.is_dir() and entry.name.isdigit())
+
+
+def load_expected_files(archive_location, year, manifest=None):
+    """
+    Files a year should contain according to the manifest, or the archived_logs.csv without one
+
+    Failed manifest entries are included too (a killed run may have left a partial file);
+    only entries with status "archived" are reported missing when their file is absent.
+
+    Returns:
+        Dict of relative path -> expected entry (doc_id, lang, size, sha256, download_url, date)
+    """
+
+    expected = {}
+    if manifest:
+        entries = [entry for entry in manifest.get_year_entries(year) if entry["status"] != "unavailable"]
+    else:
+        entries = []
+        log_file = Path(archive_location) / str(year) / "archived_logs.csv"
+        if log_file.exists():
+            with open(log_file, "r", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    entries.append({
+                        "doc_id": row.get("doc_id"), "lang": get_file_lang(row.get("file_path")), "status": "archived",
+                        "path": row.get("file_path"), "download_url": row.get("download_url")
+                    })
+
+    for entry in entries:
+        relative_path = get_relative_archive_path(entry.get("path") or "")
+        if relative_path is not None:
+            expected[relative_path] = entry
+    return expected
+
+
+def check_archive_file(file_path, expected=None, check_pdf=True, max_pages=DEFAULT_MAX_PAGES):
+    """
+    Hash one archived file and check that it is a complete, readable PDF
+
+    Args:
+        file_path: PDF to check
+        expected: Manifest or log entry of the file (size/sha256 are compared when known)
+        check_pdf: Open the PDF and check its page count
+        max_pages: Highest page count considered sane
+
+    Returns:
+        Dict with path, size, sha256, pages and problem (None when the file is fine)
+    """
+
+    result = {"path": str(file_path), "size": 0, "sha256": None, "pages": None, "problem": None}
+    digest = hashlib.sha256()
+    buffer = bytearray(VERIFY_READ_SIZE)
+    view = memoryview(buffer)
+    head = b""
+    tail = b""
+
+    try:
+        with open(file_path, "rb", buffering=0) as f:
+            while True:
+                read = f.readinto(buffer)
+                if not read:
+                    break
+                digest.update(view[:read])
+                if not head:
+                    head = bytes(view[:8])
+                # Keep the last 2 KiB read to look for the %%EOF trailer
+                tail = (tail + bytes(view[max(0, read - 2048):read]))[-2048:]
+                result["size"] += read
+    except OSError as e:
+        result["problem"] = "missing" if isinstance(e, FileNotFoundError) else "unreadable"
+        result["error"] = str(e)
+        return result
+
+    result["sha256"] = digest.hexdigest()
+    expected = expected or {}
+
+    if result["size"] == 0:
+        result["problem"] = "empty"
+    elif not head.startswith(b"%PDF-"):
+        result["problem"] = "not_pdf"
+    elif b"%%EOF" not in tail:
+        result["problem"] = "truncated"
+    elif expected.get("size") is not None and expected["size"] != result["size"]:
+        result["problem"] = "size_mismatch"
+    elif expected.get("sha256") and expected["sha256"] != result["sha256"]:
+        result["problem"] = "hash_mismatch"
+
+    if result["problem"] is None and check_pdf:
+        try:
+            with _fitz_lock:
+                with fitz.open(file_path) as doc:
+                    result["pages"] = doc.page_count
+            if not 0 < result["pages"] <= max_pages:
+                result["problem"] = "bad_page_count"
+        except Exception as e:
+            result["problem"] = "unreadable"
+            result["error"] = str(e)
+
+    return result
+
+
+def verify_archive(archive_location, years=None, manifest=None, workers=DEFAULT_VERIFY_WORKERS, check_pdf=True, max_pages=DEFAULT_MAX_PAGES):
+    """
+    Check every PDF of the archive and reconcile the tree with the manifest or the logs
+
+    Walking the month folders and hashing run on a thread pool, so slow (network) storage is
+    read with many requests in flight. PyMuPDF is not thread-safe, so with check_pdf the PDFs
+    are still opened one at a time (_fitz_lock): workers speed up reading and hashing, not
+    the page count checks.
+    
+    Years the manifest has not seen yet are imported from their download logs first, so
+    archives made before the manifest existed are not reported as untracked.
+
+    Args:
+        archive_location: Root of the local archive
+        years: Years to verify (default: every year folder)
+        manifest: Optional ArchiveManifest; without it archived_logs.csv is the reference
+        workers: Threads used for walking and hashing
+        check_pdf: Open each PDF and check its page count (hash and trailer checks always run)
+        max_pages: Highest page count considered sane
+
+    Returns:
+        Report dict (summary, problems, untracked files)
+    """
+
+    archive_location = Path(archive_location).expanduser()
+    started = time.time()
+    checked_years = get_archive_years(archive_location, years)
+
+    summary = {"files_checked": 0, "ok": 0, "missing": 0, "untracked": 0, "bytes_read": 0}
+    problems = []
+    untracked = []
+    checked = []
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for year in checked_years:
+            year_dir = archive_location / year
+            if manifest:
+                manifest.ensure_year_imported(year_dir, year)
+            expected = load_expected_files(archive_location, year, manifest)
+            month_dirs = [entry.path for entry in os.scandir(year_dir) if entry.is_dir()]
+
+            on_disk = [path for files in executor.map(list_month_files, month_dirs) for path in files]
+            relative_paths = [path.relative_to(archive_location) for path in on_disk]
+            # Look the entries up before the checks start; the loop below pops them from expected
+            entries = [expected.get(relative_path) for relative_path in relative_paths]
+            results = executor.map(
+                lambda item: check_archive_file(item[0], item[1], check_pdf, max_pages),
+                zip(on_disk, entries)
+            )
+
+            for relative_path, result in zip(relative_paths, results):
+                entry = expected.pop(relative_path, None)
+                summary["files_checked"] += 1
+                summary["bytes_read"] += result["size"]
+                result.update(
+                    year=year,
+                    tracked=entry is not None,
+                    doc_id=entry["doc_id"] if entry else relative_path.parent.name,
+                    lang=entry["lang"] if entry else get_file_lang(relative_path.name),
+                    download_url=entry.get("download_url") if entry else None,
+                    date=entry.get("date") if entry else None
+                )
+                checked.append(result)
+
+                if result["problem"]:
+                    summary[result["problem"]] = summary.get(result["problem"], 0) + 1
+                    problems.append(result)
+                else:
+                    summary["ok"] += 1
+                if entry is None:
+                    summary["untracked"] += 1
+                    untracked.append(str(relative_path))
+
+            # Whatever is left was archived according to the reference but is not on disk
+            for relative_path, entry in expected.items():
+                if entry["status"] != "archived":
+                    continue
+                summary["missing"] += 1
+                problems.append({
+                    "path": str(archive_location / relative_path), "year": year, "tracked": True, "doc_id": entry["doc_id"],
+                    "lang": entry["lang"], "download_url": entry.get("download_url"), "date": entry.get("date"),
+                    "size": None, "sha256": None, "pages": None, "problem": "missing"
+                })
+
+            print(f"🔎 {year}: {len(on_disk)} files checked, {sum(1 for p in problems if p['year'] == year)} problems")
+
+    duration = time.time() - started
+    return {
+        "archive_location": str(archive_location),
+        "reference": "manifest" if manifest else "archived_logs.csv",
+        "years": checked_years,
+        "started_at": datetime.fromtimestamp(started).isoformat(timespec="seconds"),
+        "duration_seconds": round(duration, 2),
+        "workers": workers,
+        "files_per_second": round(summary["files_checked"] / duration, 1) if duration else 0.0,
+        "mb_per_second": round(summary["bytes_read"] / (1024 * 1024) / duration, 1) if duration else 0.0,
+        "summary": summary,
+        "problems": problems,
+        "untracked": untracked,
+        "checked": checked
+    }
+
+
+def get_redownload_problems(problems):
+    """Problems of documents known to the manifest or logs (untracked files have no download URL)"""
+    return [problem for problem in problems if problem["tracked"] and problem["problem"] in REDOWNLOAD_PROBLEMS]
+
+
+def write_redownload_list(problems, output_path):
+    """Write the documents that need downloading again as CSV (doc_id, lang, date, download_url, file_path, problem)"""
+
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    redownload = get_redownload_problems(problems)
+
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["doc_id", "lang", "date", "download_url", "file_path", "problem"])
+        for problem in redownload:
+            writer.writerow([problem["doc_id"], problem["lang"], problem.get("date"), problem.get("download_url"), problem["path"], problem["problem"]])
+    return len(redownload)
+
+
+def update_manifest_from_report(manifest, report):
+    """
+    Mark damaged or missing documents as failed and record intact ones as archived with their hash
+
+    Failed documents are downloaded again by the next run of their period once they are also
+    dropped from the metadata snapshot (drop_redownloads_from_snapshots()).
+
+    Returns:
+        Tuple of (documents marked failed, hashes recorded)
+    """
+
+    marked = 0
+    for problem in get_redownload_problems(report["problems"]):
+        if problem.get("lang"):
+            manifest.record(problem["doc_id"], problem["lang"], "failed", path=problem["path"])
+            marked += 1
+
+    known = {}
+    for result in report["checked"]:
+        if result["tracked"] and not result["problem"] and result.get("lang"):
+            known.setdefault(result["lang"], []).append(result)
+
+    hashed = 0
+    for lang, results in known.items():
+        entries = manifest.get_entries((result["doc_id"] for result in results), lang)
+        for result in results:
+            entry = entries.get(result["doc_id"])
+            if entry and (entry["status"] != "archived" or not entry["sha256"]):
+                manifest.record(result["doc_id"], lang, "archived", path=result["path"], size=result["size"], sha256=result["sha256"])
+                hashed += 1
+    return marked, hashed
+
+
+def drop_redownloads_from_snapshots(config, problems):
+    """
+    Drop documents that need downloading again from their (year, lang) metadata snapshot
+
+    Otherwise the delta run sees their table rows as unchanged and never gets to the failed
+    manifest entries.
+
+    Returns:
+        Number of snapshot rows dropped
+    """
+
+    doc_ids_by_snapshot = {}
+    for problem in get_redownload_problems(problems):
+        if problem.get("lang"):
+            doc_ids_by_snapshot.setdefault((problem["year"], problem["lang"]), set()).add(problem["doc_id"])
+
+    dropped = 0
+    for (year, lang), doc_ids in doc_ids_by_snapshot.items():
+        snapshot_path = get_metadata_snapshot_path(config, year, lang)
+        snapshot_rows = load_metadata_snapshot(snapshot_path)
+        removed = drop_from_metadata_snapshot(snapshot_rows, doc_ids)
+        if removed:
+            save_metadata_snapshot(snapshot_path, snapshot_rows)
+            dropped += removed
+    return dropped
+
+
+def run_verify_command(args, config):
+    """
+    Entry point for `gztarchiver verify`
+
+    Args:
+        args: Parsed arguments from parse_verify_args()
+        config: Loaded config.yaml
+
+    Returns:
+        Process exit code (1 when a document needs downloading again)
+    """
+
+    archive_location = Path(config["archive"]["archive_location"]).expanduser()
+    if not archive_location.is_dir():
+        print(f"❌ Archive not found: {archive_location}")
+        return 1
+
+    # Only read an existing manifest; verifying should not create one
+    manifest = None
+    manifest_path = get_archive_manifest_path(config)
+    if manifest_path.exists():
+        manifest = ArchiveManifest(manifest_path)
+        print(f"📒 Reconciling against the archive manifest {manifest_path}")
+    else:
+        print("📋 No archive manifest, reconciling against archived_logs.csv")
+
+    try:
+        report = verify_archive(
+            archive_location, years=args.year, manifest=manifest, workers=args.workers,
+            check_pdf=not args.no_pdf_check, max_pages=args.max_pages
+        )
+
+        if args.update_manifest and manifest:
+            marked, hashed = update_manifest_from_report(manifest, report)
+            dropped = drop_redownloads_from_snapshots(config, report["problems"])
+            print(f"📒 Archive manifest updated: {marked} documents marked failed, {hashed} intact files recorded, "
+                  f"{dropped} dropped from the metadata snapshots")
+        elif args.update_manifest:
+            print("⚠️ --update-manifest needs an archive manifest, nothing was updated")
+    finally:
+        if manifest:
+            manifest.close()
+
+    summary = report["summary"]
+    print("\n" + "=" * 60)
+    print("🧾 ARCHIVE VERIFICATION SUMMARY")
+    print("=" * 60)
+    print(f"Years: {', '.join(report['years']) or 'none'} (reference: {report['reference']})")
+    print(f"Files checked: {summary['files_checked']} in {report['duration_seconds']}s "
+          f"({report['files_per_second']} files/s, {report['mb_per_second']} MB/s)")
+    for key, value in summary.items():
+        if key not in ("files_checked", "bytes_read"):
+            print(f"   {key}: {value}")
+    print("=" * 60)
+
+    if args.report:
+        report_path = Path(args.report)
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump({key: value for key, value in report.items() if key != "checked"}, f, indent=2)
+        print(f"📝 Verification report saved to: {report_path}")
+
+    redownload_path = args.redownload_list or archive_location / "redownload.csv"
+    redownload_count = write_redownload_list(report["problems"], redownload_path)
+    if redownload_count:
+        print(f"🔁 {redownload_count} documents need downloading again, listed in: {redownload_path}")
+        return 1
+
+    print("✅ Archive is intact")
+    return 0
@@ -1,22 +1,72 @@
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.oauth2.credentials import Credentials
+from google.auth.transport.requests import Request
+from google.auth.exceptions import RefreshError
 import os
+import sys
+import threading
 
 # This permission scope lets your program access Google Drive
 SCOPES = ['https://www.googleapis.com/auth/drive']
 
+# Credentials already loaded in this process, by token path (shared by every stage and worker)
+_credentials_cache = {}
+_credentials_lock = threading.Lock()
+
 # This function helps you log in and get credentials
-def get_cloud_credentials(config):
-    creds = None
-    
+def get_cloud_credentials(config, interactive=None):
+    """
+    Load Google Drive credentials, refreshing an expired token silently
+
+    The browser login only runs when there is no usable token at all (missing, or the
+    refresh token was revoked), and never in unattended runs.
+
+    Args:
+        config: Loaded config.yaml
+        interactive: Allow the browser login flow (default: only when attached to a terminal)
+
+    Returns:
+        Valid Google OAuth credentials
+    """
+
     token_path = config["credentials"]["token_path"]
     client_secrets_path = config["credentials"]["client_secrets_path"]
-    
-    if os.path.exists(token_path):
-        creds = Credentials.from_authorized_user_file(token_path, SCOPES)
-    if not creds or not creds.valid:
-        flow = InstalledAppFlow.from_client_secrets_file(client_secrets_path, SCOPES)
-        creds = flow.run_local_server(port=0)
-        with open(token_path, 'w') as token:
-            token.write(creds.to_json())
-    return creds
\ No newline at end of file
+
+    with _credentials_lock:
+        creds = _credentials_cache.get(token_path)
+        if creds and creds.valid:
+            return creds
+
+        if creds is None and os.path.exists(token_path):
+            creds = Credentials.from_authorized_user_file(token_path, SCOPES)
+
+        # An expired access token only needs a refresh, not a new login
+        if creds and not creds.valid and creds.refresh_token:
+            try:
+                creds.refresh(Request())
+                save_token(token_path, creds)
+            except RefreshError as e:
+                print(f"⚠️ Google Drive token could not be refreshed: {e}")
+                creds = None
+
+        if not creds or not creds.valid:
+            if interactive is None:
+                interactive = sys.stdin is not None and sys.stdin.isatty()
+            if not interactive:
+                raise RuntimeError(
+                    f"No valid Google Drive token at {token_path}. Run gztarchiver once from a terminal to log in."
+                )
+            flow = InstalledAppFlow.from_client_secrets_file(client_secrets_path, SCOPES)
+            creds = flow.run_local_server(port=0)
+            save_token(token_path, creds)
+
+        _credentials_cache[token_path] = creds
+        return creds
+
+
+def save_token(token_path, creds):
+    """Write the token atomically so a crash never leaves a half-written token file"""
+    tmp_path = f"{token_path}.tmp"
+    with open(tmp_path, 'w') as token:
+        token.write(creds.to_json())
+    os.replace(tmp_path, token_path)
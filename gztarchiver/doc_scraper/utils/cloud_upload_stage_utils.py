@@ -0,0 +1,245 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from .archive_to_cloud_utils import save_upload_results
+from .cloud_credential_utils import get_cloud_credentials
+from .object_storage_utils import build_storage_items, upload_to_storage, get_storage_backend
+
+UPLOAD_RESULT_COUNTERS = [
+    "total_documents",
+    "successful_uploads",
+    "failed_uploads",
+    "unavailable_documents",
+    "skipped_documents",
+    "file_not_found"
+]
+
+class CloudUploadStage:
+    """
+    Background stage backing documents up to a storage backend while the pipeline keeps running
+
+    Documents are submitted as soon as they are saved locally and wait in a queue of
+    queue_size documents. submit() never blocks, because the download spider calls it from the
+    Twisted reactor thread: the spider pauses its downloads while is_full() and resumes them
+    once uploads have caught up, so only the downloads already in flight when it paused go to
+    a small overflow list. submit_many() is called from worker threads and waits for room
+    instead. One consumer thread moves overflow documents into the queue as it drains, groups
+    queued documents into small batches and hands each batch to upload_to_storage() with
+    upload_workers concurrent workers. Backend caches (e.g. the Drive folder cache and sync
+    manifest) are saved periodically by the backend and once more in close().
+
+    Args:
+        backend: StorageBackend from get_storage_backend()
+        upload_workers: Concurrent upload workers per batch
+        queue_size: Documents waiting for upload before is_full() asks downloads to pause
+        batch_size: Maximum number of documents handled together
+        batch_wait: Seconds to wait for more documents before handling a partial batch
+        upload_results_path: Prefix of the JSON file the combined results are saved to (None to skip)
+    """
+
+    def __init__(self, backend, upload_workers=4, queue_size=100, batch_size=25, batch_wait=2.0, upload_results_path=None):
+        self.backend = backend
+        self.upload_workers = max(1, upload_workers)
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait
+        self.upload_results_path = upload_results_path
+
+        self.upload_results = {counter: 0 for counter in UPLOAD_RESULT_COUNTERS}
+        self.upload_results["upload_details"] = []
+        self.upload_results["errors"] = []
+
+        # Long-lived workers keep their per-thread clients (e.g. Drive services) across batches
+        self._executor = ThreadPoolExecutor(max_workers=self.upload_workers, thread_name_prefix=f"{backend.name}-upload")
+        self._queue = queue.Queue(maxsize=max(1, queue_size))
+        self._overflow = deque()
+        self._overflow_lock = threading.Lock()
+        self._submitted = set()
+        self._submitted_lock = threading.Lock()
+        self._closed = False
+        self._closing = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="cloud-upload-stage", daemon=True)
+        self._thread.start()
+
+        print(f"☁️ Cloud upload stage started ({backend.name}, {self.upload_workers} workers, queue size {queue_size})")
+
+    def submit(self, doc, block=False):
+        """
+        Queue a downloaded document for upload
+
+        Args:
+            doc: Download metadata item (doc_id, date, download_url, availability, ...)
+            block: Wait for room in the queue (only from worker threads, never the reactor)
+
+        Returns:
+            True if the document was queued, False if its file is already waiting or cannot be uploaded
+        """
+
+        # Unavailable documents have no file to back up
+        if self._closed or doc.get("availability") != "Available":
+            return False
+
+        # Keyed by file: each language of a document is its own upload, and a file can be
+        # queued again (e.g. a refreshed PDF) once its previous upload has been handled
+        file_key = str(doc.get("file_path"))
+        with self._submitted_lock:
+            if file_key in self._submitted:
+                return False
+            self._submitted.add(file_key)
+
+        if block:
+            while not self._closed:
+                try:
+                    self._queue.put(doc, timeout=self.batch_wait)
+                    return True
+                except queue.Full:
+                    continue
+            with self._submitted_lock:
+                self._submitted.discard(file_key)
+            return False
+
+        # Never block the caller (the reactor thread); the overflow only holds the downloads
+        # finishing after is_full() paused the spider and is drained by the consumer thread
+        with self._overflow_lock:
+            if self._overflow:
+                self._overflow.append(doc)
+                return True
+        try:
+            self._queue.put_nowait(doc)
+        except queue.Full:
+            with self._overflow_lock:
+                self._overflow.append(doc)
+        return True
+
+    def submit_many(self, docs):
+        """
+        Queue documents not waiting yet (e.g. archived by earlier runs), waiting for room in the queue
+
+        Call it from a worker thread (e.g. threads.deferToThread), never from the reactor.
+
+        Args:
+            docs: Download metadata items
+
+        Returns:
+            Number of documents queued
+        """
+        return sum(1 for doc in docs if self.submit(doc, block=True))
+
+    def is_full(self):
+        """True while queue_size or more documents wait for upload (downloads should pause)"""
+        return self.pending() >= self._queue.maxsize
+
+    def pending(self):
+        """Number of documents waiting in the queue or its overflow"""
+        with self._overflow_lock:
+            return self._queue.qsize() + len(self._overflow)
+
+    def close(self):
+        """
+        Wait until every queued document has been handled
+
+        Returns:
+            Combined upload results of the stage
+        """
+
+        if not self._closed:
+            self._closed = True
+            print(f"☁️ Waiting for {self.pending()} queued documents to finish uploading...")
+            self._closing.set()
+            self._thread.join()
+            self._executor.shutdown()
+            # Persist backend caches (folder cache, sync manifest) once at the end
+            self.backend.close()
+
+            print(f"☁️ Cloud upload stage finished: {self.upload_results['successful_uploads']} uploaded, "
+                  f"{self.upload_results['skipped_documents']} already in sync, "
+                  f"{self.upload_results['failed_uploads'] + self.upload_results['file_not_found']} failed")
+
+            if self.upload_results_path:
+                save_upload_results(self.upload_results, self.upload_results_path)
+
+        return self.upload_results
+
+    def _refill_queue(self):
+        """Move overflow documents into the queue while it has room (keeps submission order)"""
+        with self._overflow_lock:
+            while self._overflow:
+                try:
+                    self._queue.put_nowait(self._overflow[0])
+                except queue.Full:
+                    break
+                self._overflow.popleft()
+
+    def _run(self):
+        while True:
+            self._refill_queue()
+            try:
+                # The timeout also picks up documents that went to the overflow while the queue drained
+                doc = self._queue.get(timeout=self.batch_wait)
+            except queue.Empty:
+                if self._closing.is_set() and not self.pending():
+                    break
+                continue
+
+            # Group documents that arrive close together (Drive folders then resolve in one batched pass)
+            batch = [doc]
+            deadline = time.monotonic() + self.batch_wait
+            while len(batch) < self.batch_size:
+                self._refill_queue()
+                try:
+                    timeout = 0.0 if self._closing.is_set() else max(0.0, deadline - time.monotonic())
+                    batch.append(self._queue.get(timeout=timeout))
+                except queue.Empty:
+                    break
+
+            try:
+                self._upload_batch(batch)
+            except Exception as e:
+                print(f"❌ Cloud upload failed for {len(batch)} documents: {e}")
+                self.upload_results["failed_uploads"] += len(batch)
+                self.upload_results["errors"].extend({"doc_id": doc.get("doc_id"), "error": str(e)} for doc in batch)
+            finally:
+                with self._submitted_lock:
+                    self._submitted.difference_update(str(doc.get("file_path")) for doc in batch)
+
+    def _upload_batch(self, batch):
+        batch_results = upload_to_storage(self.backend, build_storage_items(batch), max_workers=self.upload_workers, executor=self._executor)
+
+        for counter in UPLOAD_RESULT_COUNTERS:
+            self.upload_results[counter] += batch_results[counter]
+        self.upload_results["upload_details"].extend(batch_results["upload_details"])
+        self.upload_results["errors"].extend(batch_results["errors"])
+
+
+def start_cloud_upload_stage(config):
+    """
+    Start the cloud upload stage if it is enabled in the config (cloud.enabled)
+
+    Args:
+        config: Loaded config.yaml
+
+    Returns:
+        A running CloudUploadStage, or None when disabled or the backend could not be opened
+    """
+
+    cloud_config = config.get("cloud") or {}
+    if not cloud_config.get("enabled", False):
+        return None
+
+    try:
+        # Only Google Drive needs an OAuth login
+        creds = get_cloud_credentials(config) if cloud_config.get("backend", "gdrive") == "gdrive" else None
+        backend = get_storage_backend(config, creds)
+    except Exception as e:
+        print(f"⚠️ Cloud upload disabled for this run, the storage backend could not be opened: {e}")
+        return None
+
+    return CloudUploadStage(
+        backend,
+        upload_workers=cloud_config.get("upload_workers", 4),
+        queue_size=cloud_config.get("queue_size", 100),
+        batch_size=cloud_config.get("batch_size", 25),
+        upload_results_path=config["output"].get("upload_results_json")
+    )
@@ -0,0 +1,237 @@
+import json
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Bucket upper bounds, Prometheus style (+Inf is implied)
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (1024, 10 * 1024, 100 * 1024, 512 * 1024, 1024 * 1024, 5 * 1024 * 1024, 10 * 1024 * 1024, 50 * 1024 * 1024)
+RETRY_BUCKETS = (0, 1, 2, 3, 5)
+
+PROMETHEUS_TEXTFILE_NAME = "gztarchiver_crawl.prom"
+RUN_REPORT_NAME = "crawl_run_report.json"
+
+# Metrics of every spider that ran in this process, by spider name; cumulative across runs
+# of the same spider (watch cycles), like Prometheus counters
+_crawl_metrics_registry = {}
+
+
+class Histogram:
+    """
+    Cumulative bucket histogram with a count and a sum
+
+    Args:
+        buckets: Sorted bucket upper bounds
+    """
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (None when empty or beyond the last bucket)"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return None
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "mean": round(self.sum / self.count, 4) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+            "buckets": {str(bound): count for bound, count in zip(self.buckets + ("+Inf",), self.counts)}
+        }
+
+
+class CrawlMetrics:
+    """
+    Per-request metrics of one spider, recorded by the instrumented middlewares
+
+    Args:
+        spider_name: Name of the spider the metrics belong to
+    """
+
+    def __init__(self, spider_name):
+        self.spider_name = spider_name
+        self.request_seconds = Histogram(LATENCY_BUCKETS)
+        self.response_bytes = Histogram(SIZE_BUCKETS)
+        self.request_retries = Histogram(RETRY_BUCKETS)
+        self.callback_seconds = Histogram(LATENCY_BUCKETS)
+        self.requests = 0
+        self.status_codes = {}
+        self.download_exceptions = {}
+        self.spider_exceptions = {}
+        self.items = 0
+        self.runs = 0
+        self.started_at = None
+        self.finished_at = None
+        self.finish_reason = None
+        self.scrapy_stats = {}
+
+    def record_response(self, status, seconds, size, retries):
+        self.status_codes[str(status)] = self.status_codes.get(str(status), 0) + 1
+        self.request_seconds.observe(seconds)
+        self.response_bytes.observe(size)
+        self.request_retries.observe(retries)
+
+    def record_download_exception(self, exception, seconds):
+        name = type(exception).__name__
+        self.download_exceptions[name] = self.download_exceptions.get(name, 0) + 1
+        self.request_seconds.observe(seconds)
+
+    def record_spider_exception(self, exception):
+        name = type(exception).__name__
+        self.spider_exceptions[name] = self.spider_exceptions.get(name, 0) + 1
+
+    def record_stats(self, stats, reason):
+        """Keep the Scrapy stats collector of the finished run (datetimes as ISO strings)"""
+        self.finished_at = datetime.now().isoformat(timespec="seconds")
+        self.finish_reason = reason
+        self.scrapy_stats = {
+            key: value.isoformat() if isinstance(value, datetime) else value
+            for key, value in sorted(stats.items())
+        }
+
+    def to_dict(self):
+        return {
+            "spider": self.spider_name,
+            "runs": self.runs,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "finish_reason": self.finish_reason,
+            "requests": self.requests,
+            "items": self.items,
+            "status_codes": self.status_codes,
+            "download_exceptions": self.download_exceptions,
+            "spider_exceptions": self.spider_exceptions,
+            "request_seconds": self.request_seconds.to_dict(),
+            "response_bytes": self.response_bytes.to_dict(),
+            "request_retries": self.request_retries.to_dict(),
+            "callback_seconds": self.callback_seconds.to_dict(),
+            "scrapy_stats": self.scrapy_stats
+        }
+
+
+def get_crawl_metrics(spider_name):
+    """Metrics of a spider, shared by its downloader and spider middleware"""
+    if spider_name not in _crawl_metrics_registry:
+        _crawl_metrics_registry[spider_name] = CrawlMetrics(spider_name)
+    return _crawl_metrics_registry[spider_name]
+
+
+def add_prometheus_histogram(families, name, help_text, spider_name, histogram):
+    samples = families.setdefault(name, (help_text, "histogram", []))[2]
+    cumulative = 0
+    for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+        cumulative += count
+        samples.append(f'{name}_bucket{{spider="{spider_name}",le="{bound}"}} {cumulative}')
+    samples.append(f'{name}_sum{{spider="{spider_name}"}} {histogram.sum}')
+    samples.append(f'{name}_count{{spider="{spider_name}"}} {histogram.count}')
+
+
+def add_prometheus_samples(families, name, help_text, metric_type, spider_name, values, label=None):
+    samples = families.setdefault(name, (help_text, metric_type, []))[2]
+    if label is None:
+        samples.append(f'{name}{{spider="{spider_name}"}} {values}')
+        return
+    for key, value in sorted(values.items()):
+        samples.append(f'{name}{{spider="{spider_name}",{label}="{key}"}} {value}')
+
+
+def render_prometheus_textfile(all_metrics):
+    """Prometheus text exposition of the metrics, for the node_exporter textfile collector"""
+
+    # Samples are grouped per metric family, as the exposition format requires
+    families = {}
+    for metrics in all_metrics:
+        name = metrics.spider_name
+        add_prometheus_histogram(families, "gztarchiver_request_duration_seconds", "Download time of a request", name, metrics.request_seconds)
+        add_prometheus_histogram(families, "gztarchiver_response_size_bytes", "Body size of a response", name, metrics.response_bytes)
+        add_prometheus_histogram(families, "gztarchiver_request_retries", "Retries before the final response", name, metrics.request_retries)
+        add_prometheus_histogram(families, "gztarchiver_callback_duration_seconds", "Time spent in a spider callback", name, metrics.callback_seconds)
+        add_prometheus_samples(families, "gztarchiver_requests_total", "Requests sent to the downloader", "counter", name, metrics.requests)
+        add_prometheus_samples(families, "gztarchiver_items_total", "Items scraped", "counter", name, metrics.items)
+        add_prometheus_samples(families, "gztarchiver_responses_total", "Responses by HTTP status", "counter", name, metrics.status_codes, "status")
+        add_prometheus_samples(families, "gztarchiver_download_exceptions_total", "Download errors by exception", "counter", name, metrics.download_exceptions, "exception")
+        add_prometheus_samples(families, "gztarchiver_spider_exceptions_total", "Callback errors by exception", "counter", name, metrics.spider_exceptions, "exception")
+        numeric_stats = {
+            key: value for key, value in metrics.scrapy_stats.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        }
+        add_prometheus_samples(families, "gztarchiver_scrapy_stat", "Numeric Scrapy stats of the last run", "gauge", name, numeric_stats, "stat")
+
+    lines = []
+    for name, (help_text, metric_type, samples) in families.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.extend(samples)
+    lines.append("# HELP gztarchiver_crawl_metrics_updated_timestamp_seconds Time the metrics were last written")
+    lines.append("# TYPE gztarchiver_crawl_metrics_updated_timestamp_seconds gauge")
+    lines.append(f"gztarchiver_crawl_metrics_updated_timestamp_seconds {time.time():.0f}")
+    return "\n".join(lines) + "\n"
+
+
+def write_atomically(path, content):
+    """Write through a temporary file so readers (node_exporter) never see a partial file"""
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def write_crawl_metrics(metrics_location):
+    """
+    Export the metrics of every spider run so far as a Prometheus textfile and a JSON run report
+
+    Args:
+        metrics_location: Folder of gztarchiver_crawl.prom and crawl_run_report.json
+    """
+
+    metrics_dir = Path(metrics_location).expanduser()
+    all_metrics = list(_crawl_metrics_registry.values())
+
+    try:
+        metrics_dir.mkdir(parents=True, exist_ok=True)
+        write_atomically(metrics_dir / PROMETHEUS_TEXTFILE_NAME, render_prometheus_textfile(all_metrics))
+        write_atomically(metrics_dir / RUN_REPORT_NAME, json.dumps({
+            "updated_at": datetime.now().isoformat(timespec="seconds"),
+            "spiders": {metrics.spider_name: metrics.to_dict() for metrics in all_metrics}
+        }, indent=2, default=str))
+    except OSError as e:
+        print(f"⚠️ Failed to write crawl metrics to {metrics_dir}: {e}")
+
+
+def print_crawl_metrics_summary(metrics):
+    """One-line summary of a finished spider (Scrapy's own stats dump is hidden at ERROR level)"""
+
+    latency = metrics.request_seconds
+    p50 = latency.quantile(0.5)
+    p95 = latency.quantile(0.95)
+    statuses = ", ".join(f"{status}: {count}" for status, count in sorted(metrics.status_codes.items())) or "none"
+    retries = metrics.scrapy_stats.get("retry/count", 0)
+    megabytes = metrics.scrapy_stats.get("downloader/response_bytes", 0) / (1024 * 1024)
+    print(f"📈 {metrics.spider_name}: {metrics.scrapy_stats.get('downloader/request_count', 0)} requests, "
+          f"{megabytes:.1f} MB, p50 ≤ {p50 if p50 is not None else '-'}s, p95 ≤ {p95 if p95 is not None else '-'}s, "
+          f"{retries} retries, status {statuses}")
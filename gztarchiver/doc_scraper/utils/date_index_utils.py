@@ -0,0 +1,90 @@
+from bisect import bisect_left, bisect_right
+from datetime import date
+
+
+class DateIndex:
+    """
+    Table rows of one or more year pages, sorted by publication date
+
+    Rows are kept in date order next to a parallel list of their ISO dates, so a date range
+    is found with two bisect lookups instead of a scan over every row. Each row remembers the
+    year page it came from, which is the year its archive logs and snapshot belong to.
+
+    Args:
+        rows_by_year: Optional dict of year -> table rows to index right away
+    """
+
+    def __init__(self, rows_by_year=None):
+        self._dates = []
+        self._entries = []
+        self.skipped = 0
+
+        for year, rows in (rows_by_year or {}).items():
+            self.add_rows(rows, year)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def add_rows(self, rows, year=None):
+        """
+        Add the rows of a year page (rows with an invalid date are skipped)
+
+        Args:
+            rows: Table rows with an ISO "date" (YYYY-MM-DD)
+            year: Year page the rows come from (default: year of each row's date)
+        """
+
+        entries = list(self._entries)
+        for row in rows:
+            row_date = parse_row_date(row.get("date"))
+            if row_date is None:
+                self.skipped += 1
+                continue
+            entries.append((row_date.isoformat(), int(year) if year else row_date.year, row))
+
+        # Stable sort keeps the table order of rows published on the same day
+        entries.sort(key=lambda entry: entry[0])
+        self._entries = entries
+        self._dates = [entry[0] for entry in entries]
+
+    def range(self, start=None, end=None):
+        """
+        Rows published between start and end, both inclusive
+
+        Args:
+            start: First date (datetime.date or ISO string), None for no lower bound
+            end: Last date (datetime.date or ISO string), None for no upper bound
+
+        Returns:
+            List of (year page, row) tuples in date order
+        """
+
+        low = bisect_left(self._dates, to_iso_date(start)) if start else 0
+        high = bisect_right(self._dates, to_iso_date(end)) if end else len(self._dates)
+        return [(year, row) for _, year, row in self._entries[low:high]]
+
+    def range_by_year(self, start=None, end=None):
+        """Same as range(), grouped into a dict of year page -> rows"""
+
+        rows_by_year = {}
+        for year, row in self.range(start, end):
+            rows_by_year.setdefault(year, []).append(row)
+        return rows_by_year
+
+
+def parse_row_date(value):
+    """datetime.date from an ISO date string, or None when it is not a valid date"""
+    try:
+        return date.fromisoformat(str(value).strip())
+    except (TypeError, ValueError):
+        return None
+
+
+def to_iso_date(value):
+    return value.isoformat() if isinstance(value, date) else str(value)
+
+
+def get_range_years(date_from, date_to):
+    """Years whose pages a date range touches, e.g. 2023-11-15..2024-02-10 -> [2023, 2024]"""
+    return list(range(date_from.year, date_to.year + 1))
+
@@ -1,5 +1,18 @@
-from pymongo import MongoClient
-from pymongo.errors import ConnectionFailure
+import hashlib
+import json
+from pymongo import MongoClient, UpdateOne, ASCENDING, DESCENDING, TEXT
+from pymongo.errors import ConnectionFailure, ConfigurationError, BulkWriteError, OperationFailure
+
+# Indexes every gazettes_{year} collection should carry
+GAZETTE_INDEXES = [
+    {"keys": [("document_id", ASCENDING)], "name": "document_id_unique", "unique": True},
+    {"keys": [("document_date", DESCENDING), ("document_type", ASCENDING)], "name": "document_date_type"},
+    {"keys": [("document_type", ASCENDING), ("document_date", DESCENDING)], "name": "document_type_date"},
+]
+GAZETTE_TEXT_INDEX = {"keys": [("description", TEXT)], "name": "description_text"}
+
+# Collections already bootstrapped in this process, so repeated calls cost nothing
+_indexed_collections = set()
 
 def connect_to_db(mongo_uri):
     try:
@@ -11,39 +24,205 @@ def connect_to_db(mongo_uri):
 
         return client
 
-    except ConnectionFailure as e:
+    except (ConnectionFailure, ConfigurationError) as e:
         print("❌ Failed to connect to MongoDB:", e)
         return None
 
-def insert_docs_by_year(db, prepared_metadata_to_store, year):
-    for doc in prepared_metadata_to_store:
+def ensure_indexes(db, year, text_index=False):
+    """
+    Create the gazettes_{year} indexes if they are missing (safe to call repeatedly)
+    
+    Args:
+        db: MongoDB database object
+        year: Year used to pick the gazettes_{year} collection
+        text_index: Also create a text index on description
+    
+    Returns:
+        List of index names present after the bootstrap
+    """
+    
+    collection_name = f"gazettes_{year}"
+    cache_key = (db.name, collection_name, text_index)
+    if cache_key in _indexed_collections:
+        return []
+    
+    collection = db[collection_name]
+    index_specs = GAZETTE_INDEXES + ([GAZETTE_TEXT_INDEX] if text_index else [])
+    
+    try:
+        existing_indexes = set(collection.index_information())
+    except OperationFailure:
+        existing_indexes = set()
+    
+    for spec in index_specs:
+        if spec["name"] in existing_indexes:
+            continue
         try:
-            # Extract year from the document_date
-            collection_name = f"gazettes_{year}"
-            collection = db[collection_name]
+            collection.create_index(spec["keys"], name=spec["name"], unique=spec.get("unique", False))
+            existing_indexes.add(spec["name"])
+            print(f"🗂️ Created index {spec['name']} on {collection_name}")
+        except OperationFailure as e:
+            # e.g. duplicate document_ids written before the unique index existed
+            print(f"⚠️ Could not create index {spec['name']} on {collection_name}: {e}")
+    
+    _indexed_collections.add(cache_key)
+    
+    return sorted(existing_indexes)
 
-            # Check if document already exists in the collection
-            existing_doc = collection.find_one({"document_id": doc['document_id']})
-            
-            if existing_doc:
-                # Update the existing document with new data
-                result = collection.update_one(
-                    {"document_id": doc['document_id']},
-                    {"$set": doc}
-                )
-                print(f"🔄 Updated {doc['document_id']} in {collection_name}, matched: {result.matched_count}")
-            else:
-                # Insert the document if it doesn't exist
-                result = collection.insert_one(doc)
-                print(f"📄 Inserted {doc['document_id']} into {collection_name}, ID: {result.inserted_id}")
+def bootstrap_indexes(db, years, text_index=False):
+    """
+    Ensure indexes for every gazettes_{year} collection that already exists or is about to be written
+    
+    Args:
+        db: MongoDB database object
+        years: Years that this run will write to
+        text_index: Also create a text index on description
+    """
+    
+    target_years = {str(year) for year in years}
+    try:
+        for name in db.list_collection_names():
+            if name.startswith("gazettes_"):
+                target_years.add(name[len("gazettes_"):])
+    except OperationFailure as e:
+        print(f"⚠️ Could not list collections for index bootstrap: {e}")
+    
+    for year in sorted(target_years):
+        ensure_indexes(db, year, text_index=text_index)
 
+def insert_docs_by_year(db, prepared_metadata_to_store, year, chunk_size=500):
+    """
+    Upsert prepared documents into gazettes_{year} with unordered bulk writes
+    
+    Args:
+        db: MongoDB database object
+        prepared_metadata_to_store: List of records from prepare_metadata_for_db()
+        year: Year used to pick the gazettes_{year} collection
+        chunk_size: Number of upserts sent per bulk_write call
+    
+    Returns:
+        Dict with aggregate matched/upserted/modified/unchanged counts and per-document errors
+    """
+    
+    collection_name = f"gazettes_{year}"
+    collection = db[collection_name]
+    
+    # The upsert filter relies on the document_id index
+    ensure_indexes(db, year)
+    
+    write_results = {
+        "collection": collection_name,
+        "total_documents": len(prepared_metadata_to_store),
+        "matched": 0,
+        "modified": 0,
+        "upserted": 0,
+        "skipped_unchanged": 0,
+        "errors": []
+    }
+    
+    for start in range(0, len(prepared_metadata_to_store), chunk_size):
+        chunk = prepared_metadata_to_store[start:start + chunk_size]
+        
+        # Only send records whose fingerprint differs from the stored one
+        fingerprints = {doc['document_id']: compute_record_fingerprint(doc) for doc in chunk}
+        try:
+            stored_fingerprints = get_stored_fingerprints(collection, list(fingerprints))
         except Exception as e:
-            print(f"❌ Failed to insert/update {doc['document_id']}: {e}")
+            print(f"⚠️ Could not read stored fingerprints from {collection_name}, writing all: {e}")
+            stored_fingerprints = {}
+        
+        changed_docs = [
+            doc for doc in chunk
+            if stored_fingerprints.get(doc['document_id']) != fingerprints[doc['document_id']]
+        ]
+        write_results["skipped_unchanged"] += len(chunk) - len(changed_docs)
+        
+        if not changed_docs:
+            continue
+        
+        chunk = changed_docs
+        operations = [
+            UpdateOne(
+                {"document_id": doc['document_id']},
+                {"$set": {**doc, "fingerprint": fingerprints[doc['document_id']]}},
+                upsert=True
+            )
+            for doc in chunk
+        ]
+        
+        try:
+            result = collection.bulk_write(operations, ordered=False)
+            details = result.bulk_api_result
+        except BulkWriteError as e:
+            # Unordered writes keep going past failures; collect what went wrong per document
+            details = e.details
+            for write_error in details.get("writeErrors", []):
+                write_results["errors"].append({
+                    "document_id": chunk[write_error["index"]]['document_id'],
+                    "error": write_error.get("errmsg", str(write_error))
+                })
+        except Exception as e:
+            for doc in chunk:
+                write_results["errors"].append({"document_id": doc['document_id'], "error": str(e)})
+            print(f"❌ Bulk write failed for {len(chunk)} documents in {collection_name}: {e}")
+            continue
+        
+        write_results["matched"] += details.get("nMatched", 0)
+        write_results["modified"] += details.get("nModified", 0)
+        write_results["upserted"] += details.get("nUpserted", 0)
+    
+    print_db_write_summary(write_results)
     
-    return
+    return write_results
 
-def prepare_metadata_for_db(all_download_metadata, classified_metadata_dic, config):
+def compute_record_fingerprint(record):
+    """
+    Hash a prepared record so unchanged documents can be detected without comparing fields
+    
+    Args:
+        record: Record from prepare_metadata_for_db()
+    
+    Returns:
+        Hex SHA-256 digest of the record (ignoring any stored fingerprint and _id)
+    """
+    
+    content = {key: value for key, value in record.items() if key not in ("fingerprint", "_id")}
+    encoded = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+def get_stored_fingerprints(collection, document_ids):
+    """
+    Fetch the fingerprints already stored for a batch of documents in one query
+    
+    Args:
+        collection: gazettes_{year} collection
+        document_ids: Document IDs to look up
+    
+    Returns:
+        Dict of document_id -> stored fingerprint
+    """
+    
+    cursor = collection.find(
+        {"document_id": {"$in": document_ids}},
+        {"_id": 0, "document_id": 1, "fingerprint": 1}
+    )
+    return {doc["document_id"]: doc.get("fingerprint") for doc in cursor}
+
+def print_db_write_summary(write_results):
+    print(f"📊 {write_results['collection']}: {write_results['total_documents']} documents | "
+          f"🔄 matched: {write_results['matched']}, modified: {write_results['modified']} | "
+          f"📄 upserted: {write_results['upserted']} | ⏭️ unchanged: {write_results['skipped_unchanged']} | "
+          f"❌ errors: {len(write_results['errors'])}")
+    
+    for error in write_results["errors"][:10]:  # Show first 10 errors
+        print(f"   • {error['document_id']}: {error['error']}")
+    
+    if len(write_results["errors"]) > 10:
+        print(f"   ... and {len(write_results['errors']) - 10} more errors")
+
+def prepare_metadata_for_db(all_download_metadata, classified_metadata_dic, config, extracted_texts=None, lang=None):
     merged_output = []
+    extracted_texts = extracted_texts or {}
     
     ARCHIVE_BASE_URL = config["archive"]["archive_base_url"]
     FORCE_DOWNLOAD_BASE_URL = config["archive"]["force_download_base_url"]
@@ -54,6 +233,9 @@ def prepare_metadata_for_db(all_download_metadata, classified_metadata_dic, conf
         # Get classification data if available (only for available documents)
         classification = classified_metadata_dic.get(doc_id, {})
         
+        # Extraction stats if the pdf was processed in this run
+        extraction = extracted_texts.get(doc_id, {})
+        
         download_url = (
             doc['download_url']
             if doc['download_url'] == 'N/A'
@@ -69,7 +251,10 @@ def prepare_metadata_for_db(all_download_metadata, classified_metadata_dic, conf
             "file_path": ARCHIVE_BASE_URL + str(doc['file_path']).lstrip("/"),
             "download_url": download_url,
             "source": doc['download_url'],
-            "availability": doc['availability']
+            "availability": doc['availability'],
+            "language": lang,
+            "total_page_count": extraction.get('total_page_count'),
+            "char_count": extraction.get('char_count')
         })
     
     return merged_output
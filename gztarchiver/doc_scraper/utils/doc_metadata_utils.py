@@ -1,17 +1,57 @@
 import json
-from typing import List, Dict
+from typing import Dict, Iterator, List
 import os
 
+from .date_index_utils import DateIndex
+
+def iter_doc_metadata(json_path: str) -> Iterator[Dict[str, str]]:
+    """
+    Iterate over the rows of a metadata file without loading the whole file
+    
+    Reads the JSON Lines written by DocMetadataSpider one row at a time. Files holding a
+    single JSON list (download metadata, files from older versions) are loaded in one go.
+    
+    Args:
+        json_path: Metadata file (.jsonl or .json)
+    
+    Yields:
+        One metadata dict per document
+    """
+    
+    with open(json_path, "r", encoding="utf-8") as f:
+        first_char = f.read(1)
+        while first_char.isspace():
+            first_char = f.read(1)
+        f.seek(0)
+        
+        if first_char == "[":
+            yield from json.load(f)
+            return
+        
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
 def load_doc_metadata_file(json_path: str) -> List[Dict[str, str]]:
     if not os.path.exists(json_path):
         return None
     
-    with open(json_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+    return list(iter_doc_metadata(json_path))
 
-def filter_doc_metadata(doc_metadata, user_input_kind, year=None, month=None, date=None):
+def filter_doc_metadata(doc_metadata, user_input_kind, year=None, month=None, date=None, date_from=None, date_to=None):
+    """
+    Keep the documents matching the requested year, month, day or date range
+    
+    doc_metadata can be any iterable (e.g. iter_doc_metadata()), so only the matching
+    rows are held in memory. Date ranges (date-range-lang, inclusive) are looked up in a
+    DateIndex; ranges spanning several year pages are handled by run_pipeline_once().
+    
+    Returns:
+        Tuple of (list of matching documents, status message)
+    """
     
     if user_input_kind == "year-lang":
+        doc_metadata = list(doc_metadata)
         status = f"{len(doc_metadata)} Documents found on {year}"
         return doc_metadata, status
     
@@ -58,6 +98,23 @@ def filter_doc_metadata(doc_metadata, user_input_kind, year=None, month=None, da
         
         return filtered_docs, status
     
+    elif user_input_kind == "date-range-lang":
+        if not date_from:
+            print("Error: a start date is required for date-range-lang filtering")
+            return doc_metadata
+        
+        target_range = f"{date_from} to {date_to or 'today'}"
+        print(f"Filtering by date range: {target_range}")
+        
+        filtered_docs = [row for _, row in DateIndex({year: doc_metadata}).range(date_from, date_to)]
+        
+        if filtered_docs:
+            status = f"{len(filtered_docs)} Documents found from {target_range}"
+        else:
+            status = f"No documents found from {target_range}"
+        
+        return filtered_docs, status
+    
     else:
         print(f"Unknown filter kind: {user_input_kind}")
         return doc_metadata
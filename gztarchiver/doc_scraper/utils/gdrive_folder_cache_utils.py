@@ -0,0 +1,82 @@
+import json
+import os
+from pathlib import Path
+
+
+def get_folder_cache_path(config):
+    """
+    Location of the persistent Drive folder cache
+
+    Uses archive.g_drive_folder_cache from the config, or .gdrive_folder_cache.json
+    inside the local archive location.
+    """
+
+    cache_path = config["archive"].get("g_drive_folder_cache")
+    if cache_path:
+        return Path(cache_path).expanduser()
+    return Path(config["archive"]["archive_location"]).expanduser() / ".gdrive_folder_cache.json"
+
+
+def load_folder_cache(cache_path):
+    """
+    Load the folder cache saved by a previous run
+
+    Args:
+        cache_path: JSON file mapping "root_id:YYYY/MM/DD/doc_id" keys to Drive folder IDs
+
+    Returns:
+        Dict usable as folder_cache (empty when there is no usable cache yet)
+    """
+
+    cache_path = Path(cache_path)
+    if not cache_path.exists():
+        return {}
+
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            folder_cache = json.load(f)
+        print(f"📂 Loaded {len(folder_cache)} cached Drive folders from {cache_path}")
+        return folder_cache
+    except (ValueError, OSError) as e:
+        print(f"⚠️ Ignoring unreadable Drive folder cache {cache_path}: {e}")
+        return {}
+
+
+def save_folder_cache(cache_path, folder_cache):
+    """Write the folder cache atomically so an interrupted run never leaves a broken file"""
+
+    cache_path = Path(cache_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(cache_path.suffix + ".tmp")
+
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(folder_cache, f, sort_keys=True)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"⚠️ Failed to save Drive folder cache {cache_path}: {e}")
+
+
+def invalidate_folder_id(folder_cache, folder_id):
+    """
+    Drop a folder that Drive reported as missing (404), together with everything cached below it
+
+    Args:
+        folder_cache: Dict used as folder_cache
+        folder_id: Drive folder ID that no longer exists
+
+    Returns:
+        Number of cache entries removed
+    """
+
+    stale_keys = [key for key, value in folder_cache.items() if value == folder_id]
+    removed = 0
+
+    for stale_key in stale_keys:
+        for key in [key for key in folder_cache if key == stale_key or key.startswith(stale_key + "/")]:
+            del folder_cache[key]
+            removed += 1
+
+    if removed:
+        print(f"🧹 Removed {removed} stale Drive folder cache entries below {folder_id}")
+    return removed
@@ -0,0 +1,137 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+MD5_CHUNK_SIZE = 1024 * 1024
+
+
+def get_sync_manifest_path(config):
+    """
+    Location of the local Drive sync manifest
+
+    Uses archive.g_drive_sync_manifest from the config, or .gdrive_sync_manifest.json
+    inside the local archive location.
+    """
+
+    manifest_path = config["archive"].get("g_drive_sync_manifest")
+    if manifest_path:
+        return Path(manifest_path).expanduser()
+    return Path(config["archive"]["archive_location"]).expanduser() / ".gdrive_sync_manifest.json"
+
+
+def load_sync_manifest(manifest_path):
+    """
+    Load the manifest written by previous syncs
+
+    Args:
+        manifest_path: JSON file mapping local file paths to their last synced state
+
+    Returns:
+        Dict of local path -> entry (size, mtime_ns, md5, gdrive_file_id, gdrive_folder_id, synced_at)
+    """
+
+    manifest_path = Path(manifest_path)
+    if not manifest_path.exists():
+        return {}
+
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        print(f"📒 Loaded sync manifest with {len(manifest)} files from {manifest_path}")
+        return manifest
+    except (ValueError, OSError) as e:
+        print(f"⚠️ Ignoring unreadable sync manifest {manifest_path}: {e}")
+        return {}
+
+
+def save_sync_manifest(manifest_path, manifest):
+    """Write the manifest atomically so an interrupted sync never leaves a broken file"""
+
+    manifest_path = Path(manifest_path)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = manifest_path.with_suffix(manifest_path.suffix + ".tmp")
+
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, manifest_path)
+    except OSError as e:
+        print(f"⚠️ Failed to save sync manifest {manifest_path}: {e}")
+
+
+def compute_file_md5(file_path):
+    """MD5 of a local file, the same checksum Drive reports as md5Checksum"""
+
+    digest = hashlib.md5()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(MD5_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def build_manifest_entry(file_stat, md5, gdrive_file_id, gdrive_folder_id):
+    return {
+        "size": file_stat.st_size,
+        "mtime_ns": file_stat.st_mtime_ns,
+        "md5": md5,
+        "gdrive_file_id": gdrive_file_id,
+        "gdrive_folder_id": gdrive_folder_id,
+        "synced_at": datetime.now().isoformat(timespec="seconds")
+    }
+
+
+def get_sync_status(manifest, local_file_path, gdrive_folder_id, file_name, remote_files=None):
+    """
+    Compare a local file with its last synced state (rsync-style quick check)
+
+    Size and mtime are compared first; the MD5 is only computed when they differ or when
+    Drive must be checked. When remote_files holds a listing of the target folder, it is
+    used to adopt files that were uploaded without a manifest entry and to catch files
+    that were changed or removed on Drive.
+
+    Args:
+        manifest: Dict from load_sync_manifest()
+        local_file_path: Local file to sync
+        gdrive_folder_id: Drive folder the file belongs in
+        file_name: Name of the file on Drive
+        remote_files: Optional dict folder ID -> {file name: {"id", "md5Checksum"}} from list_drive_files()
+
+    Returns:
+        Tuple of (status, md5 or None, Drive file ID or None, os.stat_result) where status is
+        "unchanged", "changed" (update the Drive file in place) or "new"
+    """
+
+    file_stat = os.stat(local_file_path)
+    entry = manifest.get(str(local_file_path))
+    if entry and entry.get("gdrive_folder_id") != gdrive_folder_id:
+        entry = None  # The Drive folder was recreated; the old file ID belongs elsewhere
+
+    remote_listing = remote_files.get(gdrive_folder_id) if remote_files is not None else None
+    remote_file = remote_listing.get(file_name) if remote_listing is not None else None
+
+    if entry and remote_listing is None:
+        if entry["size"] == file_stat.st_size and entry["mtime_ns"] == file_stat.st_mtime_ns:
+            return "unchanged", entry["md5"], entry["gdrive_file_id"], file_stat
+        md5 = compute_file_md5(local_file_path)
+        if md5 == entry["md5"]:
+            return "unchanged", md5, entry["gdrive_file_id"], file_stat  # Touched, not modified
+        return "changed", md5, entry["gdrive_file_id"], file_stat
+
+    if remote_listing is None:
+        return "new", compute_file_md5(local_file_path), None, file_stat
+
+    # Drive listing available: it is the source of truth for what exists remotely
+    if remote_file is None:
+        md5 = entry["md5"] if entry and entry["size"] == file_stat.st_size and entry["mtime_ns"] == file_stat.st_mtime_ns else None
+        return "new", md5 or compute_file_md5(local_file_path), None, file_stat
+
+    if entry and entry["size"] == file_stat.st_size and entry["mtime_ns"] == file_stat.st_mtime_ns:
+        md5 = entry["md5"]
+    else:
+        md5 = compute_file_md5(local_file_path)
+
+    if remote_file.get("md5Checksum") == md5:
+        return "unchanged", md5, remote_file["id"], file_stat
+    return "changed", md5, remote_file["id"], file_stat
@@ -2,7 +2,7 @@ import logging
 from scrapy.utils.log import configure_logging
 from scrapy.utils.project import get_project_settings
 
-def hide_logs():
+def hide_logs(metrics_location=None):
     # Suppress all Scrapy logs
     configure_logging(install_root_handler=False)
     logging.getLogger('scrapy').setLevel(logging.ERROR)
@@ -11,4 +11,14 @@ def hide_logs():
     settings = get_project_settings()
     settings.set('LOG_LEVEL', 'ERROR')
     
-    return settings
\ No newline at end of file
+    # Instrumented middlewares: request timing, sizes, statuses and retries (summary printed when a spider closes)
+    settings.set('DOWNLOADER_MIDDLEWARES', {
+        "gztarchiver.document_scraper.document_scraper.middlewares.DocumentScraperDownloaderMiddleware": 543
+    })
+    settings.set('SPIDER_MIDDLEWARES', {
+        "gztarchiver.document_scraper.document_scraper.middlewares.DocumentScraperSpiderMiddleware": 543
+    })
+    # Export them as a Prometheus textfile and a JSON run report (metrics.location in the config)
+    settings.set('GZTARCHIVER_METRICS_LOCATION', metrics_location)
+    
+    return settings
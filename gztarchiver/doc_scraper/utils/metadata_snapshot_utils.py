@@ -0,0 +1,147 @@
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+# Row fields that matter downstream; a change in any of them re-processes the document
+SNAPSHOT_FIELDS = ("date", "description", "download_url", "availability")
+
+
+def get_metadata_snapshot_path(config, year, lang):
+    """
+    Location of the snapshot of the (year, lang) table rows processed by earlier runs
+
+    Uses archive.metadata_snapshot_location from the config, or .metadata_snapshots inside
+    the local archive location.
+    """
+
+    snapshot_location = config["archive"].get("metadata_snapshot_location")
+    if snapshot_location:
+        snapshot_dir = Path(snapshot_location).expanduser()
+    else:
+        snapshot_dir = Path(config["archive"]["archive_location"]).expanduser() / ".metadata_snapshots"
+    return snapshot_dir / f"{year}_{str(lang).lower()}.json"
+
+
+def get_row_fingerprint(row):
+    """Stable hash of the fields of a table row that matter downstream"""
+    values = json.dumps([row.get(field) for field in SNAPSHOT_FIELDS], ensure_ascii=False)
+    return hashlib.sha1(values.encode("utf-8")).hexdigest()
+
+
+def load_metadata_snapshot(snapshot_path):
+    """
+    Load the rows processed by earlier runs
+
+    Returns:
+        Dict of doc_id -> {"fingerprint", "download_url", "availability"} (empty when missing)
+    """
+
+    snapshot_path = Path(snapshot_path)
+    if not snapshot_path.exists():
+        return {}
+
+    try:
+        with open(snapshot_path, "r", encoding="utf-8") as f:
+            snapshot = json.load(f)
+        return snapshot.get("rows", {})
+    except (ValueError, OSError, AttributeError) as e:
+        print(f"⚠️ Ignoring unreadable metadata snapshot {snapshot_path}: {e}")
+        return {}
+
+
+def save_metadata_snapshot(snapshot_path, snapshot_rows):
+    """Write the snapshot atomically so an interrupted run keeps the previous one"""
+
+    snapshot_path = Path(snapshot_path)
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = snapshot_path.with_suffix(snapshot_path.suffix + ".tmp")
+
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "updated_at": datetime.now().isoformat(timespec="seconds"),
+                "rows": snapshot_rows
+            }, f, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(tmp_path, snapshot_path)
+    except OSError as e:
+        print(f"⚠️ Failed to save metadata snapshot {snapshot_path}: {e}")
+
+
+def diff_doc_metadata(doc_metadata, snapshot_rows):
+    """
+    Split table rows into new, changed and unchanged against the snapshot
+
+    A row is changed when any of SNAPSHOT_FIELDS differs, e.g. a new download URL or the
+    availability flipping to Available.
+
+    Args:
+        doc_metadata: Table rows (any iterable) already filtered to the requested period
+        snapshot_rows: Dict from load_metadata_snapshot()
+
+    Returns:
+        Tuple of (list of new and changed rows, set of doc_ids whose download URL changed,
+        dict with the new/changed/unchanged counts)
+    """
+
+    delta_rows = []
+    moved_doc_ids = set()
+    summary = {"new": 0, "changed": 0, "unchanged": 0}
+
+    for row in doc_metadata:
+        previous = snapshot_rows.get(row.get("doc_id"))
+        if previous is None:
+            summary["new"] += 1
+            delta_rows.append(row)
+        elif previous.get("fingerprint") != get_row_fingerprint(row):
+            summary["changed"] += 1
+            delta_rows.append(row)
+            if previous.get("download_url") != row.get("download_url"):
+                moved_doc_ids.add(row.get("doc_id"))
+        else:
+            summary["unchanged"] += 1
+
+    return delta_rows, moved_doc_ids, summary
+
+
+def update_metadata_snapshot(snapshot_rows, processed_rows):
+    """
+    Record processed rows in the snapshot (in place)
+
+    Args:
+        snapshot_rows: Dict from load_metadata_snapshot()
+        processed_rows: Table rows that went through the pipeline successfully
+
+    Returns:
+        Number of rows recorded
+    """
+
+    count = 0
+    for row in processed_rows:
+        snapshot_rows[row.get("doc_id")] = {
+            "fingerprint": get_row_fingerprint(row),
+            "download_url": row.get("download_url"),
+            "availability": row.get("availability")
+        }
+        count += 1
+    return count
+
+
+def drop_from_metadata_snapshot(snapshot_rows, doc_ids):
+    """
+    Forget documents (in place) so the next delta run processes them again
+
+    Args:
+        snapshot_rows: Dict from load_metadata_snapshot()
+        doc_ids: Documents to forget
+
+    Returns:
+        Number of rows dropped
+    """
+
+    count = 0
+    for doc_id in doc_ids:
+        if snapshot_rows.pop(doc_id, None) is not None:
+            count += 1
+    return count
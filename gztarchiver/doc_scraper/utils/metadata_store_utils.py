@@ -0,0 +1,270 @@
+import json
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+
+from .db_utils import connect_to_db, insert_docs_by_year, bootstrap_indexes, compute_record_fingerprint, print_db_write_summary
+
+
+class MetadataStore(ABC):
+    """
+    Interface shared by the metadata backends used by post_crawl_processing
+
+    Records are the dicts produced by prepare_metadata_for_db(), grouped per year
+    the same way as the gazettes_{year} MongoDB collections.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    def bootstrap(self, years):
+        """Prepare storage (collections/tables and indexes) for the given years"""
+
+    @abstractmethod
+    def insert_docs_by_year(self, prepared_metadata_to_store, year):
+        """Upsert records by document_id and return the write summary dict"""
+
+    @abstractmethod
+    def iter_docs_by_year(self, year):
+        """Yield the stored records for a year"""
+
+    @abstractmethod
+    def list_years(self):
+        """Return the years that have stored records"""
+
+    def close(self):
+        pass
+
+
+class MongoMetadataStore(MetadataStore):
+    """MongoDB backend (one gazettes_{year} collection per year)"""
+
+    name = "mongodb"
+
+    def __init__(self, client, db_name="doc_db", chunk_size=500, text_index=False):
+        self.client = client
+        self.db = client[db_name]
+        self.chunk_size = chunk_size
+        self.text_index = text_index
+
+    def bootstrap(self, years):
+        bootstrap_indexes(self.db, years, text_index=self.text_index)
+
+    def insert_docs_by_year(self, prepared_metadata_to_store, year):
+        return insert_docs_by_year(self.db, prepared_metadata_to_store, year, chunk_size=self.chunk_size)
+
+    def iter_docs_by_year(self, year):
+        yield from self.db[f"gazettes_{year}"].find({}, {"_id": 0})
+
+    def list_years(self):
+        return sorted(
+            name[len("gazettes_"):]
+            for name in self.db.list_collection_names()
+            if name.startswith("gazettes_")
+        )
+
+    def close(self):
+        self.client.close()
+
+
+class SQLiteMetadataStore(MetadataStore):
+    """
+    Embedded SQLite backend (WAL mode) holding the same records as the MongoDB collections
+
+    Indexed fields get their own columns; the full record is kept as JSON so new
+    fields added to prepare_metadata_for_db() need no schema change. The connection may be
+    used from any thread (post-processing runs in the reactor's thread pool); a lock keeps
+    one statement or transaction on it at a time.
+    """
+
+    name = "sqlite"
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS gazettes (
+            year TEXT NOT NULL,
+            document_id TEXT NOT NULL,
+            document_date TEXT,
+            document_type TEXT,
+            availability TEXT,
+            fingerprint TEXT NOT NULL,
+            record TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (year, document_id)
+        );
+        CREATE INDEX IF NOT EXISTS gazettes_year_date_type ON gazettes (year, document_date, document_type);
+        CREATE INDEX IF NOT EXISTS gazettes_year_type_date ON gazettes (year, document_type, document_date);
+    """
+
+    UPSERT = """
+        INSERT INTO gazettes (year, document_id, document_date, document_type, availability, fingerprint, record, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT (year, document_id) DO UPDATE SET
+            document_date = excluded.document_date,
+            document_type = excluded.document_type,
+            availability = excluded.availability,
+            fingerprint = excluded.fingerprint,
+            record = excluded.record,
+            updated_at = excluded.updated_at
+    """
+
+    def __init__(self, path, chunk_size=500):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = chunk_size
+
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def bootstrap(self, years):
+        # One table serves every year; the schema and indexes are created on open
+        return
+
+    def insert_docs_by_year(self, prepared_metadata_to_store, year):
+        year = str(year)
+        write_results = {
+            "collection": f"{self.path.name}:gazettes[{year}]",
+            "total_documents": len(prepared_metadata_to_store),
+            "matched": 0,
+            "modified": 0,
+            "upserted": 0,
+            "skipped_unchanged": 0,
+            "errors": []
+        }
+        updated_at = datetime.now().isoformat(timespec="seconds")
+
+        for start in range(0, len(prepared_metadata_to_store), self.chunk_size):
+            chunk = prepared_metadata_to_store[start:start + self.chunk_size]
+            fingerprints = {doc['document_id']: compute_record_fingerprint(doc) for doc in chunk}
+
+            placeholders = ",".join("?" for _ in fingerprints)
+            with self._lock:
+                stored_fingerprints = dict(self.conn.execute(
+                    f"SELECT document_id, fingerprint FROM gazettes WHERE year = ? AND document_id IN ({placeholders})",
+                    [year, *fingerprints]
+                ))
+
+            rows = []
+            for doc in chunk:
+                doc_id = doc['document_id']
+                fingerprint = fingerprints[doc_id]
+
+                if doc_id not in stored_fingerprints:
+                    write_results["upserted"] += 1
+                elif stored_fingerprints[doc_id] == fingerprint:
+                    write_results["skipped_unchanged"] += 1
+                    continue
+                else:
+                    write_results["matched"] += 1
+                    write_results["modified"] += 1
+
+                record = {key: value for key, value in doc.items() if key != "_id"}
+                rows.append((
+                    year,
+                    doc_id,
+                    doc.get("document_date"),
+                    doc.get("document_type"),
+                    doc.get("availability"),
+                    fingerprint,
+                    json.dumps({**record, "fingerprint": fingerprint}, ensure_ascii=False, default=str),
+                    updated_at
+                ))
+
+            if not rows:
+                continue
+
+            # One transaction per chunk
+            try:
+                with self._lock, self.conn:
+                    self.conn.executemany(self.UPSERT, rows)
+            except sqlite3.Error as e:
+                for row in rows:
+                    write_results["errors"].append({"document_id": row[1], "error": str(e)})
+                print(f"❌ Batch write failed for {len(rows)} documents in {self.path}: {e}")
+
+        print_db_write_summary(write_results)
+
+        return write_results
+
+    def iter_docs_by_year(self, year):
+        with self._lock:
+            cursor = self.conn.execute(
+                "SELECT record FROM gazettes WHERE year = ? ORDER BY document_date, document_id",
+                (str(year),)
+            )
+        while True:
+            # The lock is held per chunk only, never while the caller handles the records
+            with self._lock:
+                rows = cursor.fetchmany(self.chunk_size)
+            if not rows:
+                return
+            for (record,) in rows:
+                yield json.loads(record)
+
+    def list_years(self):
+        with self._lock:
+            return [year for (year,) in self.conn.execute("SELECT DISTINCT year FROM gazettes ORDER BY year")]
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+def get_sqlite_store_path(config):
+    db_settings = config.get("db_settings", {})
+    sqlite_path = db_settings.get("sqlite_path")
+    if sqlite_path:
+        return Path(sqlite_path).expanduser()
+    return Path(config["archive"]["archive_location"]).expanduser() / "gazettes.sqlite3"
+
+
+def get_metadata_store(config, years=()):
+    """
+    Open the metadata backend selected in the config
+
+    db_settings.backend picks "mongodb" (default) or "sqlite". When MongoDB is
+    unreachable the run falls back to the embedded SQLite store unless
+    db_settings.sqlite_fallback is false, so results are never lost.
+
+    Args:
+        config: Loaded config.yaml
+        years: Years this run will write to (used for the index bootstrap)
+
+    Returns:
+        A MetadataStore, or None when no backend is available
+    """
+
+    db_settings = config.get("db_settings", {})
+    backend = db_settings.get("backend", "mongodb")
+    chunk_size = db_settings.get("bulk_chunk_size", 500)
+
+    store = None
+
+    if backend == "mongodb":
+        client = connect_to_db(config["db_credentials"]["mongo_db_uri"])
+        if client:
+            store = MongoMetadataStore(client, chunk_size=chunk_size, text_index=db_settings.get("description_text_index", False))
+        elif db_settings.get("sqlite_fallback", True):
+            print("⚠️ MongoDB unavailable, falling back to the embedded SQLite store")
+            backend = "sqlite"
+
+    if backend == "sqlite":
+        sqlite_path = get_sqlite_store_path(config)
+        try:
+            store = SQLiteMetadataStore(sqlite_path, chunk_size=chunk_size)
+            print(f"✅ Using embedded SQLite store at {sqlite_path}")
+        except sqlite3.Error as e:
+            print(f"❌ Failed to open SQLite store at {sqlite_path}: {e}")
+            return None
+
+    if store is None:
+        if backend not in ("mongodb", "sqlite"):
+            print(f"❌ Unknown db_settings.backend '{backend}'. Use 'mongodb' or 'sqlite'")
+        return None
+
+    store.bootstrap(years)
+    return store
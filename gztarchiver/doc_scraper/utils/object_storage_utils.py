@@ -0,0 +1,510 @@
+import os
+import random
+import shutil
+import threading
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from googleapiclient.errors import HttpError
+
+from .archive_to_cloud_utils import (
+    resolve_folder_paths,
+    create_nested_folders,
+    get_folder_cache_key,
+    list_drive_files,
+    upload_local_pdf_to_gdrive,
+    update_local_file_on_gdrive,
+    get_upload_mimetype,
+    get_gdrive_url_from_file_id,
+    make_drive_service_factory,
+    configure_drive_rate_limit,
+    print_upload_summary,
+    print_drive_throttle_metrics,
+    DRIVE_QUERIES_PER_MINUTE
+)
+from .gdrive_folder_cache_utils import get_folder_cache_path, load_folder_cache, save_folder_cache, invalidate_folder_id
+from .gdrive_sync_manifest_utils import (
+    get_sync_manifest_path,
+    load_sync_manifest,
+    save_sync_manifest,
+    build_manifest_entry,
+    get_sync_status,
+    compute_file_md5
+)
+from .rate_limit_utils import RateLimiter
+from .upload_session_utils import UploadSessionStore, get_upload_session_path, get_upload_chunk_size, DEFAULT_UPLOAD_CHUNK_SIZE
+
+MB = 1024 * 1024
+# Seconds between two saves of the Drive folder cache and sync manifest while uploading
+CACHE_SAVE_INTERVAL = 60.0
+
+
+def import_boto3():
+    try:
+        import boto3
+        from boto3.s3.transfer import TransferConfig
+        from botocore.exceptions import ClientError
+    except ImportError:
+        raise ImportError("S3 storage needs boto3. Install it with: pip install 'gztarchiver[s3]'")
+    return boto3, TransferConfig, ClientError
+
+
+def get_object_key(doc):
+    """
+    Storage key of a document file: YYYY/MM/DD/doc_id/file_name
+
+    Args:
+        doc: Download metadata item (date, doc_id, file_path or file_name)
+
+    Returns:
+        Key string, or None when the date is invalid
+    """
+
+    try:
+        year, month, day = doc.get("date").split("-")
+    except (ValueError, AttributeError):
+        return None
+    file_name = Path(doc["file_path"]).name if doc.get("file_path") else doc.get("file_name")
+    return f"{year}/{month}/{day}/{doc.get('doc_id')}/{file_name}"
+
+
+def build_storage_items(docs):
+    """
+    Turn download metadata into items for upload_to_storage()
+
+    Only available documents are kept; unavailable ones have no file to store.
+
+    Returns:
+        List of dicts with doc_id, doc_date, key, local_path and download_url
+    """
+
+    items = []
+    for doc in docs:
+        if doc.get("availability") != "Available" or not doc.get("file_path"):
+            continue
+        key = get_object_key(doc)
+        if key is None:
+            print(f"⚠️ Skipping invalid date: {doc.get('date')}")
+            continue
+        items.append({
+            "doc_id": doc.get("doc_id"),
+            "doc_date": doc.get("date"),
+            "key": key,
+            "local_path": str(doc["file_path"]),
+            "download_url": doc.get("download_url")
+        })
+    return items
+
+
+class StorageBackend(ABC):
+    """
+    Interface of the targets upload_to_storage() copies the archive to
+
+    upload_object() is called from several worker threads at once and must be thread-safe.
+    """
+
+    name = "base"
+
+    def prepare(self, items):
+        """Called once per batch before any upload (e.g. to create folders in bulk)"""
+        return
+
+    @abstractmethod
+    def upload_object(self, item):
+        """
+        Store one file unless an identical copy is already there
+
+        Returns:
+            Dict with status ("uploaded", "updated" or "unchanged"), remote_id and url
+        """
+
+    def finish(self):
+        """Called once per batch after the uploads (e.g. to persist caches now and then)"""
+        return
+
+    def close(self):
+        """Called once when no more batches follow (e.g. to persist caches for the next run)"""
+        return
+
+
+class LocalMirrorBackend(StorageBackend):
+    """Copy of the archive in another directory (e.g. a mounted network share or USB disk)"""
+
+    name = "local"
+
+    def __init__(self, mirror_location):
+        self.mirror_root = Path(mirror_location).expanduser()
+
+    def upload_object(self, item):
+        source = Path(item["local_path"])
+        target = self.mirror_root / item["key"]
+        source_stat = source.stat()
+
+        existed = target.exists()
+        if existed:
+            target_stat = target.stat()
+            # copy2 keeps the mtime, so size and mtime identify an unchanged copy
+            if target_stat.st_size == source_stat.st_size and target_stat.st_mtime_ns == source_stat.st_mtime_ns:
+                return {"status": "unchanged", "remote_id": str(target), "url": target.as_uri()}
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(target.name + ".tmp")
+        shutil.copy2(source, tmp_path)
+        os.replace(tmp_path, target)
+
+        return {"status": "updated" if existed else "uploaded", "remote_id": str(target), "url": target.as_uri()}
+
+
+class S3Backend(StorageBackend):
+    """
+    S3-compatible object storage (AWS S3, MinIO, ...)
+
+    Files are stored under flat keys (prefix + YYYY/MM/DD/doc_id/file) and large files are
+    sent as parallel multipart uploads. The MD5 is kept in the object metadata so unchanged
+    files are detected with one HEAD request, also for multipart objects whose ETag is not
+    an MD5.
+
+    Args:
+        bucket: Bucket name (must exist)
+        prefix: Key prefix inside the bucket
+        endpoint_url: Endpoint of an S3-compatible server (None for AWS)
+        region_name: Region of the bucket
+        access_key_id: Access key (None to use the default AWS credential chain)
+        secret_access_key: Secret key
+        multipart_threshold_mb: Files larger than this are uploaded in parts
+        multipart_chunk_mb: Size of each part
+        max_concurrency: Parts uploaded in parallel per file
+    """
+
+    name = "s3"
+
+    def __init__(self, bucket, prefix="", endpoint_url=None, region_name=None, access_key_id=None,
+                 secret_access_key=None, multipart_threshold_mb=8, multipart_chunk_mb=8, max_concurrency=4):
+        boto3, TransferConfig, ClientError = import_boto3()
+
+        self.bucket = bucket
+        self.prefix = prefix.strip("/") + "/" if prefix and prefix.strip("/") else ""
+        self.ClientError = ClientError
+        # boto3 clients are thread-safe, so one client serves every worker
+        self.client = boto3.session.Session().client(
+            "s3",
+            endpoint_url=endpoint_url or None,
+            region_name=region_name or None,
+            aws_access_key_id=access_key_id or None,
+            aws_secret_access_key=secret_access_key or None
+        )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=int(multipart_threshold_mb * MB),
+            multipart_chunksize=int(multipart_chunk_mb * MB),
+            max_concurrency=max_concurrency,
+            use_threads=True
+        )
+
+    def upload_object(self, item):
+        key = self.prefix + item["key"]
+        local_path = item["local_path"]
+        md5 = compute_file_md5(local_path)
+        url = f"s3://{self.bucket}/{key}"
+
+        existed = False
+        try:
+            head = self.client.head_object(Bucket=self.bucket, Key=key)
+            existed = True
+            if head.get("ContentLength") == os.path.getsize(local_path) and head.get("Metadata", {}).get("md5") == md5:
+                return {"status": "unchanged", "remote_id": key, "url": url}
+        except self.ClientError as e:
+            if e.response.get("Error", {}).get("Code") not in ("404", "NoSuchKey", "NotFound"):
+                raise
+
+        self.client.upload_file(
+            local_path,
+            self.bucket,
+            key,
+            ExtraArgs={"ContentType": get_upload_mimetype(local_path), "Metadata": {"md5": md5}},
+            Config=self.transfer_config
+        )
+
+        return {"status": "updated" if existed else "uploaded", "remote_id": key, "url": url}
+
+
+class GoogleDriveBackend(StorageBackend):
+    """
+    Google Drive, using the YYYY/MM/DD/doc_id folder layout of create_folder_structure_on_cloud()
+
+    Folders are resolved in bulk in prepare(); files are synced against the sync manifest
+    with chunked resumable uploads. Every worker thread gets its own Drive service.
+
+    Args:
+        service_factory: Callable returning a Drive service for the calling thread (make_drive_service_factory())
+        parent_folder_id: Root folder ID (None for root)
+        folder_cache_path: Persistent folder cache (None to keep it in memory only)
+        sync_manifest_path: Sync manifest (None to check Drive for every file)
+        upload_session_path: Persisted resumable upload sessions (None to always start over)
+        chunk_size: Bytes sent per resumable upload request
+        save_interval: Minimum seconds between two saves of the caches in finish(); close() always saves
+        verify_remote: List every target folder on Drive, not only folders holding files missing from the manifest
+        uploads_per_second: Upload starts allowed per second across all workers (None for no limit)
+    """
+
+    name = "gdrive"
+
+    def __init__(self, service_factory, parent_folder_id=None, folder_cache_path=None, sync_manifest_path=None,
+                 upload_session_path=None, chunk_size=DEFAULT_UPLOAD_CHUNK_SIZE, save_interval=CACHE_SAVE_INTERVAL,
+                 verify_remote=False, uploads_per_second=None):
+        self.service_factory = service_factory
+        self.parent_folder_id = parent_folder_id
+        self.folder_cache_path = folder_cache_path
+        self.sync_manifest_path = sync_manifest_path
+        self.chunk_size = chunk_size
+        self.save_interval = save_interval
+        self.verify_remote = verify_remote
+        self.rate_limiter = RateLimiter(uploads_per_second)
+        self._last_saved = time.monotonic()
+
+        self.folder_cache = load_folder_cache(folder_cache_path) if folder_cache_path else {}
+        self.sync_manifest = load_sync_manifest(sync_manifest_path) if sync_manifest_path else {}
+        self.session_store = UploadSessionStore(upload_session_path) if upload_session_path else None
+        self.remote_files = {}
+
+        self._local = threading.local()
+        # Guards the caches only; Drive is never called while holding it
+        self._lock = threading.Lock()
+        # Serializes folder creation outside prepare() so two workers never create the same folder twice
+        self._folder_lock = threading.Lock()
+
+    def get_service(self):
+        if not hasattr(self._local, "service"):
+            self._local.service = self.service_factory()
+        return self._local.service
+
+    def prepare(self, items):
+        # Folders whose full path is cached need no lookup of their parent levels either
+        folder_paths = [
+            item["key"].split("/")[:-1] for item in items
+            if get_folder_cache_key(self.parent_folder_id, item["key"].rsplit("/", 1)[0]) not in self.folder_cache
+        ]
+        resolve_folder_paths(self.get_service(), self.parent_folder_id, folder_paths, self.folder_cache)
+
+        # List Drive (batched) only for folders holding files the manifest does not know
+        unknown_folder_ids = {
+            self.folder_cache.get(get_folder_cache_key(self.parent_folder_id, item["key"].rsplit("/", 1)[0]))
+            for item in items
+            if self.verify_remote or item["local_path"] not in self.sync_manifest
+        }
+        unknown_folder_ids.discard(None)
+        self.remote_files = list_drive_files(self.get_service(), sorted(unknown_folder_ids)) if unknown_folder_ids else {}
+
+    def resolve_folder(self, service, folder_names):
+        """Drive folder ID of a YYYY/MM/DD/doc_id path, creating the missing levels"""
+
+        cache_key = get_folder_cache_key(self.parent_folder_id, "/".join(folder_names))
+        with self._lock:
+            folder_id = self.folder_cache.get(cache_key)
+        if folder_id is not None:
+            return folder_id
+
+        # Not resolved in prepare() (e.g. the batch lookup failed or the folder was deleted);
+        # resolve on a copy so other workers keep using the cache meanwhile
+        with self._folder_lock:
+            with self._lock:
+                known = dict(self.folder_cache)
+            resolved = dict(known)
+            folder_id = create_nested_folders(service, self.parent_folder_id, folder_names, resolved)
+            with self._lock:
+                self.folder_cache.update({key: value for key, value in resolved.items() if key not in known})
+        return folder_id
+
+    def upload_object(self, item):
+        service = self.get_service()
+        folder_names = item["key"].split("/")
+        file_name = folder_names.pop()
+
+        folder_id = self.resolve_folder(service, folder_names)
+        try:
+            return self.sync_file(service, item, folder_id, file_name)
+        except HttpError as e:
+            if e.resp.status != 404:
+                raise
+            # The cached folder (or the file) was deleted on Drive: forget both, resolve the path again and retry once
+            print(f"   🧹 Drive folder {folder_id} of {item['key']} is gone, resolving it again")
+            with self._lock:
+                invalidate_folder_id(self.folder_cache, folder_id)
+                self.sync_manifest.pop(item["local_path"], None)
+                self.remote_files.pop(folder_id, None)
+            folder_id = self.resolve_folder(service, folder_names)
+            return self.sync_file(service, item, folder_id, file_name)
+
+    def sync_file(self, service, item, folder_id, file_name):
+        sync_status, md5, file_id, file_stat = get_sync_status(
+            self.sync_manifest, item["local_path"], folder_id, file_name, self.remote_files
+        )
+
+        if sync_status == "unchanged":
+            status = "unchanged"
+        else:
+            self.rate_limiter.acquire()
+            if sync_status == "changed":
+                file_id = update_local_file_on_gdrive(service, item["local_path"], file_id, self.chunk_size, self.session_store)
+                status = "updated"
+            else:
+                file_id = upload_local_pdf_to_gdrive(service, item["local_path"], file_name, folder_id, self.chunk_size, self.session_store)
+                status = "uploaded"
+
+        with self._lock:
+            self.sync_manifest[item["local_path"]] = build_manifest_entry(file_stat, md5, file_id, folder_id)
+
+        return {"status": status, "remote_id": file_id, "url": get_gdrive_url_from_file_id(file_id)}
+
+    def finish(self):
+        # Rewriting both JSON files after every small batch is quadratic over a large year
+        if time.monotonic() - self._last_saved >= self.save_interval:
+            self.save_caches()
+        print_drive_throttle_metrics()
+
+    def close(self):
+        self.save_caches()
+
+    def save_caches(self):
+        with self._lock:
+            folder_cache = dict(self.folder_cache)
+            sync_manifest = dict(self.sync_manifest)
+        if self.folder_cache_path:
+            save_folder_cache(self.folder_cache_path, folder_cache)
+        if self.sync_manifest_path:
+            save_sync_manifest(self.sync_manifest_path, sync_manifest)
+        self._last_saved = time.monotonic()
+
+
+def upload_to_storage(backend, items, max_workers=4, max_retries=3, executor=None, print_summary=True):
+    """
+    Upload files to a storage backend with a pool of concurrent workers
+
+    Args:
+        backend: A StorageBackend
+        items: Items from build_storage_items()
+        max_workers: Number of concurrent upload workers
+        max_retries: Attempts per file before it is counted as failed
+        executor: ThreadPoolExecutor to run the uploads on (keeps worker threads, and their
+                  Drive services, alive across calls); a pool of max_workers is made when None
+        print_summary: Print the upload summary (callers merging more results print their own)
+
+    Returns:
+        Dict with upload statistics and results (same shape as upload_local_documents_to_gdrive())
+    """
+
+    upload_results = {
+        "total_documents": len(items),
+        "successful_uploads": 0,
+        "failed_uploads": 0,
+        "unavailable_documents": 0,
+        "skipped_documents": 0,
+        "file_not_found": 0,
+        "upload_details": [],
+        "errors": []
+    }
+
+    print(f"🚀 Uploading {len(items)} files to {backend.name} storage with {max_workers} worker(s)...")
+
+    backend.prepare(items)
+
+    def upload_item(item):
+        detail = {
+            "doc_id": item["doc_id"],
+            "doc_date": item["doc_date"],
+            "key": item["key"],
+            "local_file_path": item["local_path"],
+            "download_url": item["download_url"]
+        }
+
+        if not os.path.exists(item["local_path"]):
+            print(f"   ❌ Local file not found: {item['local_path']}")
+            error = f"Local file not found: {item['local_path']}"
+            return "file_not_found", {**detail, "status": "local_file_not_found", "error": error}, {"doc_id": item["doc_id"], "error": error}
+
+        for attempt in range(max_retries):
+            try:
+                outcome = backend.upload_object(item)
+                break
+            except Exception as e:
+                print(f"   ❌ Attempt {attempt + 1} failed for {item['doc_id']}: {e}")
+                if attempt == max_retries - 1:
+                    return "failed_uploads", {**detail, "status": "failed", "error": str(e)}, {"doc_id": item["doc_id"], "error": str(e)}
+                time.sleep(random.uniform(0, 2 ** attempt))  # Jittered exponential backoff
+
+        detail.update(remote_id=outcome["remote_id"], url=outcome["url"])
+        if outcome["status"] == "unchanged":
+            print(f"   ✅ Already stored, skipping: {item['key']}")
+            return "skipped_documents", {**detail, "status": "already_exists"}, None
+
+        print(f"   ✅ {outcome['status'].capitalize()}: {item['key']}")
+        return "successful_uploads", {**detail, "status": "success", "file_size_bytes": os.path.getsize(item["local_path"])}, None
+
+    if executor is not None:
+        outcomes = list(executor.map(upload_item, items))
+    elif max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{backend.name}-upload") as executor:
+            outcomes = list(executor.map(upload_item, items))
+    else:
+        outcomes = [upload_item(item) for item in items]
+
+    backend.finish()
+
+    for counter, detail, error in outcomes:
+        upload_results[counter] += 1
+        upload_results["upload_details"].append(detail)
+        if error:
+            upload_results["errors"].append(error)
+
+    if print_summary:
+        print_upload_summary(upload_results)
+
+    return upload_results
+
+
+def get_storage_backend(config, creds=None):
+    """
+    Build the storage backend selected by cloud.backend (gdrive, s3 or local)
+
+    Args:
+        config: Loaded config.yaml
+        creds: Google OAuth credentials (only used by the gdrive backend)
+
+    Returns:
+        A StorageBackend
+    """
+
+    cloud_config = config.get("cloud") or {}
+    backend = cloud_config.get("backend", "gdrive")
+
+    if backend == "local":
+        return LocalMirrorBackend(cloud_config["local_mirror_location"])
+
+    if backend == "s3":
+        s3_config = cloud_config.get("s3") or {}
+        return S3Backend(
+            s3_config["bucket"],
+            prefix=s3_config.get("prefix", ""),
+            endpoint_url=s3_config.get("endpoint_url"),
+            region_name=s3_config.get("region"),
+            access_key_id=s3_config.get("access_key_id"),
+            secret_access_key=s3_config.get("secret_access_key"),
+            multipart_threshold_mb=s3_config.get("multipart_threshold_mb", 8),
+            multipart_chunk_mb=s3_config.get("multipart_chunk_mb", 8),
+            max_concurrency=s3_config.get("multipart_concurrency", 4)
+        )
+
+    if backend == "gdrive":
+        archive_config = config["archive"]
+        configure_drive_rate_limit(archive_config.get("g_drive_queries_per_minute", DRIVE_QUERIES_PER_MINUTE))
+        return GoogleDriveBackend(
+            make_drive_service_factory(creds),
+            parent_folder_id=archive_config.get("g_drive_parent_folder_id"),
+            folder_cache_path=get_folder_cache_path(config),
+            sync_manifest_path=get_sync_manifest_path(config),
+            upload_session_path=get_upload_session_path(config),
+            chunk_size=get_upload_chunk_size(archive_config.get("g_drive_upload_chunk_mb"))
+        )
+
+    raise ValueError(f"Unknown cloud.backend '{backend}'. Use 'gdrive', 's3' or 'local'")
@@ -0,0 +1,144 @@
+import hashlib
+import json
+import os
+from datetime import date
+from pathlib import Path
+
+# Low-cardinality columns stored dictionary-encoded
+CATEGORICAL_COLUMNS = ["document_type", "availability"]
+STRING_COLUMNS = ["document_id", "description", "reasoning", "file_path", "download_url", "source", "fingerprint"]
+INT_COLUMNS = ["total_page_count", "char_count"]
+
+EXPORT_STATE_FILE = "_export_state.json"
+
+
+def import_pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export needs pyarrow. Install it with: pip install 'gztarchiver[export]'")
+    return pa, pq
+
+
+def parse_document_date(value):
+    try:
+        year, month, day = str(value).split("-")
+        return date(int(year), int(month), int(day))
+    except (ValueError, TypeError):
+        return None
+
+
+def build_partition_table(records):
+    """
+    Build a typed Arrow table for one year/language partition
+
+    Args:
+        records: Records from a MetadataStore (prepare_metadata_for_db() shape)
+
+    Returns:
+        pyarrow.Table with dictionary-encoded categorical columns
+    """
+
+    pa, _ = import_pyarrow()
+
+    columns = {
+        "document_date": pa.array([parse_document_date(r.get("document_date")) for r in records], type=pa.date32())
+    }
+    for name in STRING_COLUMNS:
+        columns[name] = pa.array([r.get(name) for r in records], type=pa.string())
+    for name in CATEGORICAL_COLUMNS:
+        columns[name] = pa.array([r.get(name) for r in records], type=pa.string()).dictionary_encode()
+    for name in INT_COLUMNS:
+        columns[name] = pa.array([r.get(name) for r in records], type=pa.int32())
+
+    return pa.table(columns)
+
+
+def get_partition_digest(records):
+    """Digest of the record fingerprints in a partition, used to skip unchanged partitions"""
+    digest = hashlib.sha256()
+    for fingerprint in sorted(str(r.get("fingerprint") or r.get("document_id")) for r in records):
+        digest.update(fingerprint.encode("utf-8"))
+    return digest.hexdigest()
+
+
+def load_export_state(export_location):
+    state_path = Path(export_location) / EXPORT_STATE_FILE
+    if not state_path.exists():
+        return {}
+    with open(state_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_export_state(export_location, state):
+    state_path = Path(export_location) / EXPORT_STATE_FILE
+    tmp_path = state_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, state_path)
+
+
+def export_metadata_to_parquet(store, export_location, years=None):
+    """
+    Export stored gazette metadata to Parquet partitioned as year=YYYY/language=xx/
+
+    Only partitions whose records changed since the last export are rewritten, so
+    repeated exports cost roughly as much as the new data.
+
+    Args:
+        store: An open MetadataStore
+        export_location: Root folder of the Parquet dataset
+        years: Years to export (all stored years when None)
+
+    Returns:
+        Dict with written/unchanged partition counts and rows written
+    """
+
+    _, pq = import_pyarrow()
+
+    export_root = Path(export_location).expanduser()
+    export_root.mkdir(parents=True, exist_ok=True)
+    state = load_export_state(export_root)
+
+    export_results = {
+        "partitions_written": 0,
+        "partitions_unchanged": 0,
+        "rows_written": 0
+    }
+
+    target_years = [str(year) for year in years] if years else store.list_years()
+
+    for year in target_years:
+        partitions = {}
+        for record in store.iter_docs_by_year(year):
+            partitions.setdefault(record.get("language") or "unknown", []).append(record)
+
+        for language, records in sorted(partitions.items()):
+            partition_key = f"year={year}/language={language}"
+            digest = get_partition_digest(records)
+
+            if state.get(partition_key) == digest:
+                export_results["partitions_unchanged"] += 1
+                continue
+
+            records.sort(key=lambda r: (str(r.get("document_date")), str(r.get("document_id"))))
+            table = build_partition_table(records)
+
+            partition_dir = export_root / f"year={year}" / f"language={language}"
+            partition_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = partition_dir / "part-0.parquet.tmp"
+            pq.write_table(table, tmp_path, compression="zstd", use_dictionary=True)
+            os.replace(tmp_path, partition_dir / "part-0.parquet")
+
+            state[partition_key] = digest
+            export_results["partitions_written"] += 1
+            export_results["rows_written"] += len(records)
+            print(f"📦 Exported {len(records)} rows to {partition_key}")
+
+    save_export_state(export_root, state)
+
+    print(f"✅ Parquet export completed: {export_results['partitions_written']} partitions written, "
+          f"{export_results['partitions_unchanged']} unchanged, {export_results['rows_written']} rows")
+
+    return export_results
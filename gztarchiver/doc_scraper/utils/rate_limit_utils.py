@@ -0,0 +1,151 @@
+import random
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket shared by concurrent workers
+
+    Args:
+        rate: Tokens added per second (None or <= 0 disables limiting)
+        burst: Maximum number of tokens that can accumulate
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens=1):
+        """
+        Block until the requested tokens are available
+
+        Returns:
+            Seconds spent waiting
+        """
+
+        if not self.rate or self.rate <= 0:
+            return 0.0
+
+        # A request larger than the bucket would never fit; let it through at a full bucket
+        tokens = min(tokens, self.burst)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+
+                wait = (tokens - self._tokens) / self.rate
+
+            time.sleep(wait)
+            waited += wait
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """
+    Token bucket that adapts its rate to throttling responses (AIMD)
+
+    The rate starts at the quota and is cut multiplicatively when the server reports a
+    rate limit, then grows back additively with every successful call. Cuts are spaced by
+    cooldown so a burst of in-flight requests failing together counts as one signal.
+    Keeps metrics on how much time was spent throttled.
+
+    Args:
+        rate: Maximum calls per second (the quota)
+        burst: Maximum number of calls that can be sent at once
+        min_rate: Lowest rate a cut can go to
+        decrease_factor: Multiplier applied to the rate on a rate-limit error
+        increase_step: Calls per second added back per successful call
+        cooldown: Minimum seconds between two rate cuts
+        backoff_base: Base delay in seconds for retry backoff
+        backoff_cap: Maximum retry backoff delay in seconds
+    """
+
+    def __init__(self, rate, burst=1, min_rate=0.5, decrease_factor=0.5, increase_step=0.05,
+                 cooldown=1.0, backoff_base=1.0, backoff_cap=32.0):
+        super().__init__(rate, burst)
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate) if rate else min_rate
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.cooldown = cooldown
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self._last_cut = 0.0
+        self.metrics = {
+            "calls": 0,
+            "throttled": 0,
+            "retries": 0,
+            "rate_cuts": 0,
+            "wait_seconds": 0.0,
+            "backoff_seconds": 0.0,
+            "lowest_rate": rate
+        }
+
+    def acquire(self, tokens=1):
+        waited = super().acquire(tokens)
+        with self._lock:
+            self.metrics["calls"] += tokens
+            self.metrics["wait_seconds"] += waited
+        return waited
+
+    def record_success(self, calls=1):
+        """Additive increase towards the quota"""
+
+        if not self.max_rate:
+            return
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step * calls)
+
+    def record_throttle(self):
+        """Multiplicative decrease after a rate-limit response"""
+
+        with self._lock:
+            self.metrics["throttled"] += 1
+            if not self.max_rate:
+                return
+            now = time.monotonic()
+            if now - self._last_cut < self.cooldown:
+                return
+            self._last_cut = now
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self._tokens = min(self._tokens, 1.0)
+            self.metrics["rate_cuts"] += 1
+            self.metrics["lowest_rate"] = min(self.metrics["lowest_rate"], self.rate)
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        Sleep before a retry: Retry-After when the server sent one, otherwise full-jitter
+        exponential backoff
+
+        Returns:
+            Seconds slept
+        """
+
+        if retry_after is not None:
+            delay = min(self.backoff_cap, retry_after)
+        else:
+            delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        time.sleep(delay)
+        with self._lock:
+            self.metrics["retries"] += 1
+            self.metrics["backoff_seconds"] += delay
+        return delay
+
+    def get_metrics(self):
+        with self._lock:
+            return {
+                **self.metrics,
+                "wait_seconds": round(self.metrics["wait_seconds"], 3),
+                "backoff_seconds": round(self.metrics["backoff_seconds"], 3),
+                "lowest_rate": round(self.metrics["lowest_rate"], 3) if self.metrics["lowest_rate"] else self.metrics["lowest_rate"],
+                "current_rate": round(self.rate, 3) if self.rate else self.rate
+            }
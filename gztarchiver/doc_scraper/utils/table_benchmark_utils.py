@@ -0,0 +1,249 @@
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from urllib.parse import urljoin
+
+from scrapy.http import HtmlResponse
+
+from gztarchiver.document_scraper.document_scraper.spiders.doc_metadata_spider import parse_doc_metadata_rows, LANG_MAP
+from gztarchiver.doc_inspector.utils.benchmark_utils import print_benchmark_report
+from .doc_metadata_utils import iter_doc_metadata, filter_doc_metadata
+
+BENCHMARK_PAGE_URL = "https://documents.gov.lk/view/gazettes/2024.html"
+
+
+def build_synthetic_table_page(row_count, year=2024, seed=0):
+    """
+    Build a year table page shaped like the gazette site, for benchmarking without a saved page
+
+    Args:
+        row_count: Number of document rows
+        year: Year used in the gazette numbers and dates
+        seed: Seed so the same page is produced on every run
+
+    Returns:
+        HTML string
+    """
+
+    rng = random.Random(seed)
+    rows = []
+
+    for i in range(row_count):
+        month = (i % 12) + 1
+        day = (i % 28) + 1
+        buttons = []
+        for lang, (lang_label, lang_class) in LANG_MAP.items():
+            # Roughly one document in ten misses a language
+            if rng.random() < 0.9:
+                buttons.append(
+                    f'<a href="/files/gazette/{year}/{month}/{i}-{lang}.pdf" target="_blank">'
+                    f'<button class="btn {lang_class} btn-sm">{lang_label}</button></a>'
+                )
+        rows.append(
+            f"<tr><td>{i + 1}/{rng.randint(1, 99):02d}</td><td>{year}-{month:02d}-{day:02d}</td>"
+            f"<td>Notice {i} under section {rng.randint(1, 300)} of the Act</td>"
+            f"<td>{' '.join(buttons)}</td></tr>"
+        )
+
+    return (
+        "<html><body><table class=\"table table-bordered\"><thead><tr><th>Gazette No</th><th>Date</th>"
+        "<th>Description</th><th>Download</th></tr></thead><tbody>"
+        + "".join(rows)
+        + "</tbody></table></body></html>"
+    )
+
+
+def parse_rows_with_css(response, lang):
+    """Previous DocMetadataSpider row parser (several CSS selectors per cell), kept as the baseline"""
+
+    lang_label, lang_class = LANG_MAP.get(lang, LANG_MAP["en"])
+    rows = []
+
+    for row in response.css("table.table-bordered tbody tr"):
+        gazette_number = row.css("td:nth-child(1)::text").get().strip()
+        gazette_date = row.css("td:nth-child(2)::text").get().strip()
+        description = row.css("td:nth-child(3)::text").get().strip()
+
+        availability = "Unavailable"
+        download_url = "N/A"
+        lang_button = row.css("td:nth-child(4)").css(f"a:has(button.{lang_class})")
+        if lang_button:
+            href = lang_button.css("::attr(href)").get()
+            if href:
+                download_url = urljoin(response.url, href)
+                availability = "Available"
+
+        rows.append({
+            "doc_id": gazette_number.replace('/', '-'),
+            "date": gazette_date,
+            "description": description,
+            "download_url": download_url,
+            "availability": availability
+        })
+
+    return rows
+
+
+def best_of(repeat, func):
+    """Run func repeat times and return (fastest seconds, last result)"""
+    best = None
+    result = None
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def measure_peak_memory(func):
+    """Peak Python memory in MB allocated while func runs"""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    finally:
+        tracemalloc.stop()
+
+
+def run_table_parse_benchmark(html, lang="en", repeat=3, work_dir=None):
+    """
+    Time table parsing and metadata loading on one year table page
+
+    Compares the precompiled XPath parser streaming JSONL with the previous CSS parser
+    writing one indented JSON list, then the lazy loader with loading the whole list.
+
+    Args:
+        html: Page HTML (str or bytes)
+        lang: Language whose download links are extracted
+        repeat: Runs per measurement (the fastest is reported)
+        work_dir: Folder for the temporary metadata files (default: system temp folder)
+
+    Returns:
+        Report dict
+    """
+
+    body = html.encode("utf-8") if isinstance(html, str) else html
+    response = HtmlResponse(url=BENCHMARK_PAGE_URL, body=body, encoding="utf-8")
+    root = response.selector.root
+
+    xpath_seconds, rows = best_of(repeat, lambda: list(parse_doc_metadata_rows(root, response.url, lang)))
+    css_seconds, css_rows = best_of(repeat, lambda: parse_rows_with_css(response, lang))
+    if rows != css_rows:
+        print("⚠️ XPath and CSS parsers returned different rows")
+
+    with tempfile.TemporaryDirectory(dir=work_dir) as tmp_dir:
+        jsonl_path = os.path.join(tmp_dir, "doc_metadata.jsonl")
+        json_path = os.path.join(tmp_dir, "doc_metadata.json")
+
+        def write_jsonl():
+            with open(jsonl_path, "w", encoding="utf-8") as f:
+                for row in rows:
+                    f.write(json.dumps(row, ensure_ascii=False))
+                    f.write("\n")
+
+        def write_json():
+            with open(json_path, "w") as f:
+                json.dump(rows, f, indent=2)
+
+        def load_json():
+            with open(json_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+
+        # Filter one month, like a --year --month run does
+        month = rows[0]["date"][5:7] if rows else "01"
+        year = rows[0]["date"][:4] if rows else "2024"
+
+        jsonl_write_seconds, _ = best_of(repeat, write_jsonl)
+        json_write_seconds, _ = best_of(repeat, write_json)
+        lazy_filter_seconds, (filtered, status) = best_of(
+            repeat, lambda: filter_doc_metadata(iter_doc_metadata(jsonl_path), "year-month-lang", year=year, month=month)
+        )
+        full_filter_seconds, _ = best_of(
+            repeat, lambda: filter_doc_metadata(load_json(), "year-month-lang", year=year, month=month)
+        )
+        lazy_filter_peak_mb = measure_peak_memory(
+            lambda: filter_doc_metadata(iter_doc_metadata(jsonl_path), "year-month-lang", year=year, month=month)
+        )
+        full_filter_peak_mb = measure_peak_memory(
+            lambda: filter_doc_metadata(load_json(), "year-month-lang", year=year, month=month)
+        )
+
+        file_sizes = {
+            "jsonl_kb": round(os.path.getsize(jsonl_path) / 1024, 1),
+            "json_indented_kb": round(os.path.getsize(json_path) / 1024, 1)
+        }
+
+    return {
+        "rows": len(rows),
+        "available_rows": sum(1 for row in rows if row["availability"] == "Available"),
+        "page_kb": round(len(body) / 1024, 1),
+        "repeat": repeat,
+        "parse_ms": {
+            "xpath": round(xpath_seconds * 1000, 2),
+            "css_baseline": round(css_seconds * 1000, 2),
+            "speedup": round(css_seconds / xpath_seconds, 2) if xpath_seconds else 0.0
+        },
+        "rows_per_second": round(len(rows) / xpath_seconds, 1) if xpath_seconds else 0.0,
+        "write_ms": {
+            "jsonl": round(jsonl_write_seconds * 1000, 2),
+            "json_indented_baseline": round(json_write_seconds * 1000, 2)
+        },
+        "filter_month_ms": {
+            "lazy_jsonl": round(lazy_filter_seconds * 1000, 2),
+            "full_json_baseline": round(full_filter_seconds * 1000, 2),
+            "matching_rows": len(filtered)
+        },
+        "filter_month_peak_mb": {
+            "lazy_jsonl": round(lazy_filter_peak_mb, 2),
+            "full_json_baseline": round(full_filter_peak_mb, 2)
+        },
+        "file_sizes": file_sizes
+    }
+
+
+def run_parse_table_benchmark_command(args):
+    """
+    Entry point for `gztarchiver benchmark parse-table`
+
+    Args:
+        args: Parsed arguments from parse_benchmark_args()
+
+    Returns:
+        Process exit code (1 when a regression threshold is breached or the page is missing)
+    """
+
+    if args.html:
+        html_path = Path(args.html).expanduser()
+        if not html_path.exists():
+            print(f"❌ Table page not found: {html_path}")
+            return 1
+        html = html_path.read_bytes()
+        print(f"📄 Parsing saved table page {html_path}")
+    else:
+        html = build_synthetic_table_page(args.rows, seed=args.seed)
+        print(f"🧪 Parsing a synthetic table page with {args.rows} rows")
+        if args.save_html:
+            save_path = Path(args.save_html).expanduser()
+            save_path.parent.mkdir(parents=True, exist_ok=True)
+            save_path.write_text(html, encoding="utf-8")
+            print(f"📝 Synthetic table page saved to: {save_path}")
+
+    report = run_table_parse_benchmark(html, lang=args.lang, repeat=args.repeat)
+    print_benchmark_report(report)
+
+    if args.report:
+        report_path = Path(args.report)
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Benchmark report saved to: {report_path}")
+
+    if args.min_rows_per_sec is not None and report["rows_per_second"] < args.min_rows_per_sec:
+        print(f"❌ Parsing {report['rows_per_second']} rows/sec is below the {args.min_rows_per_sec} rows/sec threshold")
+        return 1
+    return 0
@@ -0,0 +1,125 @@
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Drive requires resumable chunks to be multiples of 256 KB
+UPLOAD_CHUNK_ALIGNMENT = 256 * 1024
+DEFAULT_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Drive keeps resumable sessions for about a week; do not try to reuse older ones
+UPLOAD_SESSION_MAX_AGE = timedelta(days=6)
+
+
+def get_upload_session_path(config):
+    """
+    Location of the persisted resumable upload sessions
+
+    Uses archive.g_drive_upload_sessions from the config, or .gdrive_upload_sessions.json
+    inside the local archive location.
+    """
+
+    session_path = config["archive"].get("g_drive_upload_sessions")
+    if session_path:
+        return Path(session_path).expanduser()
+    return Path(config["archive"]["archive_location"]).expanduser() / ".gdrive_upload_sessions.json"
+
+
+def get_upload_chunk_size(chunk_size_mb=None):
+    """Chunk size in bytes, rounded up to the 256 KB multiple Drive requires"""
+
+    if not chunk_size_mb:
+        return DEFAULT_UPLOAD_CHUNK_SIZE
+    chunk_size = int(float(chunk_size_mb) * 1024 * 1024)
+    return max(1, -(-chunk_size // UPLOAD_CHUNK_ALIGNMENT)) * UPLOAD_CHUNK_ALIGNMENT
+
+
+class UploadSessionStore:
+    """
+    Resumable upload sessions persisted after every confirmed chunk
+
+    Sessions are keyed by local file path and only reused for the same file content
+    (size and mtime) and the same Drive target, so a restarted run continues from the
+    last confirmed offset instead of sending the whole file again. Safe to share between
+    upload worker threads.
+
+    Args:
+        session_path: JSON file holding the open sessions
+    """
+
+    def __init__(self, session_path):
+        self.session_path = Path(session_path)
+        self._lock = threading.Lock()
+        self._sessions = {}
+
+        if self.session_path.exists():
+            try:
+                with open(self.session_path, "r", encoding="utf-8") as f:
+                    self._sessions = json.load(f)
+            except (ValueError, OSError) as e:
+                print(f"⚠️ Ignoring unreadable upload sessions {self.session_path}: {e}")
+
+        if self._sessions:
+            print(f"⏯️ Found {len(self._sessions)} interrupted uploads that can be resumed")
+
+    def get(self, key, file_stat, target):
+        """
+        Return the saved session for a file, or None when it cannot be reused
+
+        Args:
+            key: Local file path
+            file_stat: os.stat_result of the file now
+            target: Drive folder ID (new file) or file ID (update) the session uploads to
+        """
+
+        with self._lock:
+            session = self._sessions.get(key)
+            if not session:
+                return None
+
+            created_at = datetime.fromisoformat(session["created_at"])
+            if (
+                session["size"] != file_stat.st_size
+                or session["mtime_ns"] != file_stat.st_mtime_ns
+                or session["target"] != target
+                or datetime.now() - created_at > UPLOAD_SESSION_MAX_AGE
+            ):
+                del self._sessions[key]
+                self._write()
+                return None
+
+            return dict(session)
+
+    def save(self, key, resumable_uri, offset, file_stat, target):
+        """Record the session URI and the last byte offset Drive confirmed"""
+
+        with self._lock:
+            session = self._sessions.get(key)
+            if not session or session["uri"] != resumable_uri:
+                session = {
+                    "uri": resumable_uri,
+                    "size": file_stat.st_size,
+                    "mtime_ns": file_stat.st_mtime_ns,
+                    "target": target,
+                    "created_at": datetime.now().isoformat(timespec="seconds")
+                }
+                self._sessions[key] = session
+            session["offset"] = offset
+            self._write()
+
+    def discard(self, key):
+        with self._lock:
+            if self._sessions.pop(key, None) is not None:
+                self._write()
+
+    def _write(self):
+        # Called with the lock held; atomic so a crash mid-write keeps the previous state
+        self.session_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.session_path.with_suffix(self.session_path.suffix + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._sessions, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.session_path)
+        except OSError as e:
+            print(f"⚠️ Failed to save upload sessions {self.session_path}: {e}")
@@ -3,21 +3,23 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
-from scrapy import signals
+import time
 
-# useful for handling different item types with a single interface
-from itemadapter import ItemAdapter
+from scrapy import Request, signals
+
+from gztarchiver.doc_scraper.utils.crawl_metrics_utils import get_crawl_metrics, write_crawl_metrics, print_crawl_metrics_summary
 
 
 class DocumentScraperSpiderMiddleware:
-    # Not all methods need to be defined. If a method is not defined,
-    # scrapy acts as if the spider middleware does not modify the
-    # passed objects.
+    # Records callback time, scraped items and callback errors in the spider's CrawlMetrics
+
+    def __init__(self, crawler):
+        self.metrics = get_crawl_metrics(crawler.spidercls.name)
 
     @classmethod
     def from_crawler(cls, crawler):
         # This method is used by Scrapy to create your spiders.
-        s = cls()
+        s = cls(crawler)
         crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
         return s
 
@@ -29,19 +31,47 @@ class DocumentScraperSpiderMiddleware:
         return None
 
     def process_spider_output(self, response, result, spider):
-        # Called with the results returned from the Spider, after
-        # it has processed the response.
-
-        # Must return an iterable of Request, or item objects.
-        for i in result:
+        # Only the time spent producing each result counts, not the time the engine
+        # spends on it between two results
+        elapsed = 0.0
+        results = iter(result)
+        while True:
+            started = time.perf_counter()
+            try:
+                i = next(results)
+            except StopIteration:
+                elapsed += time.perf_counter() - started
+                break
+            elapsed += time.perf_counter() - started
+            if not isinstance(i, Request):
+                self.metrics.items += 1
             yield i
+        self.metrics.callback_seconds.observe(elapsed)
+
+    async def process_spider_output_async(self, response, result, spider):
+        # Same as process_spider_output() for async callbacks
+        elapsed = 0.0
+        results = result.__aiter__()
+        while True:
+            started = time.perf_counter()
+            try:
+                i = await results.__anext__()
+            except StopAsyncIteration:
+                elapsed += time.perf_counter() - started
+                break
+            elapsed += time.perf_counter() - started
+            if not isinstance(i, Request):
+                self.metrics.items += 1
+            yield i
+        self.metrics.callback_seconds.observe(elapsed)
 
     def process_spider_exception(self, response, exception, spider):
         # Called when a spider or process_spider_input() method
         # (from other spider middleware) raises an exception.
+        self.metrics.record_spider_exception(exception)
 
         # Should return either None or an iterable of Request or item objects.
-        pass
+        return None
 
     async def process_start(self, start):
         # Called with an async iterator over the spider start() method or the
@@ -54,47 +84,61 @@ class DocumentScraperSpiderMiddleware:
 
 
 class DocumentScraperDownloaderMiddleware:
-    # Not all methods need to be defined. If a method is not defined,
-    # scrapy acts as if the downloader middleware does not modify the
-    # passed objects.
+    # Records per-request timing, response size, status and retry count in the spider's
+    # CrawlMetrics, and exports them with Scrapy's stats when the spider closes
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+        self.metrics = get_crawl_metrics(crawler.spidercls.name)
+        # Folder of the Prometheus textfile and JSON run report (set by hide_logs(); None disables the export)
+        self.metrics_location = crawler.settings.get("GZTARCHIVER_METRICS_LOCATION")
 
     @classmethod
     def from_crawler(cls, crawler):
         # This method is used by Scrapy to create your spiders.
-        s = cls()
+        s = cls(crawler)
         crawler.signals.connect(s.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(s.spider_closed, signal=signals.spider_closed)
         return s
 
     def process_request(self, request, spider):
-        # Called for each request that goes through the downloader
-        # middleware.
-
-        # Must either:
-        # - return None: continue processing this request
-        # - or return a Response object
-        # - or return a Request object
-        # - or raise IgnoreRequest: process_exception() methods of
-        #   installed downloader middleware will be called
+        # Every attempt passes here, retries included
+        request.meta["gztarchiver_request_started"] = time.perf_counter()
+        self.metrics.requests += 1
         return None
 
     def process_response(self, request, response, spider):
-        # Called with the response returned from the downloader.
-
-        # Must either;
-        # - return a Response object
-        # - return a Request object
-        # - or raise IgnoreRequest
+        # Responses the retry middleware turns into a retry never reach this point, so
+        # retry_times is the number of retries before this final response
+        self.metrics.record_response(
+            response.status,
+            self.get_request_seconds(request),
+            len(response.body),
+            request.meta.get("retry_times", 0)
+        )
         return response
 
     def process_exception(self, request, exception, spider):
-        # Called when a download handler or a process_request()
-        # (from other downloader middleware) raises an exception.
+        self.metrics.record_download_exception(exception, self.get_request_seconds(request))
 
-        # Must either:
-        # - return None: continue processing this exception
-        # - return a Response object: stops process_exception() chain
-        # - return a Request object: stops process_exception() chain
-        pass
+        # None lets the retry middleware and the errback handle the exception
+        return None
+
+    def get_request_seconds(self, request):
+        # Scrapy's download_latency covers the download itself; fall back to the time since process_request()
+        latency = request.meta.get("download_latency")
+        if latency is not None:
+            return latency
+        started = request.meta.get("gztarchiver_request_started")
+        return time.perf_counter() - started if started is not None else 0.0
 
     def spider_opened(self, spider):
+        self.metrics.runs += 1
+        self.metrics.started_at = time.strftime("%Y-%m-%dT%H:%M:%S")
         spider.logger.info("Spider opened: %s" % spider.name)
+
+    def spider_closed(self, spider, reason):
+        self.metrics.record_stats(self.crawler.stats.get_stats(), reason)
+        print_crawl_metrics_summary(self.metrics)
+        if self.metrics_location:
+            write_crawl_metrics(self.metrics_location)
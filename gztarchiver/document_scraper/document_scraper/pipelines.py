@@ -6,8 +6,48 @@
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
+import json
+import os
 
 
 class DocumentScraperPipeline:
     def process_item(self, item, spider):
         return item
+
+
+class DocMetadataJsonlPipeline:
+    """
+    Stream the rows of DocMetadataSpider to spider.output_path as JSON Lines
+
+    Rows are written one per line as they are scraped, into a temporary file that replaces
+    the output when the crawl finishes, so readers never see a half-written file. Nothing is
+    written when the spider has no output_path (the rows are then only handed over in memory).
+    """
+
+    def open_spider(self, spider):
+        self.output_path = spider.output_path
+        self.file = None
+        if not self.output_path:
+            return
+        self.tmp_path = f"{self.output_path}.tmp"
+        self.row_count = 0
+
+        output_dir = os.path.dirname(self.output_path)
+        if output_dir:
+            os.makedirs(output_dir, exist_ok=True)
+        self.file = open(self.tmp_path, "w", encoding="utf-8")
+
+    def process_item(self, item, spider):
+        if self.file is None:
+            return item
+        self.file.write(json.dumps(ItemAdapter(item).asdict(), ensure_ascii=False))
+        self.file.write("\n")
+        self.row_count += 1
+        return item
+
+    def close_spider(self, spider):
+        if self.file is None:
+            return
+        self.file.close()
+        os.replace(self.tmp_path, self.output_path)
+        print(f"Data saved to {self.output_path} ({self.row_count} rows)")
@@ -2,6 +2,11 @@ import scrapy
 from pathlib import Path
 import csv
 import json
+from twisted.internet import task
+from gztarchiver.doc_scraper.utils.archive_manifest_utils import compute_content_sha256
+
+# Seconds between checks of a full upload backlog while downloads are paused
+BACKPRESSURE_POLL_SECONDS = 1.0
 
 class PDFDownloaderSpider(scrapy.Spider):
     name = "pdf_downloader"
@@ -13,10 +18,26 @@ class PDFDownloaderSpider(scrapy.Spider):
         "LOG_LEVEL": "ERROR"
     }
     
-    def __init__(self, download_metadata=None, output_path=None, *args, **kwargs):
+    def __init__(self, download_metadata=None, output_path=None, on_document_saved=None, upload_backlog_full=None, refresh_doc_ids=None, reprocess_doc_ids=None, manifest=None, lang=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.download_metadata = download_metadata or []
         self.output_path = output_path
+        # Optional callable receiving each item once its file is saved (e.g. CloudUploadStage.submit)
+        self.on_document_saved = on_document_saved
+        # Optional callable telling whether the receiver of saved documents is full (e.g.
+        # CloudUploadStage.is_full); downloads pause until it has room again
+        self.upload_backlog_full = upload_backlog_full
+        self._backpressure_check = None
+        # Archived documents to download again (e.g. their download URL changed on the site)
+        self.refresh_doc_ids = set(refresh_doc_ids or ())
+        # Archived documents kept in download_metadata without downloading them, so post-processing
+        # sees their new table data (e.g. an edited description)
+        self.reprocess_doc_ids = set(reprocess_doc_ids or ())
+        # Documents whose download failed in this run (a failed refresh leaves the old PDF on disk)
+        self.failed_downloads = set()
+        # Optional ArchiveManifest replacing the CSV log scans; entries are keyed by language
+        self.manifest = manifest
+        self.lang = lang
         self.archived_docs = set()
         self.failed_docs = set()
     
@@ -47,6 +68,13 @@ class PDFDownloaderSpider(scrapy.Spider):
                 continue
             # Get base log directory for this year
             base_log_dir = Path(items[0]["file_path"]).parents[4] / year
+            if self.manifest:
+                # Archives made before the manifest existed are imported from the logs once
+                self.manifest.ensure_year_imported(base_log_dir, year)
+                self.archived_docs.update(self.manifest.get_doc_ids(self.lang, "archived", year))
+                self.failed_docs.update(self.manifest.get_doc_ids(self.lang, "failed", year))
+                print(f"📋 Archive manifest: {len(self.archived_docs)} archived, {len(self.failed_docs)} failed documents for {year}")
+                continue
             # Check archived logs
             archived_log_file = base_log_dir / "archived_logs.csv"
             if archived_log_file.exists():
@@ -72,7 +100,7 @@ class PDFDownloaderSpider(scrapy.Spider):
         for item in self.download_metadata:
             doc_id = item.get("doc_id")
             url = item.get("download_url")
-            if doc_id in self.archived_docs:
+            if doc_id in self.archived_docs and doc_id not in self.refresh_doc_ids:
                 # Skip already archived documents
                 skipped_count += 1
                 self.logger.debug(f"⏭️ Skipping archived document: {doc_id}")
@@ -82,6 +110,11 @@ class PDFDownloaderSpider(scrapy.Spider):
                 # Separate unavailable items (no valid URL)
                 unavailable_items.append(item)
                 continue
+            elif doc_id in self.refresh_doc_ids:
+                # Download documents whose link changed on the site again
+                self.logger.info(f"🔁 Downloading updated document: {doc_id}")
+                print(f"🔁 Downloading updated document: {doc_id}")
+                filtered_metadata.append(item)
             elif doc_id in self.failed_docs:
                 # Retry failed documents
                 retry_count += 1
@@ -92,8 +125,13 @@ class PDFDownloaderSpider(scrapy.Spider):
                 # New document to download
                 filtered_metadata.append(item)
         
-        # Remove archived documents from download_metadata to avoid rerunning
-        self.download_metadata = [item for item in self.download_metadata if item.get("doc_id") not in self.archived_docs]
+        # Remove archived documents from download_metadata to avoid rerunning, unless they are refreshed or reprocessed
+        self.download_metadata = [
+            item for item in self.download_metadata
+            if item.get("doc_id") not in self.archived_docs
+            or item.get("doc_id") in self.refresh_doc_ids
+            or item.get("doc_id") in self.reprocess_doc_ids
+        ]
         
         # Save updated metadata only if documents were removed
         if len(self.download_metadata) < original_count:
@@ -104,10 +142,7 @@ class PDFDownloaderSpider(scrapy.Spider):
             self.logger.info(f"⚠️ Processing {len(unavailable_items)} unavailable documents:")
             print(f"⚠️ Processing {len(unavailable_items)} unavailable documents:")
             for item in unavailable_items:
-                # Create folder structure
-                folder_path = item["file_path"].parent
-                folder_path.mkdir(parents=True, exist_ok=True)
-                # Log to unavailable.csv
+                # Log to unavailable.csv (create_folder_structure already wrote unavailable.txt)
                 self.log_status(item, "unavailable_logs")
                 self.logger.info(f"⚠️ Unavailable: {item['doc_id']}")
                 print(f"⚠️ Unavailable: {item['doc_id']}")
@@ -144,6 +179,11 @@ class PDFDownloaderSpider(scrapy.Spider):
             print(f"❌ Error reading log file {log_file_path}: {e}")
         return doc_ids
     
+    async def start(self):
+        # Scrapy >= 2.13 calls start(); newer releases no longer fall back to start_requests()
+        for request in self.start_requests():
+            yield request
+    
     def start_requests(self):
         # Check available data before starting downloads
         self.logger.info("🔍 Checking available data...")
@@ -162,21 +202,59 @@ class PDFDownloaderSpider(scrapy.Spider):
     def save_pdf(self, response):
         item = response.meta["item"]
         file_path = item["file_path"]
-        file_path.parent.mkdir(parents=True, exist_ok=True)
         try:
+            # The document folder is only created now that there is a file to put in it
+            file_path.parent.mkdir(parents=True, exist_ok=True)
             with open(file_path, "wb") as f:
                 f.write(response.body)
             self.log_status(item, "archived_logs")
+            self.record_in_manifest(item, "archived", response.body)
             self.logger.info(f"✅ Downloaded: {file_path}")
             print(f"✅ Downloaded: {file_path}")
         except Exception as e:
             self.log_status(item, "failed_logs")
+            self.record_in_manifest(item, "failed")
+            self.failed_downloads.add(item["doc_id"])
             self.logger.error(f"❌ Failed to save {file_path}: {e}")
             print(f"❌ Failed to save {file_path}: {e}")
+            return
+        
+        if self.on_document_saved:
+            try:
+                self.on_document_saved(item)
+            except Exception as e:
+                self.logger.error(f"❌ on_document_saved failed for {item['doc_id']}: {e}")
+                print(f"❌ on_document_saved failed for {item['doc_id']}: {e}")
+        
+        if self.upload_backlog_full and self._backpressure_check is None and self.upload_backlog_full():
+            self.pause_downloads()
+    
+    def pause_downloads(self):
+        """Stop starting new downloads until the upload backlog drains, polled on a reactor timer"""
+        self.crawler.engine.pause()
+        self.logger.info("⏸️ Upload backlog full, pausing downloads")
+        print("⏸️ Upload backlog full, pausing downloads...")
+        self._backpressure_check = task.LoopingCall(self.resume_downloads_if_drained)
+        self._backpressure_check.start(BACKPRESSURE_POLL_SECONDS, now=False)
+    
+    def resume_downloads_if_drained(self):
+        if self.upload_backlog_full():
+            return
+        self._backpressure_check.stop()
+        self._backpressure_check = None
+        self.crawler.engine.unpause()
+        self.logger.info("▶️ Upload backlog drained, resuming downloads")
+        print("▶️ Upload backlog drained, resuming downloads")
+    
+    def closed(self, reason):
+        if self._backpressure_check is not None and self._backpressure_check.running:
+            self._backpressure_check.stop()
     
     def handle_failure(self, failure):
         item = failure.request.meta["item"]
         self.log_status(item, "failed_logs")
+        self.record_in_manifest(item, "failed")
+        self.failed_downloads.add(item["doc_id"])
         self.logger.error(f"❌ Request failed: {item['download_url']}")
         print(f"❌ Request failed: {item['download_url']}")
         
@@ -211,6 +289,24 @@ class PDFDownloaderSpider(scrapy.Spider):
             self.logger.error(f"❌ Failed to save updated metadata: {e}")
             print(f"❌ Failed to save updated metadata: {e}")
     
+    def record_in_manifest(self, item, status, content=None):
+        if not self.manifest:
+            return
+        try:
+            self.manifest.record(
+                item["doc_id"],
+                self.lang,
+                status,
+                path=item["file_path"],
+                size=len(content) if content is not None else None,
+                sha256=compute_content_sha256(content) if content is not None else None,
+                date=item.get("date"),
+                download_url=item.get("download_url")
+            )
+        except Exception as e:
+            self.logger.error(f"❌ Failed to update the archive manifest for {item.get('doc_id', 'unknown')}: {e}")
+            print(f"❌ Failed to update the archive manifest for {item.get('doc_id', 'unknown')}: {e}")
+    
     def log_status(self, item, status):
         try:
             year = item["file_path"].parts[-5]  # Extract year from the path
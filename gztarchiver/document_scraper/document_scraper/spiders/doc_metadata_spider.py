@@ -1,11 +1,83 @@
 import scrapy
 from urllib.parse import urljoin
-import os
-import json
+from lxml import etree
+
+LANG_MAP = {
+    "en": ("English", "btn-primary"),
+    "si": ("Sinhala", "btn-secondary"),
+    "ta": ("Tamil", "btn-success")
+}
+
+# Compiled once and reused for every row of every table page
+ROWS_XPATH = etree.XPath(
+    "//table[contains(concat(' ', normalize-space(@class), ' '), ' table-bordered ')]/tbody/tr"
+)
+CELLS_XPATH = etree.XPath("./td")
+# First text node of a cell, stripped in Python like the CSS ::text parser did (normalize-space()
+# would also collapse whitespace inside descriptions)
+CELL_TEXT_XPATH = etree.XPath("string(text()[1])")
+# Download links can be wrapped (e.g. in a div or span) and wrap their button, like the CSS
+# selector "a:has(button.<class>)" matched
+LANG_HREF_XPATHS = {
+    lang: etree.XPath(
+        f".//a[.//button[contains(concat(' ', normalize-space(@class), ' '), ' {lang_class} ')]]/@href"
+    )
+    for lang, (lang_label, lang_class) in LANG_MAP.items()
+}
+
+
+def parse_doc_metadata_rows(root, base_url, lang):
+    """
+    Read the document rows of a year table page
+
+    Args:
+        root: lxml root element of the page (response.selector.root)
+        base_url: URL of the page, used to resolve relative download links
+        lang: Language code whose download button is looked up ("en", "si" or "ta")
+
+    Yields:
+        Dict with doc_id, date, description, download_url and availability per row
+    """
+
+    lang_href_xpath = LANG_HREF_XPATHS.get(lang, LANG_HREF_XPATHS["en"])
+
+    for row in ROWS_XPATH(root):
+        cells = CELLS_XPATH(row)
+        if len(cells) < 3:
+            continue
+
+        gazette_number = CELL_TEXT_XPATH(cells[0]).strip()
+        gazette_date = CELL_TEXT_XPATH(cells[1]).strip()
+        description = CELL_TEXT_XPATH(cells[2]).strip()
+
+        availability = "Unavailable"
+        download_url = "N/A"
+
+        if len(cells) > 3:
+            hrefs = lang_href_xpath(cells[3])
+            if hrefs and hrefs[0]:
+                download_url = urljoin(base_url, hrefs[0])
+                availability = "Available"
+
+        yield {
+            "doc_id": gazette_number.replace('/', '-'),
+            "date": gazette_date,
+            "description": description,
+            "download_url": download_url,
+            "availability": availability
+        }
+
 
 class DocMetadataSpider(scrapy.Spider):
     name = "doc_metadata_spider"
 
+    # Rows are streamed to output_path as JSONL by the pipeline instead of being collected here
+    custom_settings = {
+        "ITEM_PIPELINES": {
+            "gztarchiver.document_scraper.document_scraper.pipelines.DocMetadataJsonlPipeline": 300
+        }
+    }
+
     def __init__(self, url=None, lang=None,output_path=None, **kwargs):
         self.start_urls = [url]
         self.lang = lang.lower()
@@ -13,49 +85,4 @@ class DocMetadataSpider(scrapy.Spider):
         super().__init__(**kwargs)
 
     def parse(self, response):
-        all_table_metadata = []
-    
-        lang_map = {
-            "en": ("English", "btn-primary"),
-            "si": ("Sinhala", "btn-secondary"),
-            "ta": ("Tamil", "btn-success")
-        }
-
-        lang_label, lang_class = lang_map.get(self.lang, ("English", "btn-primary"))
-
-        rows = response.css("table.table-bordered tbody tr")
-        for row in rows:
-            gazette_number = row.css("td:nth-child(1)::text").get().strip()
-            gazette_date = row.css("td:nth-child(2)::text").get().strip()
-            description = row.css("td:nth-child(3)::text").get().strip()
-            
-            doc_id = gazette_number.replace('/', '-')
-            availability = "Unavailable"
-            download_url = "N/A"
-
-            download_td = row.css("td:nth-child(4)")
-            lang_button = download_td.css(f"a:has(button.{lang_class})")
-
-            if lang_button:
-                href = lang_button.css("::attr(href)").get()
-                if href:
-                    download_url = urljoin(response.url, href)
-                    availability = "Available"
-                    
-            table_metadata = {
-                "doc_id": doc_id,
-                "date": gazette_date,
-                "description": description,
-                "download_url": download_url,
-                "availability": availability
-            }
-            
-            all_table_metadata.append(table_metadata)
-        # TODO: This function should consider
-        os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
-        with open(self.output_path, "w") as f:
-            json.dump(all_table_metadata, f, indent=2)
-        print("Data saved to doc_metadata.json") 
-
-
-        
+        yield from parse_doc_metadata_rows(response.selector.root, response.url, self.lang)
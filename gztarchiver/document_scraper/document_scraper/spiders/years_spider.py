@@ -6,10 +6,11 @@ from urllib.parse import urljoin
 class YearsSpider(scrapy.Spider):
     name = "years"
 
-    def __init__(self, url, output_path, *args, **kwargs):
+    def __init__(self, url, output_path=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.start_urls = [url]
-        self.output_path = os.path.expanduser(output_path)
+        # Optional snapshot file; the year links are also yielded as items
+        self.output_path = os.path.expanduser(output_path) if output_path else None
 
     def parse(self, response):
         data = []
@@ -18,9 +19,11 @@ class YearsSpider(scrapy.Spider):
             href = a.css("::attr(href)").get()
             full_url = urljoin(response.url, href)  # join base URL + relative path
             data.append({"year": year, "link": full_url})
+            yield {"year": year, "link": full_url}
 
-        os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
-        with open(self.output_path, "w") as f:
-            json.dump(data, f, indent=2)
+        if self.output_path:
+            os.makedirs(os.path.dirname(self.output_path), exist_ok=True)
+            with open(self.output_path, "w") as f:
+                json.dump(data, f, indent=2)
 
-        self.log(f"Saved {len(data)} year links to {self.output_path}")
+            self.log(f"Saved {len(data)} year links to {self.output_path}")
@@ -4,11 +4,13 @@ if sys.platform == 'win32':
     asyncio.set_event_loop_policy(asyncio.WindowsProactorEventLoopPolicy())
 from twisted.internet import asyncioreactor
 asyncioreactor.install()
-from .doc_scraper.cmd import parse_args, identify_input_kind
+from .doc_scraper.cmd import parse_args, parse_benchmark_args, parse_export_args, parse_search_args, parse_watch_args, parse_verify_args, identify_input_kind
 from pathlib import Path
 import yaml
 from twisted.internet import reactor
-from .doc_scraper.crawler import run_crawlers_sequentially
+from .doc_scraper.crawler import run_crawlers_sequentially, run_watch
+from .doc_inspector.utils import run_classify_benchmark_command, run_search_command
+from .doc_scraper.utils import get_metadata_store, export_metadata_to_parquet, run_parse_table_benchmark_command, run_verify_command
 from pyfiglet import figlet_format
 from termcolor import colored
     
@@ -18,11 +20,46 @@ def main():
     colored_art = colored(ascii_art, color='cyan')
     print("\n" + colored_art)
     
+    # Sub-commands that do not run the crawling pipeline
+    if len(sys.argv) > 1 and sys.argv[1] == "benchmark":
+        benchmark_args = parse_benchmark_args(sys.argv[2:])
+        if benchmark_args.target == "classify":
+            sys.exit(run_classify_benchmark_command(benchmark_args))
+        if benchmark_args.target == "parse-table":
+            sys.exit(run_parse_table_benchmark_command(benchmark_args))
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "export":
+        sys.exit(run_export(parse_export_args(sys.argv[2:])))
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "search":
+        search_args = parse_search_args(sys.argv[2:])
+        with open(search_args.config) as f:
+            config = yaml.safe_load(f)
+        sys.exit(run_search_command(search_args, config))
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "verify":
+        verify_args = parse_verify_args(sys.argv[2:])
+        with open(verify_args.config) as f:
+            config = yaml.safe_load(f)
+        sys.exit(run_verify_command(verify_args, config))
+    
+    if len(sys.argv) > 1 and sys.argv[1] == "watch":
+        watch_args = parse_watch_args(sys.argv[2:])
+        with open(watch_args.config) as f:
+            config = yaml.safe_load(f)
+        run_watch(watch_args, config)
+        reactor.run()
+        sys.exit(0)
+    
     args = parse_args()
     user_input_kind = identify_input_kind(args)
 
     if user_input_kind == "invalid-input":
-        print("Invalid input! --year and --lang are required at minimum.")
+        print("Invalid input! --year (or --from) and --lang are required at minimum.")
+        sys.exit(1)
+    
+    if user_input_kind == "invalid-range-input":
+        print("Invalid date range! Use --from (and optionally --to, not before --from) without --year, --month or --day.")
         sys.exit(1)
         
     if user_input_kind == "invalid-lang-input":
@@ -45,5 +82,30 @@ def main():
     reactor.run()
 
 
+def run_export(args):
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+    
+    export_location = args.output or config.get("export", {}).get("parquet_location")
+    if not export_location:
+        print("Please set export.parquet_location in the config or pass --output")
+        return 1
+    
+    store = get_metadata_store(config, args.year or [])
+    if not store:
+        print("❌ No metadata store available to export from")
+        return 1
+    
+    try:
+        export_metadata_to_parquet(store, export_location, args.year)
+    except ImportError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        store.close()
+    
+    return 0
+
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
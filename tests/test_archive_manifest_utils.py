@@ -0,0 +1,28 @@
+from gztarchiver.doc_scraper.utils.archive_manifest_utils import ArchiveManifest, get_file_lang
+
+
+def test_status_update_keeps_the_known_size_and_hash(tmp_path):
+    manifest = ArchiveManifest(tmp_path / "manifest.sqlite3")
+    try:
+        manifest.record("1-01", "en", "archived", path="/a/1-01_english.pdf", size=10, sha256="abc", date="2024-01-01")
+        manifest.record("1-01", "en", "failed")
+
+        entry = manifest.get_entries(["1-01"], "en")["1-01"]
+        assert entry["status"] == "failed"
+        assert entry["size"] == 10
+        assert entry["sha256"] == "abc"
+        assert entry["path"] == "/a/1-01_english.pdf"
+
+        manifest.record("1-01", "en", "archived", size=12, sha256="def")
+        entry = manifest.get_entries(["1-01"], "en")["1-01"]
+        assert (entry["status"], entry["size"], entry["sha256"]) == ("archived", 12, "def")
+        assert manifest.count("2024") == 1
+    finally:
+        manifest.close()
+
+
+def test_get_file_lang():
+    assert get_file_lang("2024/01/01/1-01/1-01_english.pdf") == "en"
+    assert get_file_lang("1-01_tamil.pdf") == "ta"
+    assert get_file_lang("unavailable.txt") is None
+    assert get_file_lang(None) is None
@@ -0,0 +1,89 @@
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from gztarchiver.doc_scraper.utils import archive_to_cloud_utils
+from gztarchiver.doc_scraper.utils.archive_to_cloud_utils import execute_batched_requests, query_resumable_upload_offset
+from gztarchiver.doc_scraper.utils.rate_limit_utils import AdaptiveRateLimiter
+
+
+def http_error(status):
+    return HttpError(httplib2.Response({"status": str(status)}), b"{}")
+
+
+@pytest.fixture(autouse=True)
+def unlimited_drive_calls(monkeypatch):
+    monkeypatch.setattr(archive_to_cloud_utils, "drive_rate_limiter", AdaptiveRateLimiter(None, backoff_cap=0.0))
+
+
+class FakeBatch:
+    """Answers sub-requests in order; the first execute() fails after answering `fail_after` of them"""
+
+    def __init__(self, service, callback):
+        self.service = service
+        self.callback = callback
+        self.requests = []
+
+    def add(self, request, request_id=None):
+        self.requests.append((request_id, request))
+
+    def execute(self):
+        for position, (request_id, request) in enumerate(self.requests):
+            if self.service.fail_after == position:
+                self.service.fail_after = None
+                raise http_error(503)
+            self.service.executed.append(request_id)
+            self.callback(request_id, request, None)
+
+
+class FakeService:
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+        self.executed = []
+
+    def new_batch_http_request(self, callback=None):
+        return FakeBatch(self, callback)
+
+
+def test_failed_batch_call_retries_only_unanswered_requests():
+    service = FakeService(fail_after=2)
+    builders = {f"folder-{i}": (lambda i=i: {"id": i}) for i in range(5)}
+
+    responses, errors = execute_batched_requests(service, builders)
+
+    assert errors == {}
+    assert sorted(responses) == sorted(builders)
+    # Requests answered before the failure (e.g. folder creations) are not sent twice
+    assert sorted(service.executed) == sorted(builders)
+    # One token per sent sub-request: 5 in the first call, the 3 unanswered in the retry
+    assert archive_to_cloud_utils.drive_rate_limiter.get_metrics()["calls"] == 8
+
+
+class FakeResumableRequest:
+    def __init__(self, status, headers=None, content=b""):
+        self.resumable_uri = "https://upload.example.org/session/1"
+        self.sent = []
+        self.http = self
+        self.response = (httplib2.Response({"status": str(status), **(headers or {})}), content)
+
+    def request(self, uri, method="GET", headers=None, **kwargs):
+        self.sent.append((uri, method, headers))
+        return self.response
+
+    def postproc(self, resp, content):
+        return {"id": content.decode()}
+
+
+def test_resume_offset_comes_from_the_status_request():
+    request = FakeResumableRequest(308, {"range": "bytes=0-524287"})
+
+    assert query_resumable_upload_offset(request, 1048576) == (524288, None)
+    assert request.sent == [(request.resumable_uri, "PUT", {"Content-Length": "0", "Content-Range": "bytes */1048576"})]
+
+
+def test_resume_of_an_empty_or_completed_session():
+    assert query_resumable_upload_offset(FakeResumableRequest(308), 100) == (0, None)
+    assert query_resumable_upload_offset(FakeResumableRequest(200, content=b"file-1"), 100) == (100, {"id": "file-1"})
+
+    with pytest.raises(HttpError):
+        query_resumable_upload_offset(FakeResumableRequest(404), 100)
@@ -0,0 +1,118 @@
+import hashlib
+import json
+
+import fitz
+import pytest
+
+from gztarchiver.doc_scraper.utils.archive_manifest_utils import ArchiveManifest
+from gztarchiver.doc_scraper.utils.archive_verify_utils import (
+    check_archive_file,
+    drop_redownloads_from_snapshots,
+    update_manifest_from_report,
+    verify_archive
+)
+from gztarchiver.doc_scraper.utils.metadata_snapshot_utils import get_metadata_snapshot_path, load_metadata_snapshot
+
+
+def write_pdf(path, pages=1):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    doc = fitz.open()
+    for _ in range(pages):
+        doc.new_page()
+    doc.save(str(path))
+    doc.close()
+    return path.read_bytes()
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    path = tmp_path / "1-01_english.pdf"
+    write_pdf(path, pages=2)
+    return path
+
+
+def test_intact_pdf(pdf_path):
+    content = pdf_path.read_bytes()
+    expected = {"size": len(content), "sha256": hashlib.sha256(content).hexdigest()}
+
+    result = check_archive_file(pdf_path, expected)
+
+    assert result["problem"] is None
+    assert result["pages"] == 2
+    assert result["sha256"] == expected["sha256"]
+
+
+@pytest.mark.parametrize("content, problem", [
+    (b"", "empty"),
+    (b"<html>error page</html>", "not_pdf"),
+    (b"%PDF-1.7\n1 0 obj", "truncated")
+])
+def test_damaged_files(tmp_path, content, problem):
+    path = tmp_path / "1-01_english.pdf"
+    path.write_bytes(content)
+
+    assert check_archive_file(path)["problem"] == problem
+
+
+def test_size_and_hash_mismatch(pdf_path):
+    size = pdf_path.stat().st_size
+
+    assert check_archive_file(pdf_path, {"size": size + 1})["problem"] == "size_mismatch"
+    assert check_archive_file(pdf_path, {"size": size, "sha256": "0" * 64})["problem"] == "hash_mismatch"
+
+
+def test_missing_file(tmp_path):
+    assert check_archive_file(tmp_path / "missing.pdf")["problem"] == "missing"
+
+
+def test_update_manifest_and_snapshot_from_report(tmp_path):
+    archive = tmp_path / "archive"
+    config = {"archive": {"archive_location": str(archive)}}
+    good = archive / "2024" / "01" / "01" / "1-01" / "1-01_english.pdf"
+    bad = archive / "2024" / "01" / "02" / "2-01" / "2-01_english.pdf"
+    write_pdf(good)
+    bad.parent.mkdir(parents=True)
+    bad.write_bytes(b"%PDF-1.7\ncut off")
+
+    snapshot_path = get_metadata_snapshot_path(config, "2024", "en")
+    snapshot_path.parent.mkdir(parents=True)
+    snapshot_path.write_text(json.dumps({"rows": {"1-01": {}, "2-01": {}}}), encoding="utf-8")
+
+    manifest = ArchiveManifest(tmp_path / "manifest.sqlite3")
+    try:
+        manifest.record("1-01", "en", "archived", path=good, date="2024-01-01")
+        manifest.record("2-01", "en", "archived", path=bad, date="2024-01-02")
+
+        report = verify_archive(archive, manifest=manifest, workers=2)
+        assert report["summary"]["truncated"] == 1
+
+        marked, hashed = update_manifest_from_report(manifest, report)
+        assert (marked, hashed) == (1, 1)
+        entries = manifest.get_entries(["1-01", "2-01"], "en")
+        assert entries["2-01"]["status"] == "failed"
+        assert entries["1-01"]["sha256"] == hashlib.sha256(good.read_bytes()).hexdigest()
+    finally:
+        manifest.close()
+
+    # The failed document must reach the next delta run
+    assert drop_redownloads_from_snapshots(config, report["problems"]) == 1
+    assert list(load_metadata_snapshot(snapshot_path)) == ["1-01"]
+
+
+def test_archives_from_before_the_manifest_are_imported_from_the_logs(tmp_path):
+    archive = tmp_path / "archive"
+    pdf = archive / "2024" / "01" / "01" / "1-01" / "1-01_english.pdf"
+    write_pdf(pdf)
+    (archive / "2024" / "archived_logs.csv").write_text(
+        f"doc_id,download_url,file_path\n1-01,https://example.org/1-01.pdf,{pdf}\n", encoding="utf-8"
+    )
+
+    manifest = ArchiveManifest(tmp_path / "manifest.sqlite3")
+    try:
+        report = verify_archive(archive, manifest=manifest, workers=2)
+    finally:
+        manifest.close()
+
+    assert report["summary"]["ok"] == 1
+    assert report["summary"]["untracked"] == 0
+    assert report["untracked"] == []
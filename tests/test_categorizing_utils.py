@@ -0,0 +1,75 @@
+from gztarchiver.doc_inspector.utils.categorizing_utils import (
+    CLASSIFIED_METADATA_HEADER,
+    append_classified_doc_metadata,
+    load_classified_doc_metadata,
+    compact_classified_doc_metadata,
+    get_classified_metadata_path
+)
+
+
+def read_lines(tmp_path, year=2024):
+    return get_classified_metadata_path(tmp_path, year).read_text(encoding="utf-8").splitlines()
+
+
+def test_rows_are_appended_after_a_single_header(tmp_path):
+    append_classified_doc_metadata(("1-01", "2024-01-01", "LAND", "Acquisition"), tmp_path, 2024)
+    append_classified_doc_metadata(("2-01", "2024-01-02", "PEOPLE", "Appointment"), tmp_path, 2024)
+
+    assert read_lines(tmp_path) == [",".join(CLASSIFIED_METADATA_HEADER), "1-01,2024-01-01,LAND,Acquisition", "2-01,2024-01-02,PEOPLE,Appointment"]
+
+
+def test_the_last_row_of_a_document_wins(tmp_path):
+    append_classified_doc_metadata(("1-01", "2024-01-01", "Error", "API request failed"), tmp_path, 2024)
+    append_classified_doc_metadata(("2-01", "2024-01-02", "PEOPLE", "Appointment"), tmp_path, 2024)
+    append_classified_doc_metadata(("1-01", "2024-01-01", "LAND", "Acquisition"), tmp_path, 2024)
+
+    rows, rows_read = load_classified_doc_metadata(tmp_path, 2024)
+
+    assert rows_read == 3
+    assert rows == {
+        "1-01": ("1-01", "2024-01-01", "LAND", "Acquisition"),
+        "2-01": ("2-01", "2024-01-02", "PEOPLE", "Appointment")
+    }
+
+
+def test_a_truncated_last_line_is_skipped_and_not_glued_to_the_next_row(tmp_path):
+    append_classified_doc_metadata(("1-01", "2024-01-01", "LAND", "Acquisition"), tmp_path, 2024)
+    # An interrupted run leaves half a row without a line ending
+    with open(get_classified_metadata_path(tmp_path, 2024), "a", encoding="utf-8") as f:
+        f.write("2-01,2024-01")
+
+    rows, rows_read = load_classified_doc_metadata(tmp_path, 2024)
+    assert (sorted(rows), rows_read) == (["1-01"], 2)
+
+    append_classified_doc_metadata(("3-01", "2024-01-03", "COMMERCIAL", "Tender"), tmp_path, 2024)
+    rows, _ = load_classified_doc_metadata(tmp_path, 2024)
+    assert sorted(rows) == ["1-01", "3-01"]
+
+
+def test_compaction_waits_for_enough_superseded_rows(tmp_path):
+    for i in range(4):
+        append_classified_doc_metadata((f"{i}-01", "2024-01-01", "LAND", "First pass"), tmp_path, 2024)
+    append_classified_doc_metadata(("0-01", "2024-01-01", "PEOPLE", "Second pass"), tmp_path, 2024)
+
+    # One superseded row for four documents is left in place
+    assert compact_classified_doc_metadata(tmp_path, 2024) == 0
+    assert len(read_lines(tmp_path)) == 6
+
+    append_classified_doc_metadata(("1-01", "2024-01-01", "PEOPLE", "Second pass"), tmp_path, 2024)
+    assert compact_classified_doc_metadata(tmp_path, 2024) == 2
+    assert len(read_lines(tmp_path)) == 5
+
+    rows, rows_read = load_classified_doc_metadata(tmp_path, 2024)
+    assert rows_read == 4
+    assert rows["0-01"][3] == rows["1-01"][3] == "Second pass"
+
+
+def test_forced_compaction_removes_any_superseded_row(tmp_path):
+    for doc_type in ("LAND", "PEOPLE"):
+        append_classified_doc_metadata(("1-01", "2024-01-01", doc_type, "Reasoning"), tmp_path, 2024)
+    for i in range(2, 6):
+        append_classified_doc_metadata((f"{i}-01", "2024-01-01", "LAND", "Reasoning"), tmp_path, 2024)
+
+    assert compact_classified_doc_metadata(tmp_path, 2024) == 0
+    assert compact_classified_doc_metadata(tmp_path, 2024, force=True) == 1
+    assert compact_classified_doc_metadata(tmp_path, 2024, force=True) == 0
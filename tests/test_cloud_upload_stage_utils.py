@@ -0,0 +1,100 @@
+import threading
+import time
+
+from gztarchiver.doc_scraper.utils.cloud_upload_stage_utils import CloudUploadStage
+from gztarchiver.doc_scraper.utils.object_storage_utils import StorageBackend
+
+
+class BlockingBackend(StorageBackend):
+    """Records uploads; holds every upload until released"""
+
+    name = "test"
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.uploaded = []
+        self.closed = False
+
+    def upload_object(self, item):
+        self.release.wait(10)
+        self.uploaded.append(item["local_path"])
+        return {"status": "uploaded", "remote_id": item["key"], "url": item["key"]}
+
+    def close(self):
+        self.closed = True
+
+
+def make_doc(tmp_path, doc_id, lang="english"):
+    file_path = tmp_path / f"{doc_id}_{lang}.pdf"
+    file_path.write_bytes(b"%PDF-1.7")
+    return {"doc_id": doc_id, "date": "2024-01-01", "availability": "Available", "file_path": file_path, "download_url": "N/A"}
+
+
+def test_submit_never_blocks_and_reports_a_full_queue(tmp_path):
+    backend = BlockingBackend()
+    stage = CloudUploadStage(backend, upload_workers=1, queue_size=2, batch_size=1, batch_wait=0.05)
+    docs = [make_doc(tmp_path, f"doc-{i}") for i in range(5)]
+
+    started = time.monotonic()
+    assert all(stage.submit(doc) for doc in docs)
+    assert time.monotonic() - started < 1.0
+    assert stage.is_full()
+
+    backend.release.set()
+    results = stage.close()
+
+    assert not stage.is_full()
+    assert results["successful_uploads"] == 5
+    assert backend.uploaded == [str(doc["file_path"]) for doc in docs]
+    assert backend.closed
+
+
+def test_submit_many_waits_for_room_in_the_queue(tmp_path):
+    backend = BlockingBackend()
+    stage = CloudUploadStage(backend, upload_workers=1, queue_size=2, batch_size=1, batch_wait=0.05)
+    docs = [make_doc(tmp_path, f"doc-{i}") for i in range(6)]
+    queued = []
+
+    sweep = threading.Thread(target=lambda: queued.append(stage.submit_many(docs)))
+    sweep.start()
+    sweep.join(0.5)
+
+    # One document is uploading and the queue is full: the sweep waits instead of growing the backlog
+    assert sweep.is_alive()
+    assert stage.pending() == 2
+
+    backend.release.set()
+    sweep.join(5)
+
+    assert queued == [6]
+    assert stage.close()["successful_uploads"] == 6
+
+
+def test_submissions_are_keyed_by_file(tmp_path):
+    backend = BlockingBackend()
+    backend.release.set()
+    stage = CloudUploadStage(backend, upload_workers=1, batch_size=5, batch_wait=0.05)
+    english = make_doc(tmp_path, "doc-1")
+    sinhala = make_doc(tmp_path, "doc-1", "sinhala")
+
+    assert stage.submit(english)
+    assert stage.submit(sinhala)
+    assert not stage.submit(dict(english))
+
+    # Once its batch is handled, a file can be queued again (e.g. a refreshed PDF)
+    deadline = time.monotonic() + 5
+    while not stage.submit(english):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+    assert len(backend.uploaded) >= 2
+
+    assert stage.close()["successful_uploads"] == 3
+    assert not stage.submit(english)
+
+
+def test_unavailable_documents_are_not_queued(tmp_path):
+    stage = CloudUploadStage(BlockingBackend(), batch_wait=0.05)
+    doc = {**make_doc(tmp_path, "doc-1"), "availability": "Unavailable"}
+
+    assert not stage.submit(doc)
+    assert stage.close()["total_documents"] == 0
@@ -0,0 +1,33 @@
+from gztarchiver.doc_scraper.utils.crawl_metrics_utils import Histogram, CrawlMetrics, render_prometheus_textfile
+
+
+def test_histogram_quantile_returns_bucket_upper_bounds():
+    histogram = Histogram((0.1, 0.5, 1.0))
+    for value in (0.05, 0.05, 0.2, 0.3, 0.9):
+        histogram.observe(value)
+
+    assert histogram.count == 5
+    assert histogram.quantile(0.4) == 0.1
+    assert histogram.quantile(0.5) == 0.5
+    assert histogram.quantile(0.99) == 1.0
+
+
+def test_histogram_quantile_empty_and_overflow():
+    histogram = Histogram((1.0,))
+    assert histogram.quantile(0.5) is None
+
+    histogram.observe(5.0)
+    assert histogram.quantile(0.5) is None
+    assert histogram.to_dict()["buckets"] == {"1.0": 0, "+Inf": 1}
+
+
+def test_prometheus_textfile_groups_samples_per_family():
+    first = CrawlMetrics("first")
+    second = CrawlMetrics("second")
+    first.request_seconds.observe(0.2)
+
+    text = render_prometheus_textfile([first, second])
+
+    assert text.count("# TYPE gztarchiver_request_duration_seconds histogram") == 1
+    assert 'gztarchiver_request_duration_seconds_count{spider="first"} 1' in text
+    assert 'gztarchiver_request_duration_seconds_count{spider="second"} 0' in text
@@ -0,0 +1,44 @@
+from datetime import date
+
+from gztarchiver.doc_scraper.utils.date_index_utils import DateIndex, get_range_years
+
+
+def make_rows(*dates):
+    return [{"doc_id": f"doc-{i}", "date": value} for i, value in enumerate(dates)]
+
+
+def test_range_is_inclusive_and_date_ordered():
+    index = DateIndex({2024: make_rows("2024-03-01", "2024-01-15", "2024-02-10", "2024-01-15")})
+
+    rows = index.range("2024-01-15", date(2024, 2, 10))
+
+    assert [row["date"] for _, row in rows] == ["2024-01-15", "2024-01-15", "2024-02-10"]
+    # Rows published on the same day keep their table order
+    assert [row["doc_id"] for _, row in rows[:2]] == ["doc-1", "doc-3"]
+
+
+def test_range_without_bounds_returns_every_row():
+    index = DateIndex({2024: make_rows("2024-05-01", "2024-04-01")})
+
+    assert len(index.range()) == 2
+    assert [row["date"] for _, row in index.range(start="2024-04-15")] == ["2024-05-01"]
+    assert [row["date"] for _, row in index.range(end="2024-04-15")] == ["2024-04-01"]
+
+
+def test_invalid_dates_are_skipped():
+    index = DateIndex({2024: make_rows("2024-01-01", "not a date", None)})
+
+    assert len(index) == 1
+    assert index.skipped == 2
+
+
+def test_range_by_year_keeps_the_year_page():
+    index = DateIndex({2023: make_rows("2023-12-30"), 2024: make_rows("2024-01-02")})
+
+    rows_by_year = index.range_by_year("2023-12-01", "2024-01-31")
+
+    assert sorted(rows_by_year) == [2023, 2024]
+
+
+def test_get_range_years():
+    assert get_range_years(date(2023, 11, 15), date(2024, 2, 10)) == [2023, 2024]
@@ -0,0 +1,134 @@
+import pytest
+from pymongo.errors import BulkWriteError
+
+from gztarchiver.doc_scraper.utils import db_utils
+from gztarchiver.doc_scraper.utils.db_utils import insert_docs_by_year, ensure_indexes, bootstrap_indexes, compute_record_fingerprint
+
+
+class FakeCollection:
+    """Keeps upserted documents in a dict; bulk_write fails the operations on `failing_ids` like an unordered write"""
+
+    def __init__(self, failing_ids=()):
+        self.docs = {}
+        self.failing_ids = set(failing_ids)
+        self.bulk_calls = []
+        self.indexes = {"_id_"}
+        self.created_indexes = []
+
+    def index_information(self):
+        return {name: {} for name in self.indexes}
+
+    def create_index(self, keys, name=None, unique=False):
+        self.indexes.add(name)
+        self.created_indexes.append(name)
+
+    def find(self, query, projection=None):
+        document_ids = query["document_id"]["$in"]
+        return [self.docs[doc_id] for doc_id in document_ids if doc_id in self.docs]
+
+    def bulk_write(self, operations, ordered=True):
+        self.bulk_calls.append([op._filter["document_id"] for op in operations])
+        write_errors = []
+        counts = {"nMatched": 0, "nModified": 0, "nUpserted": 0}
+
+        for index, op in enumerate(operations):
+            doc_id = op._filter["document_id"]
+            if doc_id in self.failing_ids:
+                write_errors.append({"index": index, "code": 11000, "errmsg": f"E11000 duplicate key: {doc_id}"})
+                continue
+            if doc_id in self.docs:
+                counts["nMatched"] += 1
+                counts["nModified"] += 1
+            else:
+                counts["nUpserted"] += 1
+            self.docs[doc_id] = dict(op._doc["$set"])
+
+        if write_errors:
+            raise BulkWriteError({**counts, "writeErrors": write_errors})
+        return FakeBulkWriteResult(counts)
+
+
+class FakeBulkWriteResult:
+    def __init__(self, counts):
+        self.bulk_api_result = counts
+
+
+class FakeDatabase:
+    name = "gazettes"
+
+    def __init__(self, **collections):
+        self.collections = collections
+
+    def __getitem__(self, name):
+        return self.collections.setdefault(name, FakeCollection())
+
+    def list_collection_names(self):
+        return list(self.collections)
+
+
+@pytest.fixture(autouse=True)
+def fresh_index_cache(monkeypatch):
+    monkeypatch.setattr(db_utils, "_indexed_collections", set())
+
+
+def make_record(doc_id, doc_type="Notice"):
+    return {"document_id": doc_id, "document_date": "2024-01-01", "document_type": doc_type, "availability": "Available"}
+
+
+def test_bulk_write_errors_map_back_to_their_documents():
+    collection = FakeCollection(failing_ids={"2", "5"})
+    db = FakeDatabase(gazettes_2024=collection)
+
+    results = insert_docs_by_year(db, [make_record(str(i)) for i in range(1, 7)], 2024, chunk_size=3)
+
+    # Error indexes are relative to each chunk's bulk_write call
+    assert collection.bulk_calls == [["1", "2", "3"], ["4", "5", "6"]]
+    assert [error["document_id"] for error in results["errors"]] == ["2", "5"]
+    assert "duplicate key: 5" in results["errors"][1]["error"]
+    # The rest of each unordered chunk is still written and counted
+    assert results["upserted"] == 4
+    assert sorted(collection.docs) == ["1", "3", "4", "6"]
+
+
+def test_indexes_are_ensured_once_per_collection():
+    db = FakeDatabase(gazettes_2023=FakeCollection())
+
+    created = ensure_indexes(db, 2024)
+    assert created == sorted(["_id_"] + [spec["name"] for spec in db_utils.GAZETTE_INDEXES])
+    assert ensure_indexes(db, 2024) == []
+
+    # Writes and the bootstrap reuse the cache; only the collection not seen yet is indexed
+    insert_docs_by_year(db, [make_record("1")], 2024)
+    bootstrap_indexes(db, [2024])
+    assert db["gazettes_2024"].created_indexes == [spec["name"] for spec in db_utils.GAZETTE_INDEXES]
+    assert db["gazettes_2023"].created_indexes == [spec["name"] for spec in db_utils.GAZETTE_INDEXES]
+
+    # The text index is a separate bootstrap
+    ensure_indexes(db, 2024, text_index=True)
+    assert db["gazettes_2024"].created_indexes[-1] == db_utils.GAZETTE_TEXT_INDEX["name"]
+
+
+def test_records_with_an_unchanged_fingerprint_are_skipped():
+    collection = FakeCollection()
+    db = FakeDatabase(gazettes_2024=collection)
+    records = [make_record("1"), make_record("2"), make_record("3")]
+
+    first = insert_docs_by_year(db, records, 2024)
+    second = insert_docs_by_year(db, [make_record("1"), make_record("2", "Appointment"), make_record("3")], 2024)
+    third = insert_docs_by_year(db, records[:1], 2024)
+
+    assert first["upserted"] == 3
+    assert (second["skipped_unchanged"], second["modified"]) == (2, 1)
+    assert collection.bulk_calls[1] == ["2"]
+    # Nothing changed: no bulk_write call at all
+    assert third["skipped_unchanged"] == 1
+    assert len(collection.bulk_calls) == 2
+    assert collection.docs["2"]["fingerprint"] == compute_record_fingerprint(make_record("2", "Appointment"))
+
+
+def test_fingerprint_ignores_stored_fields_and_key_order():
+    record = make_record("1")
+    stored = {"_id": "abc", "fingerprint": "old", **dict(reversed(list(record.items())))}
+
+    assert compute_record_fingerprint(stored) == compute_record_fingerprint(record)
+    assert compute_record_fingerprint(make_record("1", "Appointment")) != compute_record_fingerprint(record)
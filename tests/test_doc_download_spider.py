@@ -0,0 +1,36 @@
+from types import SimpleNamespace
+
+from gztarchiver.document_scraper.document_scraper.spiders.doc_download_spider import PDFDownloaderSpider
+
+
+class FakeEngine:
+    def __init__(self):
+        self.paused = False
+
+    def pause(self):
+        self.paused = True
+
+    def unpause(self):
+        self.paused = False
+
+
+def test_downloads_pause_while_the_upload_backlog_is_full(tmp_path):
+    backlog = {"full": True}
+    saved = []
+    spider = PDFDownloaderSpider(on_document_saved=saved.append, upload_backlog_full=lambda: backlog["full"])
+    spider.crawler = SimpleNamespace(engine=FakeEngine())
+    item = {"doc_id": "1-01", "file_path": tmp_path / "2024" / "1-01_english.pdf", "download_url": "N/A"}
+
+    spider.save_pdf(SimpleNamespace(meta={"item": item}, body=b"%PDF-1.7"))
+
+    assert saved == [item]
+    assert spider.crawler.engine.paused
+
+    # Still full: the timer keeps the engine paused
+    spider.resume_downloads_if_drained()
+    assert spider.crawler.engine.paused
+
+    backlog["full"] = False
+    spider.resume_downloads_if_drained()
+    assert not spider.crawler.engine.paused
+    assert spider._backpressure_check is None
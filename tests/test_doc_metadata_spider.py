@@ -0,0 +1,39 @@
+from scrapy.http import HtmlResponse
+
+from gztarchiver.doc_scraper.utils.table_benchmark_utils import parse_rows_with_css
+from gztarchiver.document_scraper.document_scraper.spiders.doc_metadata_spider import parse_doc_metadata_rows
+
+TABLE_PAGE = b"""
+<html><body><table class="table table-bordered"><tbody>
+<tr>
+  <td> 2024/01 </td><td>2024-01-01
+  </td><td>  Notice   under the
+    Land Acquisition Act <b>(amended)</b> tail </td>
+  <td><a href="/files/2024-01_E.pdf"><button class="btn btn-primary">English</button></a>
+      <a href="/files/2024-01_S.pdf"><button class="btn btn-secondary">Sinhala</button></a></td>
+</tr>
+<tr>
+  <td>2024/03</td><td>2024-01-03</td><td>Wrapped download links</td>
+  <td><div class="downloads"><span><a href="/files/2024-03_T.pdf"><span class="icon"><button class="btn btn-success btn-sm">Tamil</button></span></a></span></div></td>
+</tr>
+<tr><td>2024/02</td><td>2024-01-02</td><td>No download</td><td></td></tr>
+</tbody></table></body></html>
+"""
+
+
+def test_rows_match_the_css_parser():
+    response = HtmlResponse("https://example.org/2024.html", body=TABLE_PAGE, encoding="utf-8")
+
+    for lang in ("en", "si", "ta"):
+        rows = list(parse_doc_metadata_rows(response.selector.root, response.url, lang))
+        assert rows == parse_rows_with_css(response, lang)
+
+    rows = list(parse_doc_metadata_rows(response.selector.root, response.url, "en"))
+    assert rows[0]["doc_id"] == "2024-01"
+    assert rows[0]["description"] == "Notice   under the\n    Land Acquisition Act"
+    assert rows[0]["download_url"] == "https://example.org/files/2024-01_E.pdf"
+    assert (rows[2]["availability"], rows[2]["download_url"]) == ("Unavailable", "N/A")
+
+    # Links nested in span/div wrappers are found too
+    rows = list(parse_doc_metadata_rows(response.selector.root, response.url, "ta"))
+    assert (rows[1]["availability"], rows[1]["download_url"]) == ("Available", "https://example.org/files/2024-03_T.pdf")
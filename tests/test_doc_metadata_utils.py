@@ -0,0 +1,26 @@
+import json
+
+from gztarchiver.doc_scraper.utils.doc_metadata_utils import iter_doc_metadata, load_doc_metadata_file
+
+ROWS = [
+    {"doc_id": "1-01", "date": "2024-01-01"},
+    {"doc_id": "2-01", "date": "2024-01-02"}
+]
+
+
+def test_iter_doc_metadata_reads_json_lines(tmp_path):
+    path = tmp_path / "doc_metadata.jsonl"
+    path.write_text("\n".join(json.dumps(row) for row in ROWS) + "\n\n", encoding="utf-8")
+
+    assert list(iter_doc_metadata(str(path))) == ROWS
+
+
+def test_iter_doc_metadata_reads_a_json_list(tmp_path):
+    path = tmp_path / "doc_metadata.json"
+    path.write_text("\n  " + json.dumps(ROWS, indent=2), encoding="utf-8")
+
+    assert list(iter_doc_metadata(str(path))) == ROWS
+
+
+def test_load_doc_metadata_file_without_a_file(tmp_path):
+    assert load_doc_metadata_file(str(tmp_path / "missing.jsonl")) is None
@@ -0,0 +1,65 @@
+from gztarchiver.doc_scraper.crawler.run_crawlers import commit_metadata_snapshot
+from gztarchiver.doc_scraper.utils.metadata_snapshot_utils import (
+    diff_doc_metadata,
+    update_metadata_snapshot,
+    drop_from_metadata_snapshot,
+    load_metadata_snapshot,
+    save_metadata_snapshot
+)
+
+
+def make_row(doc_id, description="Notice", download_url=None, availability="Available"):
+    return {
+        "doc_id": doc_id,
+        "date": "2024-01-01",
+        "description": description,
+        "download_url": download_url or f"https://example.org/{doc_id}_E.pdf",
+        "availability": availability
+    }
+
+
+def test_diff_splits_new_changed_and_unchanged_rows():
+    snapshot_rows = {}
+    update_metadata_snapshot(snapshot_rows, [make_row("1"), make_row("2"), make_row("3")])
+
+    rows = [
+        make_row("1"),
+        make_row("2", description="Amended notice"),
+        make_row("3", download_url="https://example.org/3-moved_E.pdf"),
+        make_row("4")
+    ]
+    delta_rows, moved_doc_ids, summary = diff_doc_metadata(rows, snapshot_rows)
+
+    assert [row["doc_id"] for row in delta_rows] == ["2", "3", "4"]
+    assert moved_doc_ids == {"3"}
+    assert summary == {"new": 1, "changed": 2, "unchanged": 1}
+
+
+def test_update_and_drop_rows(tmp_path):
+    snapshot_path = tmp_path / "2024_en.json"
+    snapshot_rows = {}
+
+    assert update_metadata_snapshot(snapshot_rows, [make_row("1"), make_row("2")]) == 2
+    save_metadata_snapshot(snapshot_path, snapshot_rows)
+    snapshot_rows = load_metadata_snapshot(snapshot_path)
+
+    assert drop_from_metadata_snapshot(snapshot_rows, ["2", "missing"]) == 1
+    assert list(snapshot_rows) == ["1"]
+    assert diff_doc_metadata([make_row("2")], snapshot_rows)[2]["new"] == 1
+
+
+def test_unreadable_snapshot_is_ignored(tmp_path):
+    snapshot_path = tmp_path / "2024_en.json"
+    snapshot_path.write_text("{broken", encoding="utf-8")
+
+    assert load_metadata_snapshot(snapshot_path) == {}
+
+
+def test_commit_records_only_processed_rows_that_did_not_fail(tmp_path):
+    snapshot_path = tmp_path / "2024_en.json"
+    rows = [make_row("1"), make_row("2"), make_row("3")]
+    processed = [{"doc_id": "1"}, {"doc_id": "2"}]
+
+    commit_metadata_snapshot(snapshot_path, {}, rows, processed, failed_doc_ids={"2"})
+
+    assert list(load_metadata_snapshot(snapshot_path)) == ["1"]
@@ -0,0 +1,53 @@
+import threading
+
+import pytest
+
+from gztarchiver.doc_scraper.utils.metadata_store_utils import MetadataStore, SQLiteMetadataStore
+
+
+def make_record(doc_id, doc_type="Notice"):
+    return {"document_id": doc_id, "document_date": "2024-01-01", "document_type": doc_type, "availability": "Available"}
+
+
+def test_metadata_store_is_abstract():
+    with pytest.raises(TypeError):
+        MetadataStore()
+
+
+def test_sqlite_store_upserts_by_fingerprint(tmp_path):
+    store = SQLiteMetadataStore(tmp_path / "gazettes.sqlite3", chunk_size=2)
+    try:
+        first = store.insert_docs_by_year([make_record("1"), make_record("2"), make_record("3")], 2024)
+        second = store.insert_docs_by_year([make_record("1"), make_record("2", "Appointment")], 2024)
+
+        assert first["upserted"] == 3
+        assert (second["skipped_unchanged"], second["modified"]) == (1, 1)
+        assert [record["document_id"] for record in store.iter_docs_by_year(2024)] == ["1", "2", "3"]
+        assert store.list_years() == ["2024"]
+    finally:
+        store.close()
+
+
+def test_sqlite_store_can_be_used_from_another_thread(tmp_path):
+    # Post-processing runs in the reactor's thread pool, with a store opened on the reactor thread
+    store = SQLiteMetadataStore(tmp_path / "gazettes.sqlite3")
+    errors = []
+
+    def write(year):
+        try:
+            store.insert_docs_by_year([make_record(f"{year}-{i}") for i in range(20)], year)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=write, args=(year,)) for year in (2022, 2023, 2024)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    try:
+        assert errors == []
+        assert store.list_years() == ["2022", "2023", "2024"]
+        assert len(list(store.iter_docs_by_year(2023))) == 20
+    finally:
+        store.close()
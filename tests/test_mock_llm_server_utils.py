@@ -0,0 +1,78 @@
+import pytest
+
+from gztarchiver.doc_inspector.utils.benchmark_utils import build_synthetic_corpus, run_classification_benchmark, check_benchmark_thresholds
+from gztarchiver.doc_inspector.utils.categorizing_utils import classify_gazette, get_retry_delay, RETRYABLE_STATUS_CODES
+from gztarchiver.doc_inspector.utils.mock_llm_server_utils import start_mock_llm_server, stop_mock_llm_server
+
+
+@pytest.fixture
+def mock_server():
+    servers = []
+
+    def start(**settings):
+        server, url = start_mock_llm_server(latency_ms=0.0, **settings)
+        servers.append(server)
+        return server, url
+
+    yield start
+    for server in servers:
+        stop_mock_llm_server(server)
+
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+def test_mock_classification_is_deterministic(mock_server):
+    server, url = mock_server()
+
+    first = classify_gazette("Notice of land acquisition", "1-01", "key", url)
+    second = classify_gazette("Notice of land acquisition", "1-01", "key", url)
+
+    assert first["success"] and first["retries"] == 0
+    assert (first["type"], first["reasoning"]) == (second["type"], second["reasoning"])
+    assert server.stats["completions"] == 2
+
+
+def test_throttled_request_is_retried(mock_server):
+    # With seed 1 the first request rolls 0.13 (throttled) and the second 0.85 (answered)
+    server, url = mock_server(rate_limit_rate=0.5, retry_after=0.0, seed=1)
+
+    result = classify_gazette("Appointment of a notary", "2-01", "key", url, max_retries=3, backoff_base=0.0)
+
+    assert result["success"]
+    assert result["retries"] == 1
+    assert (server.stats["rate_limited"], server.stats["completions"]) == (1, 1)
+
+
+def test_server_errors_give_up_after_max_retries(mock_server):
+    server, url = mock_server(error_rate=1.0)
+
+    result = classify_gazette("Company registration", "3-01", "key", url, max_retries=2, backoff_base=0.0)
+
+    assert not result["success"]
+    assert result["type"] == "NOT CATEGORISED"
+    assert result["retries"] == 2
+    assert server.stats["errors"] == 3
+
+
+def test_get_retry_delay():
+    assert {429, 500, 503} <= RETRYABLE_STATUS_CODES
+    assert get_retry_delay(FakeResponse({"Retry-After": "2.5"}), attempt=3) == 2.5
+    assert get_retry_delay(FakeResponse({"Retry-After": "Wed, 21 Oct 2015 07:28:00 GMT"}), attempt=2, backoff_base=0.5) == 2.0
+    assert get_retry_delay(FakeResponse({}), attempt=0, backoff_base=1.0) == 1.0
+
+
+def test_classification_benchmark_against_the_mock_server(mock_server):
+    server, url = mock_server(rate_limit_rate=0.2, retry_after=0.0, seed=7)
+    corpus = build_synthetic_corpus(20, doc_chars=200, seed=3)
+
+    report = run_classification_benchmark(corpus, url, workers=4, max_retries=5, backoff_base=0.0)
+
+    assert report["documents"] == 20
+    assert report["failed"] == 0
+    assert report["retries"] == server.stats["rate_limited"]
+    assert sum(report["type_counts"].values()) == 20
+    assert check_benchmark_thresholds(report, min_docs_per_sec=0.1) == 0
+    assert check_benchmark_thresholds(report, max_p99_ms=-1) == 1
@@ -0,0 +1,52 @@
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from gztarchiver.doc_scraper.utils import archive_to_cloud_utils, object_storage_utils
+from gztarchiver.doc_scraper.utils.archive_to_cloud_utils import get_folder_cache_key
+from gztarchiver.doc_scraper.utils.object_storage_utils import GoogleDriveBackend, StorageBackend
+from gztarchiver.doc_scraper.utils.rate_limit_utils import AdaptiveRateLimiter
+
+
+def http_error(status):
+    return HttpError(httplib2.Response({"status": str(status)}), b"{}")
+
+
+@pytest.fixture(autouse=True)
+def unlimited_drive_calls(monkeypatch):
+    monkeypatch.setattr(archive_to_cloud_utils, "drive_rate_limiter", AdaptiveRateLimiter(None, backoff_cap=0.0))
+
+
+def test_storage_backend_is_abstract():
+    with pytest.raises(TypeError):
+        StorageBackend()
+
+
+def test_stale_folder_is_resolved_again_and_the_upload_retried(tmp_path, monkeypatch):
+    local_path = tmp_path / "1-01_english.pdf"
+    local_path.write_bytes(b"%PDF-1.7")
+    backend = GoogleDriveBackend(lambda: object(), parent_folder_id="root")
+    backend.folder_cache[get_folder_cache_key("root", "2024/01/01/1-01")] = "deleted-folder"
+    uploads = []
+
+    def fake_create_nested_folders(service, parent_folder_id, folder_names, folder_cache):
+        # Drive is never called while the cache lock is held
+        assert not backend._lock.locked()
+        folder_cache[get_folder_cache_key(parent_folder_id, "/".join(folder_names))] = "new-folder"
+        return "new-folder"
+
+    def fake_upload(service, path, file_name, folder_id, chunk_size, session_store):
+        uploads.append(folder_id)
+        if folder_id == "deleted-folder":
+            raise http_error(404)
+        return "file-id"
+
+    monkeypatch.setattr(object_storage_utils, "create_nested_folders", fake_create_nested_folders)
+    monkeypatch.setattr(object_storage_utils, "upload_local_pdf_to_gdrive", fake_upload)
+
+    outcome = backend.upload_object({"key": "2024/01/01/1-01/1-01_english.pdf", "local_path": str(local_path)})
+
+    assert outcome["status"] == "uploaded"
+    assert uploads == ["deleted-folder", "new-folder"]
+    assert backend.folder_cache[get_folder_cache_key("root", "2024/01/01/1-01")] == "new-folder"
+    assert backend.sync_manifest[str(local_path)]["gdrive_folder_id"] == "new-folder"
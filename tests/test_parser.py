@@ -0,0 +1,32 @@
+import argparse
+from datetime import date, timedelta
+
+import pytest
+
+from gztarchiver.doc_scraper.cmd.parser import parse_interval, parse_date_arg
+
+
+@pytest.mark.parametrize("value, seconds", [("90", 90), ("90s", 90), ("15m", 900), ("2h", 7200), ("1d", 86400), (" 1.5H ", 5400)])
+def test_parse_interval(value, seconds):
+    assert parse_interval(value) == seconds
+
+
+@pytest.mark.parametrize("value", ["", "0", "-5m", "10w", "abc"])
+def test_parse_interval_rejects_invalid_values(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_interval(value)
+
+
+def test_parse_date_arg():
+    today = date.today()
+
+    assert parse_date_arg("2024-02-29") == date(2024, 2, 29)
+    assert parse_date_arg("today") == today
+    assert parse_date_arg("Yesterday") == today - timedelta(days=1)
+    assert parse_date_arg("10d") == today - timedelta(days=10)
+
+
+@pytest.mark.parametrize("value", ["2023-02-29", "10 days", "01/02/2024"])
+def test_parse_date_arg_rejects_invalid_values(value):
+    with pytest.raises(argparse.ArgumentTypeError):
+        parse_date_arg(value)
@@ -0,0 +1,42 @@
+from gztarchiver.doc_scraper.utils.rate_limit_utils import AdaptiveRateLimiter, RateLimiter
+
+
+def test_throttle_halves_the_rate_down_to_the_floor():
+    limiter = AdaptiveRateLimiter(8.0, min_rate=3.0, cooldown=0.0)
+
+    limiter.record_throttle()
+    assert limiter.rate == 4.0
+    limiter.record_throttle()
+    assert limiter.rate == 3.0
+
+    metrics = limiter.get_metrics()
+    assert metrics["throttled"] == 2
+    assert metrics["lowest_rate"] == 3.0
+
+
+def test_throttles_within_the_cooldown_count_as_one_cut():
+    limiter = AdaptiveRateLimiter(8.0, cooldown=60.0)
+
+    limiter.record_throttle()
+    limiter.record_throttle()
+
+    assert limiter.rate == 4.0
+    assert limiter.get_metrics()["rate_cuts"] == 1
+
+
+def test_success_grows_the_rate_back_up_to_the_quota():
+    limiter = AdaptiveRateLimiter(8.0, cooldown=0.0, increase_step=1.0)
+    limiter.record_throttle()
+
+    limiter.record_success(3)
+    assert limiter.rate == 7.0
+    limiter.record_success(3)
+    assert limiter.rate == 8.0
+
+
+def test_acquire_counts_calls_and_disabled_limiter_never_waits():
+    limiter = AdaptiveRateLimiter(None)
+
+    assert limiter.acquire(5) == 0.0
+    assert limiter.get_metrics()["calls"] == 5
+    assert RateLimiter(None).acquire() == 0.0
@@ -0,0 +1,30 @@
+import pytest
+
+from gztarchiver.doc_inspector.utils.search_index_utils import open_search_index, index_extracted_texts, search_index
+
+
+@pytest.fixture
+def search_conn(tmp_path):
+    conn = open_search_index(tmp_path / "search_index.sqlite3")
+    index_extracted_texts(conn, {
+        "1-01": {"status": "success", "date": "2024-01-01", "text": "Notice of land acquisition in Colombo"},
+        "2-01": {"status": "success", "date": "2023-05-01", "text": "Appointment of a notary"},
+        "3-01": {"status": "failed", "date": "2024-01-03", "text": ""}
+    }, "en")
+    yield conn
+    conn.close()
+
+
+def test_ranked_search_with_filters(search_conn):
+    assert [hit["doc_id"] for hit in search_index(search_conn, "notice")] == ["1-01"]
+    assert search_index(search_conn, "notary", year=2024) == []
+    assert search_index(search_conn, "notary", lang="si") == []
+
+
+def test_fts_syntax_falls_back_to_quoted_terms(search_conn):
+    assert [hit["doc_id"] for hit in search_index(search_conn, "land (acquisition")] == ["1-01"]
+
+
+@pytest.mark.parametrize("query", ["", "   ", "(", "\"", "*", "..."])
+def test_unsearchable_queries_return_no_hits(search_conn, query):
+    assert search_index(search_conn, query) == []